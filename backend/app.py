@@ -4,24 +4,115 @@ Desenvolvido para a disciplina de Algoritmos e Estrutura de Dados II - UFAM
 
 Endpoints disponíveis:
 - GET  /           : Status da API
-- GET  /produtos   : Lista todos os produtos
+- GET  /produtos   : Lista os produtos (filtros de preço e categoria, paginação por cursor e modo NDJSON opcionais)
+- GET  /produtos/contagem : Conta produtos em uma faixa de preço
+- GET  /produtos/posicao/{posicao} : Retorna o k-ésimo produto mais barato
+- GET  /produtos/percentil : Retorna o produto em um percentil de preço
+- GET  /produtos/busca : Busca produtos pelo nome (prefixo, sem acentos, tolera erros de digitação)
 - POST /produtos   : Adiciona um novo produto
+- POST /produtos/lote : Adiciona vários produtos de uma vez (carga em lote)
+- POST /produtos/operacoes : Aplica um lote misto de inserções, remoções e atualizações (resultado por item)
 - GET  /produtos/{codigo} : Busca produto por código
 - PUT  /produtos/{codigo} : Atualiza produto existente
+- PATCH /produtos/{codigo} : Altera só os campos informados de um produto
+- POST /produtos/{codigo}/reservar : Reserva unidades do estoque de um produto
+- POST /produtos/reservar : Reserva vários produtos de uma vez (tudo ou nada)
 - DELETE /produtos/{codigo} : Remove produto
-- GET  /tree/visualize : Retorna diagrama Mermaid da árvore AVL
-- GET  /estatisticas : Retorna altura e total de produtos
+- GET  /arvore/avl : Retorna diagrama Mermaid da árvore AVL (subárvore e profundidade opcionais)
+- GET  /tree/visualize : Retorna diagrama Mermaid da árvore AVL (formato do frontend)
+- GET  /estatisticas : Retorna altura, totais, estoque, preços e contagem por categoria
+- GET  /versoes    : Lista as versões do catálogo disponíveis para consulta (?versao=)
+- POST /versoes/{versao}/restaurar : Volta o catálogo a uma versão anterior
+- GET  /relatorios/categorias : Produtos, unidades, valor em estoque e preço médio por categoria
+- GET  /relatorios/histograma-precos : Distribuição dos preços em faixas
+- GET  /relatorios/estoque-baixo : Produtos com estoque até um limite, do menor para o maior
+- GET  /metricas   : Métricas no formato do Prometheus (contagem e latência por operação, rotações, altura)
+- POST /debug/perfil : Passa a perfilar (cProfile) uma amostra das requisições e zera os contadores da árvore
+- GET  /debug/perfil : Relatório do perfil acumulado e dos contadores da árvore
+- DELETE /debug/perfil : Encerra o perfil e devolve o relatório final
+
+As leituras aceitam 'versao' para consultar o catálogo como estava em uma
+versão anterior; sem ela, leem a versão mais recente publicada.
+
+GET /produtos (JSON), GET /produtos/{codigo} e GET /estatisticas guardam o
+corpo já codificado em um cache LRU por versão do catálogo e enviam ETag;
+com If-None-Match igual ao ETag atual, a resposta é 304 sem corpo.
+
+Com a variável de ambiente CATALOGO_DADOS apontando para um diretório, o
+catálogo é carregado de lá na inicialização e cada alteração é gravada no
+diário (WAL) antes da resposta; instantâneos periódicos compactam o diário.
+Com CATALOGO_SOMENTE_LEITURA=1, a API serve as consultas direto do último
+instantâneo desse diretório, mapeado em memória (sem carga na inicialização
+e com as páginas compartilhadas entre processos); as alterações respondem 405.
+Com CATALOGO_PARTICOES=N (N > 1), os produtos são divididos pelo código
+entre N processos, cada um com a sua árvore AVL; listagens, buscas e
+relatórios consultam todos em paralelo e combinam os resultados. Com
+CATALOGO_DADOS, cada partição grava no seu subdiretório (particao-NN).
+
+Os logs saem em JSON na saída de erro, a partir do nível em CATALOGO_LOG
+(padrão INFO; DEBUG registra cada alteração do catálogo). Os endpoints
+/debug só respondem com CATALOGO_DEBUG=1.
 """
 
-from fastapi import FastAPI, HTTPException
+import json
+import logging
+import os
+from contextlib import asynccontextmanager
+from itertools import islice
+from typing import List, Literal, Optional
+
+from fastapi import Body, FastAPI, Header, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
-from modelo import Produto
-from catalogo_produtos_avl import CatalogoProdutosAVL
+from fastapi.responses import PlainTextResponse, Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from modelo import CategoriaEnum, Operacao, Produto, ProdutoParcial, Reserva
+from cache_respostas import CacheRespostas, codificar_json, etag_confere
+from catalogo_produtos_avl import CatalogoProdutosAVL, codificar_cursor, decodificar_cursor
+from log_estruturado import configurar_log
+from metricas import formatar_medidas
+from perfilador import AmostragemPerfil, Perfilador
+from catalogo_particionado import CatalogoParticionado
+from persistencia import PersistenciaCatalogo
+from snapshot_mapeado import CatalogoMapeado
+
+configurar_log(os.environ.get("CATALOGO_LOG", "INFO"))
+logger = logging.getLogger("api")
+
+depuracao = bool(os.environ.get("CATALOGO_DEBUG"))
+perfilador = Perfilador()
+cache = CacheRespostas()
+
+somente_leitura = bool(os.environ.get("CATALOGO_DADOS") and os.environ.get("CATALOGO_SOMENTE_LEITURA"))
+particoes = int(os.environ.get("CATALOGO_PARTICOES") or 0)
+if somente_leitura:
+    catalogo = CatalogoMapeado(os.environ["CATALOGO_DADOS"])
+elif particoes > 1:
+    catalogo = CatalogoParticionado(particoes)
+else:
+    catalogo = CatalogoProdutosAVL()
+persistencia = None
+if os.environ.get("CATALOGO_DADOS") and not somente_leitura:
+    if isinstance(catalogo, CatalogoParticionado):
+        # Cada partição tem a sua persistência; o coordenador sincroniza e fecha todas
+        carga = catalogo.abrir_persistencia(os.environ["CATALOGO_DADOS"])
+        persistencia = catalogo
+    else:
+        persistencia = PersistenciaCatalogo(catalogo, os.environ["CATALOGO_DADOS"])
+        carga = persistencia.carregar()
+    logger.info("Catálogo carregado", extra=carga)
+
+@asynccontextmanager
+async def ciclo_de_vida(app):
+    """Grava o que estiver pendente no diário ao encerrar a API"""
+    yield
+    if persistencia:
+        persistencia.fechar()
 
 app = FastAPI(
     title="Catálogo de Produtos com AVL",
     description="API para gerenciamento de produtos usando estrutura de dados AVL",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=ciclo_de_vida,
 )
 
 # Configurar CORS
@@ -32,8 +123,47 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(AmostragemPerfil, perfilador=perfilador)
+
+def exigir_escrita():
+    """
+    Raises:
+        HTTPException: 405 se a API estiver servindo um instantâneo somente leitura
+    """
+    if somente_leitura:
+        raise HTTPException(status_code=405, detail="Catálogo aberto somente para leitura.")
+
+def exigir_depuracao():
+    """
+    Raises:
+        HTTPException: 404 se os endpoints de depuração não estiverem habilitados
+    """
+    if not depuracao:
+        raise HTTPException(status_code=404, detail="Endpoints de depuração desabilitados (CATALOGO_DEBUG).")
+
+def responder_codificada(resposta, if_none_match):
+    """
+    Envia uma resposta do cache, ou 304 se o cliente já tiver o mesmo ETag
+    
+    Args:
+        resposta (RespostaCodificada): Corpo JSON e ETag
+        if_none_match (str | None): Cabeçalho If-None-Match da requisição
+    
+    Returns:
+        Response: 200 com o corpo ou 304 sem corpo
+    """
+    if etag_confere(if_none_match, resposta.etag):
+        return Response(status_code=304, headers={"ETag": resposta.etag})
+    return Response(content=resposta.corpo, media_type="application/json", headers={"ETag": resposta.etag})
 
-catalogo = CatalogoProdutosAVL()
+def aguardar_gravacao():
+    """
+    Aguarda a alteração recém-feita chegar ao disco (se houver persistência)
+    Fica fora das travas do catálogo, então escritas concorrentes
+    compartilham o mesmo fsync do diário
+    """
+    if persistencia:
+        persistencia.sincronizar()
 
 @app.get("/")
 def inicio():
@@ -45,16 +175,178 @@ def inicio():
     """
     return {"mensagem": "API do Catálogo AVL está online 🚀"}
 
+def gerar_ndjson(produtos, tamanho_bloco=500):
+    """
+    Serializa produtos como NDJSON (um objeto JSON por linha) sob demanda
+    Agrupa as linhas em blocos para reduzir o número de escritas na resposta
+    
+    Args:
+        produtos (iterable): Dicionários de produtos
+        tamanho_bloco (int): Linhas enviadas por bloco
+        
+    Yields:
+        str: Bloco de linhas NDJSON
+    """
+    bloco = []
+    for produto in produtos:
+        bloco.append(json.dumps(produto, ensure_ascii=False))
+        if len(bloco) == tamanho_bloco:
+            yield "\n".join(bloco) + "\n"
+            bloco = []
+    if bloco:
+        yield "\n".join(bloco) + "\n"
+
 @app.get("/produtos")
-def listar_produtos():
+async def listar_produtos(
+    limite: Optional[int] = Query(None, ge=1, le=10000, description="Produtos por página"),
+    cursor: Optional[str] = Query(None, description="Cursor 'proximo_cursor' da página anterior"),
+    formato: Literal["json", "ndjson"] = Query("json", description="'ndjson' envia os produtos em fluxo"),
+    preco_min: Optional[float] = Query(None, ge=0, description="Menor preço (inclusivo)"),
+    preco_max: Optional[float] = Query(None, ge=0, description="Maior preço (inclusivo)"),
+    categoria: Optional[List[CategoriaEnum]] = Query(None, description="Categorias (repita o parâmetro para várias)"),
+    modo: Literal["ou", "e"] = Query("ou", description="'ou': qualquer categoria; 'e': todas as categorias"),
+    versao: Optional[int] = Query(None, description="Versão do catálogo a ler (padrão: a mais recente)"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    Lista os produtos cadastrados na árvore AVL em ordem de preço
+    Sem 'limite' retorna todos os produtos; com 'limite' retorna uma página
+    e o cursor da próxima. No formato NDJSON os produtos são gerados sob
+    demanda, sem montar a lista inteira em memória. A faixa de preço é
+    resolvida percorrendo apenas as subárvores dentro do intervalo, e o
+    filtro de categorias usa o índice invertido por categoria. Cada resposta
+    lê uma única versão publicada; repassar a 'versao' retornada junto com
+    o cursor mantém todas as páginas na mesma versão. As páginas JSON ficam
+    no cache de respostas; só as faltas percorrem a árvore, fora do laço de
+    eventos.
+    
+    Args:
+        limite (int | None): Quantidade máxima de produtos a retornar
+        cursor (str | None): Posição de onde continuar a listagem
+        formato (str): 'json' (padrão) ou 'ndjson'
+        preco_min (float | None): Menor preço a incluir
+        preco_max (float | None): Maior preço a incluir
+        categoria (List[CategoriaEnum] | None): Categorias a filtrar
+        modo (str): Combinação das categorias, 'ou' (padrão) ou 'e'
+        versao (int | None): Versão do catálogo a ler
+        if_none_match (str | None): ETag de uma resposta anterior
+    
+    Returns:
+        dict: Lista de produtos com suas informações (código, nome, preço, quantidade, categoria),
+            'proximo_cursor' (None quando não há mais páginas) e a 'versao' lida
+            (304 sem corpo se o ETag informado ainda for o atual)
+    
+    Raises:
+        HTTPException: 400 se o cursor for inválido
+        HTTPException: 404 se a versão não estiver disponível
+    """
+    try:
+        chave = decodificar_cursor(cursor) if cursor else None
+    except ValueError as erro:
+        raise HTTPException(status_code=400, detail=str(erro))
+
+    filtros = (preco_min, preco_max, categoria, modo)
+    if formato == "ndjson":
+        try:
+            produtos = await run_in_threadpool(catalogo.iterar_produtos, chave, *filtros, versao=versao)
+        except LookupError as erro:
+            raise HTTPException(status_code=404, detail=str(erro))
+        return StreamingResponse(gerar_ndjson(islice(produtos, limite)), media_type="application/x-ndjson")
+
+    consulta = (limite, cursor, preco_min, preco_max, tuple(categoria or ()), modo)
+    lida = versao if versao is not None else catalogo.versao_atual()
+    resposta = cache.obter(("produtos", lida, consulta))
+    if resposta is None:
+        try:
+            produtos, proximo, lida = await run_in_threadpool(catalogo.listar_pagina, limite, chave, *filtros, versao=versao)
+        except LookupError as erro:
+            raise HTTPException(status_code=404, detail=str(erro))
+        corpo = {"produtos": produtos, "proximo_cursor": codificar_cursor(proximo) if proximo else None, "versao": lida}
+        resposta = cache.guardar(("produtos", lida, consulta), codificar_json(corpo))
+    return responder_codificada(resposta, if_none_match)
+
+@app.get("/produtos/contagem")
+def contar_produtos(
+    preco_min: Optional[float] = Query(None, ge=0, description="Menor preço (inclusivo)"),
+    preco_max: Optional[float] = Query(None, ge=0, description="Maior preço (inclusivo)"),
+    versao: Optional[int] = Query(None, description="Versão do catálogo a ler (padrão: a mais recente)"),
+):
+    """
+    Conta os produtos em uma faixa de preço em O(log n)
+    
+    Args:
+        preco_min (float | None): Menor preço a incluir
+        preco_max (float | None): Maior preço a incluir
+        versao (int | None): Versão do catálogo a ler
+    
+    Returns:
+        dict: Quantidade de produtos na faixa
+    
+    Raises:
+        HTTPException: 404 se a versão não estiver disponível
+    """
+    try:
+        return {"total": catalogo.contar_por_preco(preco_min, preco_max, versao)}
+    except LookupError as erro:
+        raise HTTPException(status_code=404, detail=str(erro))
+
+@app.get("/produtos/posicao/{posicao}")
+def produto_por_posicao(posicao: int):
+    """
+    Retorna o k-ésimo produto mais barato em O(log n)
+    
+    Args:
+        posicao (int): Posição na ordem de preço, começando em 1
+        
+    Returns:
+        dict: Posição e dados do produto
+        
+    Raises:
+        HTTPException: 404 se a posição estiver fora do catálogo
+    """
+    produto = catalogo.produto_por_posicao(posicao)
+    if not produto:
+        raise HTTPException(status_code=404, detail="Posição fora do catálogo.")
+    return {"posicao": posicao, "produto": produto}
+
+@app.get("/produtos/percentil")
+def percentil_preco(p: float = Query(..., ge=0, le=100, description="Percentil entre 0 e 100")):
+    """
+    Retorna o produto no percentil de preço informado em O(log n)
+    
+    Args:
+        p (float): Percentil entre 0 e 100 (50 = mediana)
+        
+    Returns:
+        dict: Percentil, preço e dados do produto
+        
+    Raises:
+        HTTPException: 404 se o catálogo estiver vazio
+    """
+    produto = catalogo.percentil_preco(p)
+    if not produto:
+        raise HTTPException(status_code=404, detail="Catálogo vazio.")
+    return {"percentil": p, "preco": produto.preco, "produto": produto}
+
+@app.get("/produtos/busca")
+def buscar_por_nome(
+    q: str = Query(..., min_length=1, description="Texto a buscar no nome (prefixo de cada palavra)"),
+    limite: int = Query(20, ge=1, le=1000, description="Máximo de produtos"),
+    aproximada: bool = Query(True, description="Tolerar erros de digitação"),
+):
     """
-    Lista todos os produtos cadastrados na árvore AVL
+    Busca produtos pelo nome para autocompletar, do mais barato ao mais caro
+    Não diferencia maiúsculas nem acentos ("eletronicos" encontra "Eletrônicos")
     
+    Args:
+        q (str): Texto digitado
+        limite (int): Máximo de produtos retornados
+        aproximada (bool): Se palavras sem correspondência usam as mais parecidas
+        
     Returns:
-        dict: Lista de produtos com suas informações (código, nome, preço, quantidade, categoria)
+        dict: Consulta e produtos encontrados
     """
-    produtos = catalogo.listar_produtos()
-    return {"produtos": produtos}
+    return {"consulta": q, "produtos": catalogo.buscar_por_nome(q, limite, aproximada)}
 
 @app.post("/produtos")
 def adicionar_produto(produto: Produto):
@@ -66,28 +358,102 @@ def adicionar_produto(produto: Produto):
         
     Returns:
         dict: Mensagem de sucesso e dados do produto adicionado
+        
+    Raises:
+        HTTPException: 400 se já existir produto com o mesmo código
     """
-    catalogo.adicionar_produto(produto)
+    exigir_escrita()
+    try:
+        catalogo.adicionar_produto(produto)
+    except ValueError as erro:
+        raise HTTPException(status_code=400, detail=str(erro))
+    aguardar_gravacao()
     return {"mensagem": "Produto adicionado com sucesso.", "produto": produto}
 
+@app.post("/produtos/lote")
+def adicionar_produtos_lote(produtos: List[Produto]):
+    """
+    Adiciona vários produtos de uma vez na árvore AVL
+    O lote é ordenado pela chave e a árvore é reconstruída balanceada
+    
+    Args:
+        produtos (List[Produto]): Lista de produtos com códigos únicos
+        
+    Returns:
+        dict: Mensagem de sucesso e quantidade de produtos adicionados
+        
+    Raises:
+        HTTPException: 400 se houver códigos repetidos ou já cadastrados
+    """
+    exigir_escrita()
+    try:
+        total = catalogo.adicionar_produtos_lote(produtos)
+    except ValueError as erro:
+        raise HTTPException(status_code=400, detail=str(erro))
+    aguardar_gravacao()
+    return {"mensagem": "Lote adicionado com sucesso.", "total": total}
+
+@app.post("/produtos/operacoes")
+def aplicar_operacoes(operacoes: List[Operacao]):
+    """
+    Aplica um lote misto de inserções, remoções e atualizações
+    Os itens valem na ordem enviada e um item com erro não impede os demais;
+    as alterações aceitas são aplicadas à árvore de uma vez e publicadas
+    como uma única versão
+    
+    Args:
+        operacoes (List[Operacao]): Itens do lote (atualizar aceita o produto
+            completo ou só as alterações)
+        
+    Returns:
+        dict: Quantidade de itens aplicados e com erro, e o resultado de cada
+            item com o status que o endpoint individual devolveria (200, 400
+            ou 404)
+    """
+    exigir_escrita()
+    resultados = []
+    for operacao, resultado in zip(operacoes, catalogo.aplicar_operacoes(operacoes)):
+        codigo = operacao.codigo if operacao.codigo is not None else getattr(operacao.produto, "codigo", None)
+        item = {"tipo": operacao.tipo, "codigo": codigo}
+        if isinstance(resultado, Produto):
+            item.update(status=200, produto=resultado)
+        else:
+            item.update(status=404 if isinstance(resultado, LookupError) else 400, erro=str(resultado))
+        resultados.append(item)
+    aguardar_gravacao()
+    erros = sum(1 for item in resultados if item["status"] != 200)
+    return {
+        "mensagem": "Lote de operações processado.",
+        "aplicadas": len(resultados) - erros,
+        "erros": erros,
+        "resultados": resultados,
+    }
+
 @app.get("/produtos/{codigo}")
-def buscar_produto(codigo: int):
+async def buscar_produto(codigo: int, if_none_match: Optional[str] = Header(None)):
     """
     Busca um produto específico pelo código
+    A resposta em cache sai no próprio laço de eventos; sem ela, o produto e
+    a versão que serve de chave são lidos juntos, sob a trava de leitura
     
     Args:
         codigo (int): Código único do produto
+        if_none_match (str | None): ETag de uma resposta anterior
         
     Returns:
-        dict: Dados do produto encontrado
+        dict: Dados do produto encontrado (304 sem corpo se o ETag informado
+            ainda for o atual)
         
     Raises:
         HTTPException: 404 se produto não for encontrado
     """
-    produto = catalogo.buscar_produto(codigo)
-    if not produto:
-        raise HTTPException(status_code=404, detail="Produto não encontrado.")
-    return {"produto": produto}
+    resposta = cache.obter(("produto", catalogo.versao_atual(), codigo))
+    if resposta is None:
+        lida, produto = await run_in_threadpool(catalogo.buscar_produto_versao, codigo)
+        if not produto:
+            raise HTTPException(status_code=404, detail="Produto não encontrado.")
+        resposta = cache.guardar(("produto", lida, codigo), codificar_json({"produto": produto.model_dump(mode="json")}))
+    return responder_codificada(resposta, if_none_match)
 
 @app.delete("/produtos/{codigo}")
 def remover_produto(codigo: int):
@@ -99,15 +465,22 @@ def remover_produto(codigo: int):
         
     Returns:
         dict: Mensagem de confirmação da remoção
+        
+    Raises:
+        HTTPException: 404 se produto não for encontrado
     """
-    catalogo.remover_produto(codigo)
+    exigir_escrita()
+    if not catalogo.remover_produto(codigo):
+        raise HTTPException(status_code=404, detail="Produto não encontrado.")
+    aguardar_gravacao()
     return {"mensagem": f"Produto {codigo} removido com sucesso."}
 
 @app.put("/produtos/{codigo}")
 def atualizar_produto(codigo: int, novo_produto: Produto):
     """
     Atualiza um produto existente
-    Remove o antigo e adiciona o novo para manter balanceamento da AVL
+    Se o preço não mudar, o produto é trocado no próprio nó da AVL; senão é
+    reposicionado de forma atômica, mantendo o balanceamento
     
     Args:
         codigo (int): Código do produto a ser atualizado
@@ -115,44 +488,371 @@ def atualizar_produto(codigo: int, novo_produto: Produto):
         
     Returns:
         dict: Mensagem de sucesso e dados atualizados
+        
+    Raises:
+        HTTPException: 404 se produto não for encontrado
+        HTTPException: 400 se o novo código já pertencer a outro produto
     """
-    catalogo.remover_produto(codigo)
-    catalogo.adicionar_produto(novo_produto)
+    exigir_escrita()
+    try:
+        produto = catalogo.atualizar_produto(codigo, novo_produto)
+    except ValueError as erro:
+        raise HTTPException(status_code=400, detail=str(erro))
+    if not produto:
+        raise HTTPException(status_code=404, detail="Produto não encontrado.")
+    aguardar_gravacao()
     return {"mensagem": "Produto atualizado.", "produto": novo_produto}
 
+@app.patch("/produtos/{codigo}")
+def atualizar_parcial(codigo: int, alteracoes: ProdutoParcial):
+    """
+    Altera só os campos enviados de um produto existente
+    
+    Args:
+        codigo (int): Código do produto a ser alterado
+        alteracoes (ProdutoParcial): Campos a alterar
+        
+    Returns:
+        dict: Mensagem de sucesso e dados atualizados
+        
+    Raises:
+        HTTPException: 404 se produto não for encontrado
+        HTTPException: 400 se o novo código já pertencer a outro produto
+    """
+    exigir_escrita()
+    try:
+        produto = catalogo.atualizar_parcial(codigo, alteracoes)
+    except ValueError as erro:
+        raise HTTPException(status_code=400, detail=str(erro))
+    if not produto:
+        raise HTTPException(status_code=404, detail="Produto não encontrado.")
+    aguardar_gravacao()
+    return {"mensagem": "Produto atualizado.", "produto": produto}
+
+@app.post("/produtos/reservar")
+def reservar_lote(itens: List[Reserva]):
+    """
+    Reserva o estoque de vários produtos de forma atômica
+    Se algum item não puder ser atendido, nenhum estoque é baixado
+    
+    Args:
+        itens (List[Reserva]): Códigos e unidades a reservar
+        
+    Returns:
+        dict: Mensagem de sucesso e produtos com o estoque atualizado
+        
+    Raises:
+        HTTPException: 404 se algum produto não for encontrado
+        HTTPException: 409 se o estoque de algum produto for insuficiente
+    """
+    exigir_escrita()
+    try:
+        produtos = catalogo.reservar_lote((item.codigo, item.quantidade) for item in itens)
+    except LookupError as erro:
+        raise HTTPException(status_code=404, detail=str(erro))
+    except ValueError as erro:
+        raise HTTPException(status_code=409, detail=str(erro))
+    aguardar_gravacao()
+    return {"mensagem": "Reserva realizada.", "produtos": produtos}
+
+@app.post("/produtos/{codigo}/reservar")
+def reservar_estoque(codigo: int, quantidade: int = Body(..., gt=0, embed=True)):
+    """
+    Reserva unidades de um produto, baixando o estoque de forma atômica
+    O preço não muda, então o produto é substituído no próprio nó da AVL
+    (sem remover, reinserir nem rebalancear)
+    
+    Args:
+        codigo (int): Código do produto
+        quantidade (int): Unidades a reservar
+        
+    Returns:
+        dict: Mensagem de sucesso e produto com o estoque atualizado
+        
+    Raises:
+        HTTPException: 404 se produto não for encontrado
+        HTTPException: 409 se o estoque for insuficiente
+    """
+    exigir_escrita()
+    try:
+        produto = catalogo.reservar_estoque(codigo, quantidade)
+    except ValueError as erro:
+        raise HTTPException(status_code=409, detail=str(erro))
+    if not produto:
+        raise HTTPException(status_code=404, detail="Produto não encontrado.")
+    aguardar_gravacao()
+    return {"mensagem": "Reserva realizada.", "produto": produto}
+
+def gerar_diagrama(raiz, profundidade, versao):
+    """
+    Obtém o diagrama Mermaid do catálogo (em cache até a próxima alteração)
+    
+    Args:
+        raiz (int | None): Código do produto raiz do diagrama
+        profundidade (int | None): Níveis desenhados abaixo da raiz
+        versao (int | None): Versão do catálogo a desenhar
+    
+    Returns:
+        str: String em formato Mermaid
+        
+    Raises:
+        HTTPException: 404 se a versão ou o produto raiz não forem encontrados
+    """
+    try:
+        diagrama = catalogo.para_mermaid(raiz, profundidade, versao)
+    except LookupError as erro:
+        raise HTTPException(status_code=404, detail=str(erro))
+    if diagrama is None:
+        raise HTTPException(status_code=404, detail="Produto raiz não encontrado.")
+    return diagrama
+
 @app.get("/arvore/avl")
-def exibir_arvore():
+def exibir_arvore(
+    raiz: Optional[int] = Query(None, description="Código do produto usado como raiz do diagrama"),
+    profundidade: Optional[int] = Query(None, ge=0, description="Níveis desenhados abaixo da raiz"),
+    versao: Optional[int] = Query(None, description="Versão do catálogo a desenhar (padrão: a mais recente)"),
+):
     """
     Retorna a representação Mermaid da árvore AVL
     
+    Args:
+        raiz (int | None): Código do produto raiz (None para a árvore inteira)
+        profundidade (int | None): Limite de níveis do diagrama
+        versao (int | None): Versão do catálogo a desenhar
+    
     Returns:
         dict: String em formato Mermaid para visualização gráfica
     """
-    return {"mermaid": catalogo.para_mermaid()}
+    return {"mermaid": gerar_diagrama(raiz, profundidade, versao)}
 
 @app.get("/tree/visualize")
-def visualizar_arvore():
+def visualizar_arvore(
+    raiz: Optional[int] = Query(None, description="Código do produto usado como raiz do diagrama"),
+    profundidade: Optional[int] = Query(None, ge=0, description="Níveis desenhados abaixo da raiz"),
+    versao: Optional[int] = Query(None, description="Versão do catálogo a desenhar (padrão: a mais recente)"),
+):
     """
     Endpoint compatível com frontend - Retorna diagrama Mermaid da árvore
     Alias para /arvore/avl com formato esperado pelo frontend
     
+    Args:
+        raiz (int | None): Código do produto raiz (None para a árvore inteira)
+        profundidade (int | None): Limite de níveis do diagrama
+        versao (int | None): Versão do catálogo a desenhar
+    
     Returns:
         dict: String Mermaid com chave 'mermaid_string'
     """
-    return {"mermaid_string": catalogo.para_mermaid()}
+    return {"mermaid_string": gerar_diagrama(raiz, profundidade, versao)}
 
 @app.get("/estatisticas")
-def estatisticas():
+async def estatisticas(
+    versao: Optional[int] = Query(None, description="Versão do catálogo a ler (padrão: a mais recente)"),
+    if_none_match: Optional[str] = Header(None),
+):
     """
     Retorna estatísticas da árvore AVL
+    Os valores são mantidos incrementalmente pelo catálogo, sem percorrer a árvore
+    
+    Args:
+        versao (int | None): Versão do catálogo a ler
+        if_none_match (str | None): ETag de uma resposta anterior
     
     Returns:
-        dict: Altura da árvore e total de produtos cadastrados
+        dict: Versão, altura da árvore, total de produtos cadastrados, unidades
+            e valor em estoque, preço mínimo/máximo/médio e produtos por categoria
+            (304 sem corpo se o ETag informado ainda for o atual)
+    
+    Raises:
+        HTTPException: 404 se a versão não estiver disponível
     """
-    avl = catalogo.avl
-    altura = avl.obter_altura(avl.raiz)
-    total = catalogo.contar_produtos()
-    return {
-        "altura": altura,
-        "total_produtos": total,
-    }
+    lida = versao if versao is not None else catalogo.versao_atual()
+    resposta = cache.obter(("estatisticas", lida))
+    if resposta is None:
+        try:
+            dados = catalogo.estatisticas(versao)
+        except LookupError as erro:
+            raise HTTPException(status_code=404, detail=str(erro))
+        resposta = cache.guardar(("estatisticas", dados["versao"]), codificar_json(dados))
+    return responder_codificada(resposta, if_none_match)
+
+@app.get("/versoes")
+def listar_versoes():
+    """
+    Lista as versões do catálogo ainda disponíveis para consulta e restauração
+    
+    Returns:
+        dict: Versões (número e total de produtos), da mais antiga à mais recente
+    """
+    return {"versoes": catalogo.listar_versoes()}
+
+@app.post("/versoes/{versao}/restaurar")
+def restaurar_versao(versao: int):
+    """
+    Volta o catálogo a uma versão anterior (ex.: desfazer uma carga em lote)
+    A restauração é registrada como uma nova versão
+    
+    Args:
+        versao (int): Versão a restaurar
+    
+    Returns:
+        dict: Mensagem de sucesso e número da nova versão
+    
+    Raises:
+        HTTPException: 404 se a versão não estiver disponível
+    """
+    exigir_escrita()
+    nova = catalogo.restaurar_versao(versao)
+    if nova is None:
+        raise HTTPException(status_code=404, detail=f"Versão {versao} não está disponível")
+    aguardar_gravacao()
+    return {"mensagem": f"Versão {versao} restaurada.", "versao": nova}
+
+@app.get("/relatorios/categorias")
+def relatorio_categorias(
+    preco_min: Optional[float] = Query(None, ge=0, description="Menor preço (inclusivo)"),
+    preco_max: Optional[float] = Query(None, ge=0, description="Maior preço (inclusivo)"),
+):
+    """
+    Agregados do catálogo e de cada categoria, calculados de forma
+    vetorizada sobre as colunas NumPy da visão analítica
+    
+    Args:
+        preco_min (float | None): Menor preço a incluir
+        preco_max (float | None): Maior preço a incluir
+    
+    Returns:
+        dict: Versão lida, 'total' e 'categorias' com produtos, unidades,
+            valor em estoque, preço médio e produtos sem estoque
+    """
+    return catalogo.relatorio_categorias(preco_min, preco_max)
+
+@app.get("/relatorios/histograma-precos")
+def histograma_precos(
+    faixas: int = Query(10, ge=1, le=1000, description="Quantidade de faixas de preço"),
+    preco_min: Optional[float] = Query(None, ge=0, description="Início da primeira faixa (padrão: menor preço)"),
+    preco_max: Optional[float] = Query(None, ge=0, description="Fim da última faixa (padrão: maior preço)"),
+    categoria: Optional[List[CategoriaEnum]] = Query(None, description="Categorias (repita o parâmetro para várias)"),
+    modo: Literal["ou", "e"] = Query("ou", description="'ou': qualquer categoria; 'e': todas as categorias"),
+):
+    """
+    Distribuição dos preços em faixas de mesma largura
+    
+    Args:
+        faixas (int): Quantidade de faixas
+        preco_min (float | None): Início da primeira faixa
+        preco_max (float | None): Fim da última faixa
+        categoria (List[CategoriaEnum] | None): Categorias a filtrar
+        modo (str): Combinação das categorias, 'ou' (padrão) ou 'e'
+    
+    Returns:
+        dict: Versão lida e, por faixa, início, fim, produtos e unidades
+    
+    Raises:
+        HTTPException: 400 se preco_min for maior que preco_max
+    """
+    if preco_min is not None and preco_max is not None and preco_min > preco_max:
+        raise HTTPException(status_code=400, detail="preco_min deve ser menor ou igual a preco_max.")
+    return catalogo.histograma_precos(faixas, preco_min, preco_max, categoria, modo)
+
+@app.get("/relatorios/estoque-baixo")
+def estoque_baixo(
+    quantidade_maxima: int = Query(5, ge=0, description="Maior estoque considerado baixo"),
+    limite: int = Query(100, ge=1, le=10000, description="Máximo de produtos"),
+    categoria: Optional[List[CategoriaEnum]] = Query(None, description="Categorias (repita o parâmetro para várias)"),
+    modo: Literal["ou", "e"] = Query("ou", description="'ou': qualquer categoria; 'e': todas as categorias"),
+):
+    """
+    Alerta de estoque baixo: produtos com até quantidade_maxima unidades,
+    do menor estoque para o maior
+    
+    Args:
+        quantidade_maxima (int): Maior estoque considerado baixo
+        limite (int): Máximo de produtos na resposta
+        categoria (List[CategoriaEnum] | None): Categorias a filtrar
+        modo (str): Combinação das categorias, 'ou' (padrão) ou 'e'
+    
+    Returns:
+        dict: Versão lida, total de produtos com estoque baixo e os primeiros produtos
+    """
+    return catalogo.estoque_baixo(quantidade_maxima, limite, categoria, modo)
+
+@app.get("/metricas", response_class=PlainTextResponse)
+def metricas():
+    """
+    Exporta as métricas do catálogo no formato de texto do Prometheus
+    
+    Returns:
+        PlainTextResponse: Contadores e histogramas de latência por operação,
+            rotações, altura da árvore, produtos, versão e uso do cache de respostas
+    """
+    texto = catalogo.exportar_metricas() + formatar_medidas(cache.medidas())
+    return PlainTextResponse(texto, media_type="text/plain; version=0.0.4")
+
+def relatorio_perfil(linhas, ordem):
+    """
+    Junta o relatório do cProfile aos contadores internos da árvore
+    
+    Args:
+        linhas (int): Funções listadas no relatório
+        ordem (str): Critério de ordenação do pstats
+    
+    Returns:
+        dict: Amostra, requisições perfiladas por rota, relatório e contadores
+            da árvore (None no modo somente leitura, que não tem árvore)
+    """
+    relatorio = perfilador.relatorio(linhas, ordem)
+    relatorio["arvore"] = None if somente_leitura else catalogo.perfil_arvore()
+    return relatorio
+
+@app.post("/debug/perfil")
+def iniciar_perfil(amostra: float = Query(0.1, gt=0, le=1, description="Fração das requisições perfiladas")):
+    """
+    Passa a executar uma amostra das requisições sob o cProfile e liga os
+    contadores da árvore (nós visitados, rotações, tempo de rebalanceamento)
+    Descarta o que tiver sido acumulado antes
+    
+    Args:
+        amostra (float): Fração das requisições perfiladas, entre 0 e 1
+    
+    Returns:
+        dict: Mensagem de confirmação e amostra configurada
+    """
+    exigir_depuracao()
+    perfilador.configurar(amostra)
+    if not somente_leitura:
+        catalogo.configurar_perfil_arvore(True)
+    return {"mensagem": "Perfil iniciado", "amostra": amostra}
+
+@app.get("/debug/perfil")
+def consultar_perfil(
+    linhas: int = Query(30, ge=1, le=500, description="Funções listadas no relatório"),
+    ordem: Literal["cumulative", "tottime", "calls"] = Query("cumulative", description="Ordenação do relatório"),
+):
+    """
+    Retorna o perfil acumulado desde o último POST /debug/perfil
+    
+    Returns:
+        dict: Amostra, requisições perfiladas por rota, relatório do pstats e
+            contadores da árvore
+    """
+    exigir_depuracao()
+    return relatorio_perfil(linhas, ordem)
+
+@app.delete("/debug/perfil")
+def encerrar_perfil(
+    linhas: int = Query(30, ge=1, le=500, description="Funções listadas no relatório"),
+    ordem: Literal["cumulative", "tottime", "calls"] = Query("cumulative", description="Ordenação do relatório"),
+):
+    """
+    Desliga a amostragem e os contadores da árvore
+    
+    Returns:
+        dict: Relatório final, como em GET /debug/perfil
+    """
+    exigir_depuracao()
+    relatorio = relatorio_perfil(linhas, ordem)
+    perfilador.configurar(0.0)
+    if not somente_leitura:
+        catalogo.configurar_perfil_arvore(False)
+    return relatorio
@@ -1,315 +1,1055 @@
-"""
-Módulo de Implementação de Árvore AVL
-Estrutura de dados auto-balanceada para catálogo de produtos
-"""
-
-from no import No
-
-class ArvoreAVL:
-    """
-    Árvore AVL (Adelson-Velsky e Landis)
-    Árvore binária de busca auto-balanceada
-    Garante operações O(log n) através de rotações
-    """
-    
-    def __init__(self):
-        """Inicializa uma árvore AVL vazia"""
-        self.raiz = None
-
-    def obter_altura(self, no):
-        """
-        Obtém a altura de um nó
-        
-        Args:
-            no (No | None): Nó para obter altura
-            
-        Returns:
-            int: Altura do nó (0 se None)
-        """
-        if not no:
-            return 0
-        return no.altura
-
-    def obter_balanceamento(self, no):
-        """
-        Calcula o fator de balanceamento de um nó
-        Balanceamento = altura(esquerda) - altura(direita)
-        
-        Args:
-            no (No | None): Nó para calcular balanceamento
-            
-        Returns:
-            int: Fator de balanceamento (-2 a +2 em árvore válida)
-        """
-        if not no:
-            return 0
-        return self.obter_altura(no.esquerda) - self.obter_altura(no.direita)
-
-    def rotacionar_direita(self, y):
-        """
-        Rotação simples à direita
-        Usada quando subárvore esquerda está desbalanceada
-        
-        Args:
-            y (No): Nó raiz da subárvore a ser rotacionada
-            
-        Returns:
-            No: Nova raiz após rotação
-        """
-        x = y.esquerda
-        T2 = x.direita
-
-        x.direita = y
-        y.esquerda = T2
-
-        y.altura = 1 + max(self.obter_altura(y.esquerda), self.obter_altura(y.direita))
-        x.altura = 1 + max(self.obter_altura(x.esquerda), self.obter_altura(x.direita))
-
-        return x
-    
-    def rotacionar_esquerda(self, x):
-        """
-        Rotação simples à esquerda
-        Usada quando subárvore direita está desbalanceada
-        
-        Args:
-            x (No): Nó raiz da subárvore a ser rotacionada
-            
-        Returns:
-            No: Nova raiz após rotação
-        """
-        y = x.direita
-        T2 = y.esquerda
-
-        y.esquerda = x
-        x.direita = T2
-
-        x.altura = 1 + max(self.obter_altura(x.esquerda), self.obter_altura(x.direita))
-        y.altura = 1 + max(self.obter_altura(y.esquerda), self.obter_altura(y.direita))
-
-        return y
-
-    def inserir(self, no, chave, valor=None):
-        """
-        Insere um nó recursivamente mantendo balanceamento AVL
-        
-        Args:
-            no (No | None): Nó raiz da subárvore
-            chave (int): Chave de ordenação (código do produto)
-            valor: Objeto produto associado à chave
-            
-        Returns:
-            No: Nova raiz da subárvore após inserção e balanceamento
-        """
-        if not no:
-            return No(chave, valor)
-        elif chave < no.chave:
-            no.esquerda = self.inserir(no.esquerda, chave, valor)
-        else:
-            no.direita = self.inserir(no.direita, chave, valor)
-
-        no.altura = 1 + max(self.obter_altura(no.esquerda), self.obter_altura(no.direita))
-        balanceamento = self.obter_balanceamento(no)
-
-        # Caso Esquerda-Esquerda
-        if balanceamento > 1 and chave < no.esquerda.chave:
-            return self.rotacionar_direita(no)
-        # Caso Direita-Direita
-        if balanceamento < -1 and chave > no.direita.chave:
-            return self.rotacionar_esquerda(no)
-        # Caso Esquerda-Direita
-        if balanceamento > 1 and chave > no.esquerda.chave:
-            no.esquerda = self.rotacionar_esquerda(no.esquerda)
-            return self.rotacionar_direita(no)
-        # Caso Direita-Esquerda
-        if balanceamento < -1 and chave < no.direita.chave:
-            no.direita = self.rotacionar_direita(no.direita)
-            return self.rotacionar_esquerda(no)
-
-        return no
-
-    def inserir_chave(self, chave, valor=None):
-        """
-        Método público para inserir na árvore
-        
-        Args:
-            chave (int): Chave a ser inserida
-            valor: Valor associado à chave
-        """
-        self.raiz = self.inserir(self.raiz, chave, valor)
-
-    def remover(self, no, chave):
-        """
-        Remove um nó recursivamente mantendo balanceamento AVL
-        
-        Args:
-            no (No | None): Nó raiz da subárvore
-            chave (int): Chave do nó a ser removido
-            
-        Returns:
-            No | None: Nova raiz da subárvore após remoção e balanceamento
-        """
-        if not no:
-            return no
-
-        if chave < no.chave:
-            no.esquerda = self.remover(no.esquerda, chave)
-        elif chave > no.chave:
-            no.direita = self.remover(no.direita, chave)
-        else:
-            # Nó com um filho ou sem filhos
-            if not no.esquerda:
-                temp = no.direita
-                no = None
-                return temp
-            elif not no.direita:
-                temp = no.esquerda
-                no = None
-                return temp
-
-            # Nó com dois filhos: substitui pelo sucessor in-ordem
-            temp = self.obter_no_minimo(no.direita)
-            no.chave = temp.chave
-            no.valor = temp.valor
-            no.direita = self.remover(no.direita, temp.chave)
-
-        if not no:
-            return no
-
-        # Atualiza altura e rebalanceia
-        no.altura = 1 + max(self.obter_altura(no.esquerda), self.obter_altura(no.direita))
-        balanceamento = self.obter_balanceamento(no)
-
-        # Caso Esquerda-Esquerda
-        if balanceamento > 1 and self.obter_balanceamento(no.esquerda) >= 0:
-            return self.rotacionar_direita(no)
-        # Caso Esquerda-Direita
-        if balanceamento > 1 and self.obter_balanceamento(no.esquerda) < 0:
-            no.esquerda = self.rotacionar_esquerda(no.esquerda)
-            return self.rotacionar_direita(no)
-        # Caso Direita-Direita
-        if balanceamento < -1 and self.obter_balanceamento(no.direita) <= 0:
-            return self.rotacionar_esquerda(no)
-        # Caso Direita-Esquerda
-        if balanceamento < -1 and self.obter_balanceamento(no.direita) > 0:
-            no.direita = self.rotacionar_direita(no.direita)
-            return self.rotacionar_esquerda(no)
-
-        return no
-
-    def remover_chave(self, chave):
-        """
-        Método público para remover da árvore
-        
-        Args:
-            chave (int): Chave a ser removida
-        """
-        self.raiz = self.remover(self.raiz, chave)
-
-    def obter_no_minimo(self, no):
-        """
-        Encontra o nó com menor chave em uma subárvore
-        
-        Args:
-            no (No): Raiz da subárvore
-            
-        Returns:
-            No: Nó com menor chave (mais à esquerda)
-        """
-        atual = no
-        while atual.esquerda is not None:
-            atual = atual.esquerda
-        return atual
-
-    def buscar(self, no, chave):
-        """
-        Busca recursiva por uma chave na árvore
-        Complexidade: O(log n)
-        
-        Args:
-            no (No | None): Raiz da subárvore
-            chave (int): Chave a ser buscada
-            
-        Returns:
-            No | None: Nó encontrado ou None
-        """
-        if not no or no.chave == chave:
-            return no
-        elif chave < no.chave:
-            return self.buscar(no.esquerda, chave)
-        else:
-            return self.buscar(no.direita, chave)
-
-    def percorrer_em_ordem(self, no=None):
-        """
-        Percorre a árvore em ordem (esquerda → raiz → direita)
-        Imprime as chaves em ordem crescente
-        """
-        if self.raiz is None:
-            print("Árvore vazia")
-            return
-
-        def _em_ordem(n):
-            if n:
-                _em_ordem(n.esquerda)
-                print(n.chave, end=" ")
-                _em_ordem(n.direita)
-
-        _em_ordem(self.raiz)
-
-    def gerar_mermaid(self, no=None):
-        """
-        Gera representação da árvore em formato Mermaid
-        Exibe informações do produto em cada nó
-        
-        Args:
-            no (No | None): Raiz da subárvore (usa self.raiz se None)
-            
-        Returns:
-            str: String em formato Mermaid com sintaxe graph TD
-        """
-        if no is None:
-            no = self.raiz
-        
-        if no is None:
-            return "graph TD;\nVazio[\"Árvore Vazia\"]"
-            
-        resultado = "graph TD;\n"
-        nos = []
-        arestas = []
-        estilos = []
-
-        def get_id(n):
-            # Usa o código do produto como ID do nó se disponível, senão usa a chave formatada
-            if n.valor and hasattr(n.valor, 'codigo'):
-                return f"Node{n.valor.codigo}"
-            return f"Node{str(n.chave).replace('.', '_')}"
-
-        def percorrer(n):
-            if n:
-                node_id = get_id(n)
-                
-                # Formata o label do nó com informações do produto
-                if n.valor:
-                    # Limita o nome a 20 caracteres
-                    nome = n.valor.nome[:20] + "..." if len(n.valor.nome) > 20 else n.valor.nome
-                    preco = f"R$ {n.valor.preco:.2f}"
-                    # Mostra o ID e o Preço (que é a chave agora)
-                    label = f"ID: {n.valor.codigo}<br/>{nome}<br/>{preco}<br/>Qtd: {n.valor.quantidade}"
-                    nos.append(f'    {node_id}["{label}"]')
-                else:
-                    nos.append(f'    {node_id}["{n.chave}"]')
-                
-                # Adiciona estilo para o nó
-                estilos.append(f"    style {node_id} fill:#60a5fa,stroke:#2563eb,stroke-width:2px,color:#fff")
-                
-                if n.esquerda:
-                    arestas.append(f"    {node_id} --> {get_id(n.esquerda)}")
-                    percorrer(n.esquerda)
-                if n.direita:
-                    arestas.append(f"    {node_id} --> {get_id(n.direita)}")
-                    percorrer(n.direita)
-
-        percorrer(no)
-        resultado += "\n".join(nos + [""] + arestas + [""] + estilos)
-        return resultado
+"""
+Módulo de Implementação de Árvore AVL
+Estrutura de dados auto-balanceada para catálogo de produtos
+"""
+
+import re
+from operator import itemgetter
+from time import perf_counter
+
+from no import No
+
+class PerfilArvore:
+    """
+    Contadores opcionais do trabalho interno da árvore, para diagnóstico
+    Só são alimentados enquanto atribuídos a ArvoreAVL.perfil; com o perfil
+    desligado (None), o custo é uma comparação por operação, nunca por nó.
+    Os incrementos não usam trava: buscas concorrentes podem perder alguma
+    contagem, o que não atrapalha o diagnóstico.
+    """
+
+    def __init__(self):
+        """Inicializa os contadores zerados"""
+        self.buscas = 0
+        self.nos_visitados_busca = 0
+        self.maior_busca = 0
+        self.escritas = 0
+        self.nos_visitados_escrita = 0
+        self.rotacoes_simples = 0
+        self.rotacoes_duplas = 0
+        self.segundos_rebalanceamento = 0.0
+        # Início da escrita em andamento (as escritas são serializadas)
+        self._inicio = 0.0
+        self._rotacoes = (0, 0)
+
+    def registrar_busca(self, visitados):
+        """
+        Args:
+            visitados (int): Nós comparados pela busca
+        """
+        self.buscas += 1
+        self.nos_visitados_busca += visitados
+        if visitados > self.maior_busca:
+            self.maior_busca = visitados
+
+    def iniciar_rebalanceamento(self, arvore):
+        """
+        Marca o início do rebalanceamento de uma escrita
+        
+        Args:
+            arvore (ArvoreAVL): Árvore que vai rebalancear
+        """
+        self._rotacoes = (arvore.rotacoes_simples, arvore.rotacoes_duplas)
+        self._inicio = perf_counter()
+
+    def registrar_escrita(self, arvore, visitados):
+        """
+        Fecha a medição aberta por iniciar_rebalanceamento
+        
+        Args:
+            arvore (ArvoreAVL): Árvore que rebalanceou
+            visitados (int): Nós comparados na descida até a chave
+        """
+        self.segundos_rebalanceamento += perf_counter() - self._inicio
+        self.escritas += 1
+        self.nos_visitados_escrita += visitados
+        self.rotacoes_simples += arvore.rotacoes_simples - self._rotacoes[0]
+        self.rotacoes_duplas += arvore.rotacoes_duplas - self._rotacoes[1]
+
+    def acumular(self, outro):
+        """
+        Soma os contadores de outro perfil a este (ex.: de cada partição)
+        
+        Args:
+            outro (PerfilArvore): Perfil somado
+        """
+        self.buscas += outro.buscas
+        self.nos_visitados_busca += outro.nos_visitados_busca
+        self.maior_busca = max(self.maior_busca, outro.maior_busca)
+        self.escritas += outro.escritas
+        self.nos_visitados_escrita += outro.nos_visitados_escrita
+        self.rotacoes_simples += outro.rotacoes_simples
+        self.rotacoes_duplas += outro.rotacoes_duplas
+        self.segundos_rebalanceamento += outro.segundos_rebalanceamento
+
+    def resumo(self):
+        """
+        Returns:
+            dict: Contadores e médias por busca e por escrita
+        """
+        return {
+            "buscas": self.buscas,
+            "media_nos_visitados_busca": round(self.nos_visitados_busca / self.buscas, 2) if self.buscas else None,
+            "maior_busca": self.maior_busca,
+            "escritas": self.escritas,
+            "media_nos_visitados_escrita": round(self.nos_visitados_escrita / self.escritas, 2) if self.escritas else None,
+            "rotacoes_simples": self.rotacoes_simples,
+            "rotacoes_duplas": self.rotacoes_duplas,
+            "segundos_rebalanceamento": round(self.segundos_rebalanceamento, 6),
+            "media_us_rebalanceamento": round(self.segundos_rebalanceamento / self.escritas * 1e6, 2) if self.escritas else None,
+        }
+
+
+class ArvoreAVL:
+    """
+    Árvore AVL (Adelson-Velsky e Landis)
+    Árvore binária de busca auto-balanceada
+    Garante operações O(log n) através de rotações
+    
+    As chaves são únicas: inserir uma chave já existente substitui o valor
+    do nó. Chaves compostas (tuplas) são comparadas lexicograficamente.
+    """
+    
+    # Estilos compartilhados pelos nós do diagrama Mermaid (um classDef por
+    # tipo de nó em vez de uma linha de estilo por nó)
+    CLASSES_MERMAID = {
+        "produto": "fill:#60a5fa,stroke:#2563eb,stroke-width:2px,color:#fff",
+        "oculto": "fill:#e5e7eb,stroke:#9ca3af,stroke-dasharray:3 3,color:#374151",
+    }
+    # Quantidade máxima de diagramas (raiz, profundidade) guardados em cache
+    LIMITE_CACHE_MERMAID = 32
+
+    def __init__(self):
+        """Inicializa uma árvore AVL vazia"""
+        self.raiz = None
+        # Incrementada a cada alteração; invalida os diagramas em cache
+        self.versao = 0
+        self._cache_mermaid = {}
+        self._versao_cache = 0
+        # Rotações feitas pelo rebalanceamento iterativo (_rebalancear)
+        self.rotacoes_simples = 0
+        self.rotacoes_duplas = 0
+        # PerfilArvore opcional (nós visitados, rotações e tempo por escrita)
+        self.perfil = None
+
+    def registrar_alteracao(self):
+        """
+        Marca a árvore como alterada, invalidando os caches derivados dela
+        Deve ser chamado também por quem altera o valor de um nó diretamente
+        """
+        self.versao += 1
+
+    def obter_altura(self, no):
+        """
+        Obtém a altura de um nó
+        
+        Args:
+            no (No | None): Nó para obter altura
+        
+        Returns:
+            int: Altura do nó (0 se None)
+        """
+        if not no:
+            return 0
+        return no.altura
+
+    def obter_tamanho(self, no):
+        """
+        Obtém a quantidade de nós da subárvore enraizada em um nó
+        
+        Args:
+            no (No | None): Raiz da subárvore
+        
+        Returns:
+            int: Quantidade de nós (0 se None)
+        """
+        if not no:
+            return 0
+        return no.tamanho
+
+    def obter_balanceamento(self, no):
+        """
+        Calcula o fator de balanceamento de um nó
+        Balanceamento = altura(esquerda) - altura(direita)
+        
+        Args:
+            no (No | None): Nó para calcular balanceamento
+        
+        Returns:
+            int: Fator de balanceamento (-2 a +2 em árvore válida)
+        """
+        if not no:
+            return 0
+        return self.obter_altura(no.esquerda) - self.obter_altura(no.direita)
+
+    def rotacionar_direita(self, y):
+        """
+        Rotação simples à direita
+        Usada quando subárvore esquerda está desbalanceada
+        
+        Args:
+            y (No): Nó raiz da subárvore a ser rotacionada
+        
+        Returns:
+            No: Nova raiz após rotação
+        """
+        x = y.esquerda
+        T2 = x.direita
+
+        x.direita = y
+        y.esquerda = T2
+
+        y.altura = 1 + max(self.obter_altura(y.esquerda), self.obter_altura(y.direita))
+        x.altura = 1 + max(self.obter_altura(x.esquerda), self.obter_altura(x.direita))
+        y.tamanho = 1 + self.obter_tamanho(y.esquerda) + self.obter_tamanho(y.direita)
+        x.tamanho = 1 + self.obter_tamanho(x.esquerda) + self.obter_tamanho(x.direita)
+
+        return x
+    
+    def rotacionar_esquerda(self, x):
+        """
+        Rotação simples à esquerda
+        Usada quando subárvore direita está desbalanceada
+        
+        Args:
+            x (No): Nó raiz da subárvore a ser rotacionada
+        
+        Returns:
+            No: Nova raiz após rotação
+        """
+        y = x.direita
+        T2 = y.esquerda
+
+        y.esquerda = x
+        x.direita = T2
+
+        x.altura = 1 + max(self.obter_altura(x.esquerda), self.obter_altura(x.direita))
+        y.altura = 1 + max(self.obter_altura(y.esquerda), self.obter_altura(y.direita))
+        x.tamanho = 1 + self.obter_tamanho(x.esquerda) + self.obter_tamanho(x.direita)
+        y.tamanho = 1 + self.obter_tamanho(y.esquerda) + self.obter_tamanho(y.direita)
+
+        return y
+
+    def inserir(self, no, chave, valor=None):
+        """
+        Insere um nó recursivamente mantendo balanceamento AVL
+        Implementação de referência; inserir_chave usa a versão iterativa
+        
+        Args:
+            no (No | None): Nó raiz da subárvore
+            chave (int): Chave de ordenação (código do produto)
+            valor: Objeto produto associado à chave
+        
+        Returns:
+            No: Nova raiz da subárvore após inserção e balanceamento
+        """
+        return self.inserir_no(no, No(chave, valor))
+
+    def inserir_no(self, no, novo):
+        """
+        Insere um nó já criado recursivamente mantendo balanceamento AVL
+        Permite ao chamador manter uma referência ao nó inserido
+        
+        Args:
+            no (No | None): Nó raiz da subárvore
+            novo (No): Nó a ser inserido
+        
+        Returns:
+            No: Nova raiz da subárvore após inserção e balanceamento
+        """
+        self.versao += 1
+        return self._inserir_no(no, novo)
+
+    def _inserir_no(self, no, novo):
+        """Passo recursivo de inserir_no, sem incrementar a versão"""
+        chave = novo.chave
+        if not no:
+            return novo
+        elif chave < no.chave:
+            no.esquerda = self._inserir_no(no.esquerda, novo)
+        elif chave > no.chave:
+            no.direita = self._inserir_no(no.direita, novo)
+        else:
+            # Chave já existente: atualiza o valor sem criar um novo nó
+            no.valor = novo.valor
+            return no
+
+        no.altura = 1 + max(self.obter_altura(no.esquerda), self.obter_altura(no.direita))
+        no.tamanho = 1 + self.obter_tamanho(no.esquerda) + self.obter_tamanho(no.direita)
+        balanceamento = self.obter_balanceamento(no)
+
+        # Caso Esquerda-Esquerda
+        if balanceamento > 1 and chave < no.esquerda.chave:
+            return self.rotacionar_direita(no)
+        # Caso Direita-Direita
+        if balanceamento < -1 and chave > no.direita.chave:
+            return self.rotacionar_esquerda(no)
+        # Caso Esquerda-Direita
+        if balanceamento > 1 and chave > no.esquerda.chave:
+            no.esquerda = self.rotacionar_esquerda(no.esquerda)
+            return self.rotacionar_direita(no)
+        # Caso Direita-Esquerda
+        if balanceamento < -1 and chave < no.direita.chave:
+            no.direita = self.rotacionar_direita(no.direita)
+            return self.rotacionar_esquerda(no)
+
+        return no
+
+    def inserir_chave(self, chave, valor=None):
+        """
+        Método público para inserir na árvore
+        Versão iterativa: desce guardando o caminho em uma pilha explícita e
+        rebalanceia de baixo para cima, parando assim que a altura de uma
+        subárvore deixa de mudar
+        
+        Args:
+            chave (int): Chave a ser inserida
+            valor: Valor associado à chave
+        
+        Returns:
+            No: Nó que contém a chave (o existente, se a chave já estava na árvore)
+        """
+        caminho = []
+        no = self.raiz
+        while no is not None:
+            if chave < no.chave:
+                caminho.append(no)
+                no = no.esquerda
+            elif chave > no.chave:
+                caminho.append(no)
+                no = no.direita
+            else:
+                no.valor = valor
+                self.versao += 1
+                return no
+
+        self.versao += 1
+        novo = No(chave, valor)
+        if not caminho:
+            self.raiz = novo
+            return novo
+        pai = caminho[-1]
+        if chave < pai.chave:
+            pai.esquerda = novo
+        else:
+            pai.direita = novo
+        perfil = self.perfil
+        if perfil is not None:
+            perfil.iniciar_rebalanceamento(self)
+        self._rebalancear_caminho(caminho, 1)
+        if perfil is not None:
+            perfil.registrar_escrita(self, len(caminho) + 1)
+        return novo
+
+    def remover(self, no, chave):
+        """
+        Remove um nó recursivamente mantendo balanceamento AVL
+        Implementação de referência; remover_chave usa a versão iterativa
+        
+        Args:
+            no (No | None): Nó raiz da subárvore
+            chave (int): Chave do nó a ser removido
+        
+        Returns:
+            No | None: Nova raiz da subárvore após remoção e balanceamento
+        """
+        self.versao += 1
+        return self._remover(no, chave)
+
+    def _remover(self, no, chave):
+        """Passo recursivo de remover, sem incrementar a versão"""
+        if not no:
+            return no
+
+        if chave < no.chave:
+            no.esquerda = self._remover(no.esquerda, chave)
+        elif chave > no.chave:
+            no.direita = self._remover(no.direita, chave)
+        else:
+            # Nó com um filho ou sem filhos
+            if not no.esquerda:
+                temp = no.direita
+                no = None
+                return temp
+            elif not no.direita:
+                temp = no.esquerda
+                no = None
+                return temp
+
+            # Nó com dois filhos: o sucessor in-ordem assume a posição do nó.
+            # Os nós são religados em vez de terem chave/valor copiados, assim
+            # referências externas a um nó (ex.: índice por código) continuam válidas
+            sucessor = self.obter_no_minimo(no.direita)
+            sucessor.direita = self.remover_minimo(no.direita)
+            sucessor.esquerda = no.esquerda
+            no = sucessor
+
+        return self.balancear(no)
+
+    def balancear(self, no):
+        """
+        Atualiza a altura de um nó e aplica as rotações necessárias
+        
+        Args:
+            no (No): Nó raiz da subárvore
+        
+        Returns:
+            No: Nova raiz da subárvore após balanceamento
+        """
+        no.altura = 1 + max(self.obter_altura(no.esquerda), self.obter_altura(no.direita))
+        no.tamanho = 1 + self.obter_tamanho(no.esquerda) + self.obter_tamanho(no.direita)
+        balanceamento = self.obter_balanceamento(no)
+
+        # Caso Esquerda-Esquerda
+        if balanceamento > 1 and self.obter_balanceamento(no.esquerda) >= 0:
+            return self.rotacionar_direita(no)
+        # Caso Esquerda-Direita
+        if balanceamento > 1 and self.obter_balanceamento(no.esquerda) < 0:
+            no.esquerda = self.rotacionar_esquerda(no.esquerda)
+            return self.rotacionar_direita(no)
+        # Caso Direita-Direita
+        if balanceamento < -1 and self.obter_balanceamento(no.direita) <= 0:
+            return self.rotacionar_esquerda(no)
+        # Caso Direita-Esquerda
+        if balanceamento < -1 and self.obter_balanceamento(no.direita) > 0:
+            no.direita = self.rotacionar_direita(no.direita)
+            return self.rotacionar_esquerda(no)
+
+        return no
+
+    def remover_chave(self, chave):
+        """
+        Método público para remover da árvore
+        Versão iterativa com pilha explícita e parada antecipada do rebalanceamento
+        
+        Args:
+            chave (int): Chave a ser removida
+        
+        Returns:
+            No | None: Nó desligado da árvore ou None se a chave não existir
+        """
+        caminho = []
+        no = self.raiz
+        while no is not None:
+            if chave < no.chave:
+                caminho.append(no)
+                no = no.esquerda
+            elif chave > no.chave:
+                caminho.append(no)
+                no = no.direita
+            else:
+                break
+        if no is None:
+            return None
+
+        self.versao += 1
+        visitados = len(caminho) + 1
+        pai = caminho[-1] if caminho else None
+        if no.esquerda is None or no.direita is None:
+            # Nó com um filho ou sem filhos
+            filho = no.esquerda if no.esquerda is not None else no.direita
+            self._substituir_filho(pai, no, filho)
+        else:
+            # Nó com dois filhos: o sucessor in-ordem é religado na posição do nó
+            posicao = len(caminho)
+            caminho.append(no)
+            pai_sucessor = no
+            sucessor = no.direita
+            while sucessor.esquerda is not None:
+                caminho.append(sucessor)
+                pai_sucessor = sucessor
+                sucessor = sucessor.esquerda
+            if pai_sucessor is not no:
+                pai_sucessor.esquerda = sucessor.direita
+                sucessor.direita = no.direita
+            sucessor.esquerda = no.esquerda
+            # Herda altura e tamanho antigos para que a parada antecipada e o
+            # ajuste de tamanho dos ancestrais partam dos valores corretos
+            sucessor.altura = no.altura
+            sucessor.tamanho = no.tamanho
+            caminho[posicao] = sucessor
+            self._substituir_filho(pai, no, sucessor)
+
+        no.esquerda = no.direita = None
+        no.altura = 1
+        no.tamanho = 1
+        perfil = self.perfil
+        if perfil is not None:
+            perfil.iniciar_rebalanceamento(self)
+        self._rebalancear_caminho(caminho, -1)
+        if perfil is not None:
+            perfil.registrar_escrita(self, visitados)
+        return no
+
+    def _substituir_filho(self, pai, antigo, novo):
+        """
+        Troca o filho de um nó (ou a raiz, se pai for None)
+        
+        Args:
+            pai (No | None): Pai do nó substituído
+            antigo (No): Filho atual
+            novo (No | None): Novo filho
+        """
+        if pai is None:
+            self.raiz = novo
+        elif pai.esquerda is antigo:
+            pai.esquerda = novo
+        else:
+            pai.direita = novo
+
+    def _rebalancear_caminho(self, caminho, delta):
+        """
+        Rebalanceia os nós do caminho de baixo para cima após uma inserção ou
+        remoção. Para de rebalancear assim que uma subárvore mantém a altura
+        anterior, pois nesse caso nenhum ancestral muda de altura; daí em
+        diante apenas o tamanho dos ancestrais é ajustado.
+        
+        Args:
+            caminho (list[No]): Nós visitados da raiz até o pai do nó alterado
+            delta (int): Variação do número de nós (+1 inserção, -1 remoção)
+        """
+        i = len(caminho) - 1
+        while i >= 0:
+            no = caminho[i]
+            altura_anterior = no.altura
+            nova_raiz = self._rebalancear(no)
+            if nova_raiz is not no:
+                self._substituir_filho(caminho[i - 1] if i else None, no, nova_raiz)
+            i -= 1
+            if nova_raiz.altura == altura_anterior:
+                break
+        while i >= 0:
+            caminho[i].tamanho += delta
+            i -= 1
+
+    def _rebalancear(self, no):
+        """
+        Recalcula altura e tamanho de um nó e aplica a rotação necessária
+        Lê os campos diretamente dos nós, sem chamadas a obter_altura
+        
+        Args:
+            no (No): Nó a ser rebalanceado
+        
+        Returns:
+            No: Nova raiz da subárvore
+        """
+        esq = no.esquerda
+        dir_ = no.direita
+        h_esq = esq.altura if esq is not None else 0
+        h_dir = dir_.altura if dir_ is not None else 0
+        t_esq = esq.tamanho if esq is not None else 0
+        t_dir = dir_.tamanho if dir_ is not None else 0
+
+        if h_esq - h_dir > 1:
+            ee = esq.esquerda
+            ed = esq.direita
+            h_ee = ee.altura if ee is not None else 0
+            h_ed = ed.altura if ed is not None else 0
+            if h_ee >= h_ed:
+                # Caso Esquerda-Esquerda: rotação simples à direita
+                self.rotacoes_simples += 1
+                no.esquerda = ed
+                no.altura = (h_ed if h_ed > h_dir else h_dir) + 1
+                no.tamanho = t_esq - (ee.tamanho if ee is not None else 0) + t_dir
+                esq.direita = no
+                esq.altura = (h_ee if h_ee > no.altura else no.altura) + 1
+                esq.tamanho = t_esq + t_dir + 1
+                return esq
+            # Caso Esquerda-Direita: rotação dupla (ed sobe para a raiz)
+            self.rotacoes_duplas += 1
+            esq.direita = ed.esquerda
+            no.esquerda = ed.direita
+            h = esq.direita.altura if esq.direita is not None else 0
+            esq.altura = (h_ee if h_ee > h else h) + 1
+            esq.tamanho = 1 + (ee.tamanho if ee is not None else 0) + (esq.direita.tamanho if esq.direita is not None else 0)
+            h = no.esquerda.altura if no.esquerda is not None else 0
+            no.altura = (h if h > h_dir else h_dir) + 1
+            no.tamanho = 1 + (no.esquerda.tamanho if no.esquerda is not None else 0) + t_dir
+            ed.esquerda = esq
+            ed.direita = no
+            ed.altura = (esq.altura if esq.altura > no.altura else no.altura) + 1
+            ed.tamanho = t_esq + t_dir + 1
+            return ed
+
+        if h_dir - h_esq > 1:
+            dd = dir_.direita
+            de = dir_.esquerda
+            h_dd = dd.altura if dd is not None else 0
+            h_de = de.altura if de is not None else 0
+            if h_dd >= h_de:
+                # Caso Direita-Direita: rotação simples à esquerda
+                self.rotacoes_simples += 1
+                no.direita = de
+                no.altura = (h_de if h_de > h_esq else h_esq) + 1
+                no.tamanho = t_dir - (dd.tamanho if dd is not None else 0) + t_esq
+                dir_.esquerda = no
+                dir_.altura = (h_dd if h_dd > no.altura else no.altura) + 1
+                dir_.tamanho = t_esq + t_dir + 1
+                return dir_
+            # Caso Direita-Esquerda: rotação dupla (de sobe para a raiz)
+            self.rotacoes_duplas += 1
+            dir_.esquerda = de.direita
+            no.direita = de.esquerda
+            h = dir_.esquerda.altura if dir_.esquerda is not None else 0
+            dir_.altura = (h_dd if h_dd > h else h) + 1
+            dir_.tamanho = 1 + (dd.tamanho if dd is not None else 0) + (dir_.esquerda.tamanho if dir_.esquerda is not None else 0)
+            h = no.direita.altura if no.direita is not None else 0
+            no.altura = (h if h > h_esq else h_esq) + 1
+            no.tamanho = 1 + (no.direita.tamanho if no.direita is not None else 0) + t_esq
+            de.direita = dir_
+            de.esquerda = no
+            de.altura = (dir_.altura if dir_.altura > no.altura else no.altura) + 1
+            de.tamanho = t_esq + t_dir + 1
+            return de
+
+        no.altura = (h_esq if h_esq > h_dir else h_dir) + 1
+        no.tamanho = t_esq + t_dir + 1
+        return no
+
+    def remover_minimo(self, no):
+        """
+        Desliga o nó de menor chave de uma subárvore mantendo balanceamento AVL
+        
+        Args:
+            no (No): Raiz da subárvore
+        
+        Returns:
+            No | None: Nova raiz da subárvore sem o nó mínimo
+        """
+        if not no.esquerda:
+            return no.direita
+        no.esquerda = self.remover_minimo(no.esquerda)
+        return self.balancear(no)
+
+    def obter_no_minimo(self, no):
+        """
+        Encontra o nó com menor chave em uma subárvore
+        
+        Args:
+            no (No): Raiz da subárvore
+        
+        Returns:
+            No: Nó com menor chave (mais à esquerda)
+        """
+        atual = no
+        while atual.esquerda is not None:
+            atual = atual.esquerda
+        return atual
+
+    def obter_no_maximo(self, no):
+        """
+        Encontra o nó com maior chave em uma subárvore
+        
+        Args:
+            no (No): Raiz da subárvore
+        
+        Returns:
+            No: Nó com maior chave (mais à direita)
+        """
+        atual = no
+        while atual.direita is not None:
+            atual = atual.direita
+        return atual
+
+    def buscar(self, no, chave):
+        """
+        Busca iterativa por uma chave na árvore
+        Complexidade: O(log n)
+        
+        Args:
+            no (No | None): Raiz da subárvore
+            chave (int): Chave a ser buscada
+        
+        Returns:
+            No | None: Nó encontrado ou None
+        """
+        if self.perfil is not None:
+            return self._buscar_com_perfil(no, chave)
+        while no is not None:
+            if chave < no.chave:
+                no = no.esquerda
+            elif chave > no.chave:
+                no = no.direita
+            else:
+                return no
+        return None
+
+    def _buscar_com_perfil(self, no, chave):
+        """
+        Mesma busca de buscar(), registrando no perfil os nós visitados
+        
+        Args:
+            no (No | None): Raiz da subárvore
+            chave (int): Chave a ser buscada
+        
+        Returns:
+            No | None: Nó encontrado ou None
+        """
+        visitados = 0
+        while no is not None:
+            visitados += 1
+            if chave < no.chave:
+                no = no.esquerda
+            elif chave > no.chave:
+                no = no.direita
+            else:
+                break
+        self.perfil.registrar_busca(visitados)
+        return no
+
+    def buscar_chave(self, chave):
+        """
+        Método público para buscar uma chave a partir da raiz
+        
+        Args:
+            chave (int): Chave a ser buscada
+        
+        Returns:
+            No | None: Nó encontrado ou None
+        """
+        return self.buscar(self.raiz, chave)
+
+    def contar_menores(self, chave, inclusivo=False):
+        """
+        Conta as chaves menores que a chave informada (posição da chave)
+        Complexidade: O(log n) usando o tamanho das subárvores
+        
+        Args:
+            chave: Chave de referência
+            inclusivo (bool): Se chaves iguais também devem ser contadas
+        
+        Returns:
+            int: Quantidade de chaves menores (ou menores ou iguais)
+        """
+        total = 0
+        no = self.raiz
+        while no is not None:
+            if no.chave < chave or (inclusivo and no.chave == chave):
+                total += 1 + (no.esquerda.tamanho if no.esquerda is not None else 0)
+                no = no.direita
+            else:
+                no = no.esquerda
+        return total
+
+    def contar_intervalo(self, inicio=None, fim=None):
+        """
+        Conta as chaves no intervalo fechado [inicio, fim]
+        Complexidade: O(log n)
+        
+        Args:
+            inicio: Menor chave do intervalo (None para sem limite)
+            fim: Maior chave do intervalo (None para sem limite)
+        
+        Returns:
+            int: Quantidade de chaves no intervalo
+        """
+        total = self.obter_tamanho(self.raiz)
+        if fim is not None:
+            total = self.contar_menores(fim, inclusivo=True)
+        if inicio is not None:
+            total -= self.contar_menores(inicio)
+        return max(total, 0)
+
+    def selecionar(self, posicao):
+        """
+        Encontra o nó com a k-ésima menor chave
+        Complexidade: O(log n)
+        
+        Args:
+            posicao (int): Posição na ordem crescente, começando em 0
+        
+        Returns:
+            No | None: Nó na posição ou None se estiver fora da árvore
+        """
+        if posicao < 0 or posicao >= self.obter_tamanho(self.raiz):
+            return None
+        no = self.raiz
+        while no is not None:
+            t_esq = no.esquerda.tamanho if no.esquerda is not None else 0
+            if posicao < t_esq:
+                no = no.esquerda
+            elif posicao == t_esq:
+                return no
+            else:
+                posicao -= t_esq + 1
+                no = no.direita
+        return None
+
+    def iterar_nos(self, inicio=None, inclusivo=True):
+        """
+        Percorre os nós em ordem crescente de chave sem recursão
+        Com uma chave de início, a pilha é montada em O(log n) descendo até a
+        primeira chave do intervalo, e cada nó seguinte custa O(1) amortizado
+        (O(log n + k) para k nós)
+        
+        Args:
+            inicio: Chave a partir da qual percorrer (None para o início)
+            inclusivo (bool): Se a própria chave de início deve ser incluída
+        
+        Yields:
+            No: Nós da árvore em ordem (esquerda → raiz → direita)
+        """
+        pilha = []
+        no = self.raiz
+        if inicio is not None:
+            # Empilha apenas os nós com chave dentro do intervalo; as subárvores
+            # à esquerda deles (chaves menores) são descartadas
+            while no is not None:
+                if no.chave > inicio or (inclusivo and no.chave == inicio):
+                    pilha.append(no)
+                    no = no.esquerda
+                else:
+                    no = no.direita
+        while pilha or no is not None:
+            while no is not None:
+                pilha.append(no)
+                no = no.esquerda
+            no = pilha.pop()
+            yield no
+            no = no.direita
+
+    def iterar_intervalo(self, inicio=None, fim=None, inclusivo=True):
+        """
+        Percorre em ordem apenas as chaves entre inicio e fim
+        Subárvores fora do intervalo não são visitadas: O(log n + k)
+        
+        Args:
+            inicio: Menor chave do intervalo (None para sem limite)
+            fim: Maior chave do intervalo, inclusiva (None para sem limite)
+            inclusivo (bool): Se a própria chave de início deve ser incluída
+        
+        Yields:
+            No: Nós do intervalo em ordem crescente de chave
+        """
+        for no in self.iterar_nos(inicio, inclusivo):
+            if fim is not None and no.chave > fim:
+                return
+            yield no
+
+    def construir_balanceada(self, nos):
+        """
+        Liga uma lista de nós já ordenada por chave em uma árvore
+        perfeitamente balanceada, substituindo o conteúdo atual
+        Complexidade: O(n)
+        
+        Args:
+            nos (list[No]): Nós em ordem estritamente crescente de chave
+        """
+        def construir(inicio, fim):
+            if inicio > fim:
+                return None
+            meio = (inicio + fim) // 2
+            no = nos[meio]
+            no.esquerda = construir(inicio, meio - 1)
+            no.direita = construir(meio + 1, fim)
+            h_esq = no.esquerda.altura if no.esquerda is not None else 0
+            h_dir = no.direita.altura if no.direita is not None else 0
+            no.altura = (h_esq if h_esq > h_dir else h_dir) + 1
+            no.tamanho = fim - inicio + 1
+            return no
+
+        self.versao += 1
+        self.raiz = construir(0, len(nos) - 1)
+
+    def _nos_do_lote(self, itens):
+        """
+        Ordena um lote e cria um nó por chave
+        
+        Args:
+            itens (iterable): Pares (chave, valor); chaves repetidas mantêm o
+                último valor informado
+        
+        Returns:
+            list[No]: Nós novos em ordem estritamente crescente de chave
+        """
+        # Ordenação estável: para chaves iguais, o último item vence
+        lote = sorted(itens, key=itemgetter(0))
+        novos = []
+        for chave, valor in lote:
+            if novos and novos[-1].chave == chave:
+                novos[-1].valor = valor
+            else:
+                novos.append(No(chave, valor))
+        return novos
+
+    def inserir_lote(self, itens):
+        """
+        Insere vários pares (chave, valor) de uma vez
+        Ordena o lote e intercala com os nós existentes (percurso em ordem),
+        reconstruindo a árvore balanceada de baixo para cima em O(n + m).
+        Chaves repetidas mantêm o último valor informado.
+        
+        Args:
+            itens (iterable): Pares (chave, valor)
+        
+        Returns:
+            list[No]: Nós que contêm as chaves do lote, em ordem de chave
+        """
+        novos = self._nos_do_lote(itens)
+        if not novos:
+            return []
+        if self.raiz is None:
+            self.construir_balanceada(novos)
+            return novos
+
+        # Intercala os nós existentes com os novos, reaproveitando os nós
+        # existentes quando a chave já está na árvore
+        resultado = []
+        intercalados = []
+        i = 0
+        for existente in self.iterar_nos():
+            while i < len(novos) and novos[i].chave < existente.chave:
+                intercalados.append(novos[i])
+                resultado.append(novos[i])
+                i += 1
+            if i < len(novos) and novos[i].chave == existente.chave:
+                existente.valor = novos[i].valor
+                resultado.append(existente)
+                i += 1
+            intercalados.append(existente)
+        intercalados.extend(novos[i:])
+        resultado.extend(novos[i:])
+        self.construir_balanceada(intercalados)
+        return resultado
+
+    def aplicar_lote(self, itens, remocoes=()):
+        """
+        Insere, substitui e remove várias chaves em uma única passada
+        Intercala o lote ordenado com o percurso em ordem, descartando as
+        chaves removidas, e reconstrói a árvore balanceada em O(n + m) em vez
+        de rebalancear o caminho de cada chave. As remoções valem antes das
+        inserções: uma chave presente nas duas fica com o valor dos itens.
+        
+        Args:
+            itens (iterable): Pares (chave, valor) a inserir ou substituir
+            remocoes (iterable): Chaves a remover (as ausentes são ignoradas)
+        
+        Returns:
+            int: Quantidade de nós removidos
+        """
+        novos = self._nos_do_lote(itens)
+        removidas = set(remocoes)
+        intercalados = []
+        removidos = 0
+        i = 0
+        for existente in self.iterar_nos():
+            while i < len(novos) and novos[i].chave < existente.chave:
+                intercalados.append(novos[i])
+                i += 1
+            if i < len(novos) and novos[i].chave == existente.chave:
+                existente.valor = novos[i].valor
+                i += 1
+            elif existente.chave in removidas:
+                removidos += 1
+                continue
+            intercalados.append(existente)
+        intercalados.extend(novos[i:])
+        self.construir_balanceada(intercalados)
+        return removidos
+
+    def percorrer_em_ordem(self, no=None):
+        """
+        Percorre a árvore em ordem (esquerda → raiz → direita)
+        Imprime as chaves em ordem crescente
+        """
+        if self.raiz is None:
+            print("Árvore vazia")
+            return
+
+        def _em_ordem(n):
+            if n:
+                _em_ordem(n.esquerda)
+                print(n.chave, end=" ")
+                _em_ordem(n.direita)
+
+        _em_ordem(self.raiz)
+
+    def gerar_mermaid(self, no=None, profundidade=None):
+        """
+        Gera representação da árvore em formato Mermaid
+        Exibe informações do produto em cada nó. O diagrama fica em cache
+        até a próxima alteração da árvore, identificada pelo contador de versão
+        
+        Args:
+            no (No | None): Raiz da subárvore (usa self.raiz se None)
+            profundidade (int | None): Níveis desenhados abaixo da raiz; as
+                subárvores cortadas aparecem como um único nó resumo
+        
+        Returns:
+            str: String em formato Mermaid com sintaxe graph TD
+        """
+        if no is None:
+            no = self.raiz
+        
+        if no is None:
+            return "graph TD;\nVazio[\"Árvore Vazia\"]"
+
+        if self._versao_cache != self.versao:
+            self._cache_mermaid.clear()
+            self._versao_cache = self.versao
+        chave_cache = (no.chave, profundidade)
+        resultado = self._cache_mermaid.get(chave_cache)
+        if resultado is None:
+            if len(self._cache_mermaid) >= self.LIMITE_CACHE_MERMAID:
+                self._cache_mermaid.clear()
+            resultado = self._renderizar_mermaid(no, profundidade)
+            self._cache_mermaid[chave_cache] = resultado
+        return resultado
+
+    def _renderizar_mermaid(self, no, profundidade):
+        """
+        Monta o diagrama Mermaid de uma subárvore em pré-ordem, sem recursão
+        
+        Args:
+            no (No): Raiz da subárvore
+            profundidade (int | None): Níveis desenhados abaixo da raiz
+        
+        Returns:
+            str: String em formato Mermaid com sintaxe graph TD
+        """
+        nos = []
+        arestas = []
+        classes_usadas = {"produto"}
+
+        def get_id(n):
+            # Usa o código do produto como ID do nó se disponível, senão usa a chave formatada
+            if n.valor and hasattr(n.valor, 'codigo'):
+                return f"Node{n.valor.codigo}"
+            return "Node" + re.sub(r"\W", "_", str(n.chave))
+
+        def rotulo(n):
+            if not n.valor:
+                return str(n.chave)
+            # Limita o nome a 20 caracteres
+            nome = n.valor.nome[:20] + "..." if len(n.valor.nome) > 20 else n.valor.nome
+            nome = nome.replace('"', "#quot;")
+            preco = f"R$ {n.valor.preco:.2f}"
+            # Mostra o ID e o Preço (que é a chave agora)
+            return f"ID: {n.valor.codigo}<br/>{nome}<br/>{preco}<br/>Qtd: {n.valor.quantidade}"
+
+        pilha = [(no, 0)]
+        while pilha:
+            n, nivel = pilha.pop()
+            node_id = get_id(n)
+            nos.append(f'    {node_id}["{rotulo(n)}"]:::produto')
+            filhos = [filho for filho in (n.esquerda, n.direita) if filho]
+            if not filhos:
+                continue
+            if profundidade is not None and nivel >= profundidade:
+                # Subárvores abaixo do limite viram um nó resumo
+                resumo_id = f"{node_id}_oculto"
+                nos.append(f'    {resumo_id}["+{n.tamanho - 1} nós"]:::oculto')
+                arestas.append(f"    {node_id} -.-> {resumo_id}")
+                classes_usadas.add("oculto")
+                continue
+            for filho in filhos:
+                arestas.append(f"    {node_id} --> {get_id(filho)}")
+            # Empilha a direita primeiro para visitar a esquerda antes (pré-ordem)
+            for filho in reversed(filhos):
+                pilha.append((filho, nivel + 1))
+
+        estilos = [
+            f"    classDef {classe} {estilo}"
+            for classe, estilo in self.CLASSES_MERMAID.items() if classe in classes_usadas
+        ]
+        return "graph TD;\n" + "\n".join(nos + [""] + arestas + [""] + estilos)
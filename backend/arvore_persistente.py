@@ -0,0 +1,430 @@
+"""
+Módulo de Árvore AVL Persistente
+Variante da AVL em que os nós publicados nunca são alterados: cada
+alteração copia apenas o caminho da raiz até o ponto modificado e gera uma
+nova raiz, compartilhando todo o resto com as versões anteriores
+"""
+
+from arvore_avl import ArvoreAVL
+from no import No
+
+
+class Instantaneo(ArvoreAVL):
+    """
+    Visão somente leitura de uma versão publicada da árvore persistente
+    Herda as consultas da ArvoreAVL (busca, intervalos, posição, Mermaid),
+    que podem rodar sem trava porque nenhum nó da versão muda depois de
+    publicado. Não deve ser alterada.
+    """
+
+    def __init__(self, raiz, versao, dados=None):
+        """
+        Inicializa a visão de uma versão
+        
+        Args:
+            raiz (No | None): Raiz da versão
+            versao (int): Número da versão
+            dados (dict | None): Informações do dono da árvore associadas à
+                versão (ex.: agregados do catálogo naquele momento)
+        """
+        super().__init__()
+        self.raiz = raiz
+        self.versao = versao
+        self.dados = dados
+
+
+class ArvoreAVLPersistente(ArvoreAVL):
+    """
+    Árvore AVL persistente por cópia de caminho
+    inserir_chave, remover_chave e inserir_lote nunca alteram nós publicados:
+    copiam os O(log n) nós do caminho (e os poucos tocados pelas rotações)
+    e trocam a raiz. Nós criados depois da última publicação ainda não são
+    vistos por nenhum leitor, então alterações seguidas antes de publicar
+    (ex.: um lote de reservas) reaproveitam as cópias em vez de copiá-las
+    de novo. publicar() registra a raiz atual como uma versão
+    imutável; as últimas max_versoes ficam disponíveis para leituras em um
+    ponto no tempo e para restauração.
+    
+    Lotes pequenos também copiam só os caminhos das suas chaves. Um lote
+    grande remonta a árvore inteira com nós novos, e a versão anterior
+    deixa de compartilhar nós com ela: cada versão assim conta como uma
+    cópia completa, e só as que estão entre as últimas max_copias_completas
+    são mantidas (as versões mais antigas que elas são descartadas), o que
+    limita a memória a cerca de max_copias_completas + 1 árvores inteiras.
+    
+    As escritas devem ser serializadas pelo chamador. Leitores usam apenas
+    o atributo atual (ou versoes), trocado de forma atômica na publicação.
+    Os métodos recursivos de referência (inserir, remover) alteram os nós
+    e não devem ser usados nesta árvore.
+    """
+
+    def __init__(self, max_versoes=64, max_copias_completas=4):
+        """
+        Inicializa uma árvore persistente vazia, com a versão 0 publicada
+        
+        Args:
+            max_versoes (int): Quantidade de versões mantidas para consulta
+            max_copias_completas (int): Quantidade de versões mantidas que
+                remontaram a árvore inteira (lotes grandes); pelo menos 1
+        """
+        super().__init__()
+        self.max_versoes = max_versoes
+        self.max_copias_completas = max(1, max_copias_completas)
+        # versão → Instantaneo, da mais antiga para a mais recente
+        self.versoes = {}
+        self.atual = None
+        # Nós criados desde a última publicação (alteráveis sem cópia)
+        self._novos = set()
+        # Se a árvore foi remontada desde a última publicação e quantas das
+        # versões mantidas foram
+        self._copia_completa = False
+        self._copias_mantidas = 0
+        self.publicar()
+
+    def publicar(self, dados=None):
+        """
+        Publica a raiz atual como uma nova versão imutável
+        Versões além de max_versoes são descartadas, da mais antiga para a
+        mais nova; os nós exclusivos delas são liberados pelo coletor
+        
+        Args:
+            dados (dict | None): Informações associadas à versão
+        
+        Returns:
+            Instantaneo: Versão publicada
+        """
+        instantaneo = Instantaneo(self.raiz, self.versao, dados)
+        # As buscas nas versões publicadas alimentam o mesmo perfil
+        instantaneo.perfil = self.perfil
+        instantaneo.copia_completa = self._copia_completa
+        self.versoes[self.versao] = instantaneo
+        self._copias_mantidas += self._copia_completa
+        while len(self.versoes) > self.max_versoes or self._copias_mantidas > self.max_copias_completas:
+            descartada = self.versoes.pop(next(iter(self.versoes)))
+            self._copias_mantidas -= descartada.copia_completa
+        self.atual = instantaneo
+        self._novos = set()
+        self._copia_completa = False
+        return instantaneo
+
+    def obter_versao(self, versao=None):
+        """
+        Obtém uma versão publicada
+        
+        Args:
+            versao (int | None): Número da versão (None para a mais recente)
+        
+        Returns:
+            Instantaneo | None: Versão pedida ou None se não estiver mais disponível
+        """
+        if versao is None:
+            return self.atual
+        return self.versoes.get(versao)
+
+    def restaurar(self, instantaneo):
+        """
+        Torna a raiz de uma versão anterior a raiz atual, em O(1)
+        A restauração gera uma nova versão; as intermediárias continuam
+        disponíveis até serem descartadas
+        
+        Args:
+            instantaneo (Instantaneo): Versão a restaurar
+        """
+        self.raiz = instantaneo.raiz
+        self.versao += 1
+        self._novos = set()
+
+    def _copiar(self, no):
+        """
+        Cria uma cópia rasa de um nó (mesmos filhos, altura e tamanho)
+        Um nó criado depois da última publicação é devolvido sem cópia
+        
+        Args:
+            no (No): Nó a copiar
+        
+        Returns:
+            No: Cópia que pode ser alterada livremente
+        """
+        if no in self._novos:
+            return no
+        # Dispensa o __init__, que apenas seria sobrescrito
+        copia = No.__new__(No)
+        copia.chave = no.chave
+        copia.valor = no.valor
+        copia.esquerda = no.esquerda
+        copia.direita = no.direita
+        copia.altura = no.altura
+        copia.tamanho = no.tamanho
+        self._novos.add(copia)
+        return copia
+
+    def _rebalancear_copia(self, no):
+        """
+        Rebalanceia um nó recém-copiado sem alterar nós compartilhados
+        Antes de uma rotação, copia o filho (e, na rotação dupla, o neto)
+        que ela vai religar; o restante fica compartilhado
+        
+        Args:
+            no (No): Cópia a rebalancear
+        
+        Returns:
+            No: Nova raiz da subárvore
+        """
+        h_esq = no.esquerda.altura if no.esquerda is not None else 0
+        h_dir = no.direita.altura if no.direita is not None else 0
+        if h_esq - h_dir > 1:
+            esq = no.esquerda = self._copiar(no.esquerda)
+            h_ee = esq.esquerda.altura if esq.esquerda is not None else 0
+            h_ed = esq.direita.altura if esq.direita is not None else 0
+            if h_ee < h_ed:
+                esq.direita = self._copiar(esq.direita)
+        elif h_dir - h_esq > 1:
+            dir_ = no.direita = self._copiar(no.direita)
+            h_dd = dir_.direita.altura if dir_.direita is not None else 0
+            h_de = dir_.esquerda.altura if dir_.esquerda is not None else 0
+            if h_dd < h_de:
+                dir_.esquerda = self._copiar(dir_.esquerda)
+        return self._rebalancear(no)
+
+    def _copiar_caminho(self, caminho, chave, novo, delta):
+        """
+        Copia o caminho de baixo para cima, religando cada cópia à subárvore
+        nova abaixo dela. Rebalanceia até que uma subárvore mantenha a altura
+        anterior; daí em diante só ajusta o tamanho das cópias.
+        
+        Args:
+            caminho (list[No]): Nós da raiz até o pai da subárvore substituída
+            chave: Chave usada na descida (define o lado de cada filho)
+            novo (No | None): Nova subárvore no lugar do fim do caminho
+            delta (int): Variação do número de nós (+1, -1 ou 0)
+        
+        Returns:
+            No | None: Raiz da nova versão do caminho
+        """
+        parado = delta == 0
+        for no in reversed(caminho):
+            # A cópia pode ser o próprio nó: guarda a altura antes de alterá-la
+            altura = no.altura
+            copia = self._copiar(no)
+            if chave < no.chave:
+                copia.esquerda = novo
+            else:
+                copia.direita = novo
+            if parado:
+                copia.tamanho += delta
+            else:
+                copia = self._rebalancear_copia(copia)
+                parado = copia.altura == altura
+            novo = copia
+        return novo
+
+    def inserir_chave(self, chave, valor=None):
+        """
+        Insere ou substitui uma chave copiando apenas o caminho até ela
+        Complexidade: O(log n) em tempo e em nós novos
+        
+        Args:
+            chave: Chave a ser inserida
+            valor: Valor associado à chave
+        
+        Returns:
+            No: Nó que contém a chave na nova versão
+        """
+        caminho = []
+        no = self.raiz
+        while no is not None:
+            if chave < no.chave:
+                caminho.append(no)
+                no = no.esquerda
+            elif chave > no.chave:
+                caminho.append(no)
+                no = no.direita
+            else:
+                break
+
+        if no is not None:
+            # Chave já existente: nova cópia do nó com o novo valor
+            novo = self._copiar(no)
+            novo.valor = valor
+            delta = 0
+        else:
+            novo = No(chave, valor)
+            self._novos.add(novo)
+            delta = 1
+        perfil = self.perfil
+        if perfil is not None:
+            perfil.iniciar_rebalanceamento(self)
+        self.raiz = self._copiar_caminho(caminho, chave, novo, delta)
+        if perfil is not None:
+            perfil.registrar_escrita(self, len(caminho) + 1)
+        self.versao += 1
+        return novo
+
+    def remover_chave(self, chave):
+        """
+        Remove uma chave copiando apenas o caminho até ela (e até o sucessor)
+        Complexidade: O(log n) em tempo e em nós novos
+        
+        Args:
+            chave: Chave a ser removida
+        
+        Returns:
+            No | None: Nó removido (ainda presente nas versões anteriores)
+                ou None se a chave não existir
+        """
+        caminho = []
+        no = self.raiz
+        while no is not None:
+            if chave < no.chave:
+                caminho.append(no)
+                no = no.esquerda
+            elif chave > no.chave:
+                caminho.append(no)
+                no = no.direita
+            else:
+                break
+        if no is None:
+            return None
+
+        perfil = self.perfil
+        if perfil is not None:
+            perfil.iniciar_rebalanceamento(self)
+        if no.esquerda is None or no.direita is None:
+            substituto = no.esquerda if no.esquerda is not None else no.direita
+        else:
+            # Dois filhos: o sucessor in-ordem sai da subárvore direita e uma
+            # cópia dele ocupa a posição do nó removido
+            caminho_sucessor = [no]
+            sucessor = no.direita
+            while sucessor.esquerda is not None:
+                caminho_sucessor.append(sucessor)
+                sucessor = sucessor.esquerda
+            if len(caminho_sucessor) == 1:
+                direita = sucessor.direita
+            else:
+                direita = self._copiar_caminho(caminho_sucessor[1:], sucessor.chave, sucessor.direita, -1)
+            substituto = self._copiar(sucessor)
+            substituto.esquerda = no.esquerda
+            substituto.direita = direita
+            substituto = self._rebalancear_copia(substituto)
+        self.raiz = self._copiar_caminho(caminho, chave, substituto, -1)
+        if perfil is not None:
+            perfil.registrar_escrita(self, len(caminho) + 1)
+        self.versao += 1
+        return no
+
+    def _lote_por_caminhos(self, tamanho):
+        """
+        Decide se um lote de alterações deve copiar só os caminhos das suas
+        chaves: cerca de altura nós novos por chave, contra um nó por chave
+        da árvore inteira ao remontá-la
+        
+        Args:
+            tamanho (int): Quantidade de chaves alteradas pelo lote
+        
+        Returns:
+            bool: Se copiar os caminhos cria menos nós que remontar a árvore
+        """
+        return self.raiz is not None and tamanho * self.raiz.altura < self.raiz.tamanho
+
+    def _remontar(self, nos):
+        """
+        Substitui a árvore por uma balanceada com os nós informados, todos
+        novos; a versão publicada com ela conta como cópia completa se a
+        árvore anterior não estava vazia
+        
+        Args:
+            nos (list[No]): Nós novos em ordem estritamente crescente de chave
+        """
+        if self.raiz is not None:
+            self._copia_completa = True
+        self.construir_balanceada(nos)
+
+    def inserir_lote(self, itens):
+        """
+        Insere vários pares (chave, valor) de uma vez
+        Um lote pequeno perto do tamanho da árvore copia só os caminhos das
+        suas chaves, em O(m log n). Um lote grande é intercalado com a
+        versão atual e monta uma árvore balanceada só com nós novos, em
+        O(n + m). Nos dois casos a versão anterior continua intacta (útil
+        para desfazer uma carga inteira) e a versão avança uma vez.
+        Chaves repetidas mantêm o último valor informado.
+        
+        Args:
+            itens (iterable): Pares (chave, valor)
+        
+        Returns:
+            list[No]: Nós que contêm as chaves do lote, em ordem de chave
+        """
+        novos = self._nos_do_lote(itens)
+        if not novos:
+            return []
+        if self._lote_por_caminhos(len(novos)):
+            versao = self.versao
+            # Os nós copiados no lote ficam em _novos: os seguintes os alteram
+            # sem copiar de novo, então os nós devolvidos seguem na árvore
+            nos = [self.inserir_chave(no.chave, no.valor) for no in novos]
+            self.versao = versao + 1
+            return nos
+
+        intercalados = []
+        i = 0
+        for existente in self.iterar_nos():
+            while i < len(novos) and novos[i].chave < existente.chave:
+                intercalados.append(novos[i])
+                i += 1
+            if i < len(novos) and novos[i].chave == existente.chave:
+                intercalados.append(novos[i])
+                i += 1
+            else:
+                intercalados.append(No(existente.chave, existente.valor))
+        intercalados.extend(novos[i:])
+        self._remontar(intercalados)
+        return novos
+
+    def aplicar_lote(self, itens, remocoes=()):
+        """
+        Insere, substitui e remove várias chaves em uma única passada
+        Como inserir_lote, copia só os caminhos das chaves em um lote pequeno
+        e monta uma árvore balanceada só com nós novos em um lote grande,
+        sem alterar a versão anterior. As remoções valem antes das
+        inserções: uma chave presente nas duas fica com o valor dos itens.
+        
+        Args:
+            itens (iterable): Pares (chave, valor) a inserir ou substituir
+            remocoes (iterable): Chaves a remover (as ausentes são ignoradas)
+        
+        Returns:
+            int: Quantidade de nós removidos
+        """
+        novos = self._nos_do_lote(itens)
+        removidas = set(remocoes)
+        if self._lote_por_caminhos(len(novos) + len(removidas)):
+            versao = self.versao
+            substituidas = {no.chave for no in novos}
+            removidos = 0
+            for chave in removidas - substituidas:
+                if self.remover_chave(chave) is not None:
+                    removidos += 1
+            for no in novos:
+                self.inserir_chave(no.chave, no.valor)
+            self.versao = versao + 1
+            return removidos
+
+        intercalados = []
+        removidos = 0
+        i = 0
+        for existente in self.iterar_nos():
+            while i < len(novos) and novos[i].chave < existente.chave:
+                intercalados.append(novos[i])
+                i += 1
+            if i < len(novos) and novos[i].chave == existente.chave:
+                intercalados.append(novos[i])
+                i += 1
+            elif existente.chave in removidas:
+                removidos += 1
+            else:
+                intercalados.append(No(existente.chave, existente.valor))
+        intercalados.extend(novos[i:])
+        self._remontar(intercalados)
+        return removidos
@@ -0,0 +1,130 @@
+"""
+Microbenchmark do motor iterativo da ArvoreAVL
+Compara operações por segundo das versões iterativas (inserir_chave,
+remover_chave, buscar) com as versões recursivas (inserir, remover e a
+busca recursiva original)
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_arvore_iterativa.py --tamanhos 10000 100000 1000000
+"""
+
+import argparse
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from arvore_avl import ArvoreAVL
+
+
+def buscar_recursivo(no, chave):
+    """
+    Busca recursiva original da ArvoreAVL
+    
+    Args:
+        no (No | None): Raiz da subárvore
+        chave: Chave a ser buscada
+        
+    Returns:
+        No | None: Nó encontrado ou None
+    """
+    if not no or no.chave == chave:
+        return no
+    elif chave < no.chave:
+        return buscar_recursivo(no.esquerda, chave)
+    else:
+        return buscar_recursivo(no.direita, chave)
+
+
+def cronometrar(funcao, chaves):
+    """
+    Executa uma operação para cada chave e calcula a vazão
+    
+    Args:
+        funcao (callable): Operação que recebe uma chave
+        chaves (list): Chaves a processar
+        
+    Returns:
+        float: Operações por segundo
+    """
+    inicio = time.perf_counter()
+    for chave in chaves:
+        funcao(chave)
+    return len(chaves) / (time.perf_counter() - inicio)
+
+
+def medir_recursivo(chaves, buscas, remocoes):
+    """
+    Mede a implementação recursiva de referência (inserir, remover e uma
+    busca recursiva pela raiz)
+    
+    Args:
+        chaves (list): Chaves inseridas, na ordem de inserção
+        buscas (list): Chaves buscadas
+        remocoes (list): Chaves removidas, na ordem de remoção
+        
+    Returns:
+        dict: Operações por segundo de inserir, buscar e remover
+    """
+    arvore = ArvoreAVL()
+
+    def inserir(chave):
+        arvore.raiz = arvore.inserir(arvore.raiz, chave, chave)
+
+    def remover(chave):
+        arvore.raiz = arvore.remover(arvore.raiz, chave)
+
+    return {
+        "inserir": cronometrar(inserir, chaves),
+        "buscar": cronometrar(lambda c: buscar_recursivo(arvore.raiz, c), buscas),
+        "remover": cronometrar(remover, remocoes),
+    }
+
+
+def medir_iterativo(chaves, buscas, remocoes):
+    """
+    Mede a implementação iterativa (inserir_chave, buscar_chave e remover_chave)
+    
+    Args:
+        chaves (list): Chaves inseridas, na ordem de inserção
+        buscas (list): Chaves buscadas
+        remocoes (list): Chaves removidas, na ordem de remoção
+        
+    Returns:
+        dict: Operações por segundo de inserir, buscar e remover
+    """
+    arvore = ArvoreAVL()
+    return {
+        "inserir": cronometrar(lambda c: arvore.inserir_chave(c, c), chaves),
+        "buscar": cronometrar(arvore.buscar_chave, buscas),
+        "remover": cronometrar(arvore.remover_chave, remocoes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[10000, 100000, 1000000])
+    parser.add_argument("--ordem", choices=["aleatoria", "crescente"], default="aleatoria")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    gerador = random.Random(args.semente)
+    print(f"{'n':>9} {'operação':>9} {'recursivo (op/s)':>18} {'iterativo (op/s)':>18} {'ganho':>7}")
+    for tamanho in args.tamanhos:
+        chaves = list(range(tamanho))
+        if args.ordem == "aleatoria":
+            gerador.shuffle(chaves)
+        buscas = gerador.sample(chaves, len(chaves))
+        remocoes = gerador.sample(chaves, len(chaves))
+
+        recursivo = medir_recursivo(chaves, buscas, remocoes)
+        iterativo = medir_iterativo(chaves, buscas, remocoes)
+        for operacao in ("inserir", "buscar", "remover"):
+            r, i = recursivo[operacao], iterativo[operacao]
+            print(f"{tamanho:>9} {operacao:>9} {r:>18,.0f} {i:>18,.0f} {i / r:>6.2f}x")
+
+
+if __name__ == "__main__":
+    main()
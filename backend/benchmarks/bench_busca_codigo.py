@@ -0,0 +1,109 @@
+"""
+Benchmark da busca de produtos por código
+Compara o índice secundário do catálogo com a varredura recursiva da árvore
+(implementação anterior de CatalogoProdutosAVL.buscar_produto)
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_busca_codigo.py --tamanhos 10000 100000 500000
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalogo_produtos_avl import CatalogoProdutosAVL
+from modelo import CategoriaEnum, Produto
+
+
+def busca_linear(raiz, codigo):
+    """
+    Varredura recursiva da árvore ordenada por preço (antiga busca por código)
+    
+    Args:
+        raiz (No | None): Raiz da árvore
+        codigo (int): Código do produto a buscar
+        
+    Returns:
+        Produto | None: Produto encontrado ou None
+    """
+    def buscar_recursivo(no):
+        if not no:
+            return None
+        if no.valor and no.valor.codigo == codigo:
+            return no.valor
+        res_esq = buscar_recursivo(no.esquerda)
+        if res_esq:
+            return res_esq
+        return buscar_recursivo(no.direita)
+
+    return buscar_recursivo(raiz)
+
+
+def montar_catalogo(tamanho, gerador):
+    """
+    Cria um catálogo com produtos sintéticos de preços aleatórios
+    
+    Args:
+        tamanho (int): Quantidade de produtos
+        gerador (random.Random): Gerador de números aleatórios
+        
+    Returns:
+        CatalogoProdutosAVL: Catálogo preenchido
+    """
+    catalogo = CatalogoProdutosAVL()
+    categorias = list(CategoriaEnum)
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        for i in range(tamanho):
+            catalogo.adicionar_produto(Produto(
+                codigo=1000001 + i,
+                nome=f"Produto {i}",
+                preco=round(gerador.uniform(1, 1000), 2),
+                quantidade=gerador.randint(0, 500),
+                categoria=[gerador.choice(categorias)],
+            ))
+    return catalogo
+
+
+def medir(funcao, codigos):
+    """
+    Mede o tempo médio por chamada de uma função de busca
+    
+    Args:
+        funcao (callable): Função que recebe um código
+        codigos (list): Códigos a buscar
+        
+    Returns:
+        float: Tempo médio em microssegundos
+    """
+    inicio = time.perf_counter()
+    for codigo in codigos:
+        funcao(codigo)
+    return (time.perf_counter() - inicio) / len(codigos) * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--buscas", type=int, default=200, help="buscas medidas por tamanho")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    gerador = random.Random(args.semente)
+    print(f"{'n':>10} {'varredura (us)':>16} {'índice (us)':>14} {'ganho':>10}")
+    for tamanho in args.tamanhos:
+        catalogo = montar_catalogo(tamanho, gerador)
+        codigos = [1000001 + gerador.randrange(tamanho) for _ in range(args.buscas)]
+
+        t_linear = medir(lambda c: busca_linear(catalogo.avl.raiz, c), codigos)
+        t_indice = medir(catalogo.buscar_produto, codigos)
+        print(f"{tamanho:>10} {t_linear:>16.2f} {t_indice:>14.3f} {t_linear / t_indice:>9.0f}x")
+
+
+if __name__ == "__main__":
+    main()
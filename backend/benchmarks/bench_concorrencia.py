@@ -0,0 +1,131 @@
+"""
+Benchmark de concorrência do catálogo
+Mede a vazão de leituras (busca por código, página por preço e estatísticas)
+com leitores em várias threads, primeiro sem escritas e depois com threads
+escritoras adicionando, atualizando e removendo produtos ao mesmo tempo.
+Ao final confere se índice e árvore continuam consistentes.
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_concorrencia.py --produtos 100000 --leitores 4 --escritores 2
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalogo_produtos_avl import CatalogoProdutosAVL
+from modelo import CategoriaEnum, Produto
+
+CATEGORIAS = list(CategoriaEnum)
+
+
+def criar_produto(codigo, gerador):
+    return Produto(
+        codigo=codigo,
+        nome=f"Produto {codigo}",
+        preco=round(gerador.uniform(1, 1000), 2),
+        quantidade=gerador.randint(0, 500),
+        categoria=[gerador.choice(CATEGORIAS)],
+    )
+
+
+def leitor(catalogo, total_codigos, parar, contagem, semente):
+    gerador = random.Random(semente)
+    leituras = 0
+    while not parar.is_set():
+        operacao = gerador.random()
+        if operacao < 0.8:
+            catalogo.buscar_produto(gerador.randrange(total_codigos))
+        elif operacao < 0.95:
+            preco = gerador.uniform(1, 1000)
+            catalogo.listar_pagina(20, preco_min=preco)
+        else:
+            catalogo.estatisticas()
+        leituras += 1
+    contagem.append(leituras)
+
+
+def escritor(catalogo, total_codigos, parar, contagem, semente):
+    gerador = random.Random(semente)
+    escritas = 0
+    while not parar.is_set():
+        codigo = gerador.randrange(total_codigos)
+        operacao = gerador.random()
+        try:
+            if operacao < 0.4:
+                catalogo.adicionar_produto(criar_produto(codigo, gerador))
+            elif operacao < 0.8:
+                catalogo.remover_produto(codigo)
+            else:
+                catalogo.atualizar_produto(codigo, criar_produto(codigo, gerador))
+        except ValueError:
+            pass
+        escritas += 1
+    contagem.append(escritas)
+
+
+def rodar(catalogo, total_codigos, leitores, escritores, duracao):
+    """
+    Executa leitores e escritores em paralelo durante o tempo informado
+    
+    Returns:
+        tuple: (leituras por segundo, escritas por segundo)
+    """
+    parar = threading.Event()
+    leituras, escritas = [], []
+    threads = [
+        threading.Thread(target=leitor, args=(catalogo, total_codigos, parar, leituras, i))
+        for i in range(leitores)
+    ] + [
+        threading.Thread(target=escritor, args=(catalogo, total_codigos, parar, escritas, 1000 + i))
+        for i in range(escritores)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+    return sum(leituras) / duracao, sum(escritas) / duracao
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=100000)
+    parser.add_argument("--leitores", type=int, default=4)
+    parser.add_argument("--escritores", type=int, default=2)
+    parser.add_argument("--duracao", type=float, default=5.0, help="segundos por cenário")
+    args = parser.parse_args()
+
+    gerador = random.Random(42)
+    catalogo = CatalogoProdutosAVL()
+    # Metade dos códigos começa cadastrada; os escritores alternam o resto
+    total_codigos = args.produtos * 2
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        catalogo.adicionar_produtos_lote([criar_produto(c, gerador) for c in range(0, total_codigos, 2)])
+
+        so_leitura, _ = rodar(catalogo, total_codigos, args.leitores, 0, args.duracao)
+        misto_leitura, misto_escrita = rodar(
+            catalogo, total_codigos, args.leitores, args.escritores, args.duracao
+        )
+
+    print(f"produtos: {args.produtos}, leitores: {args.leitores}, escritores: {args.escritores}")
+    print(f"somente leitura:   {so_leitura:12,.0f} leituras/s")
+    print(f"leitura + escrita: {misto_leitura:12,.0f} leituras/s  {misto_escrita:10,.0f} escritas/s")
+
+    tamanho_arvore = catalogo.avl.obter_tamanho(catalogo.avl.raiz)
+    consistente = tamanho_arvore == catalogo.contar_produtos() and all(
+        catalogo.indice_codigo[no.valor.codigo] is no.valor for no in catalogo.avl.iterar_nos()
+    )
+    print(f"índice e árvore consistentes: {'sim' if consistente else 'NÃO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark da importação de CSV
+Gera catálogos sintéticos (catalogo_sintetico.py) em CSV, importa cada um
+com importar_csv em um catálogo vazio e mostra a vazão, o pico de memória
+do processo e o tempo projetado para --meta linhas (a importação é linear).
+
+Medido em um núcleo (Python 3.11, melhor de 3 execuções; a variação entre
+execuções nessa máquina foi de cerca de 20%):
+
+    linhas     tempo    linhas/s   pico RSS
+    300 000     4,3 s     70 mil     0,6 GB
+    1 000 000  16,5 s     61 mil     1,9 GB
+
+Projeção para 5 milhões de linhas: cerca de 80 s (com os lotes crescentes
+usados antes, cerca de 95 s), acima da meta de bem menos de um minuto. Cerca de 1,9 KB por produto em memória também impede
+rodar os 5 milhões em uma máquina com 5 GB. O tempo restante se divide entre
+ler e validar as linhas, indexar os nomes e montar a árvore, todos em Python.
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_importacao.py --linhas 300000 1000000
+"""
+
+import argparse
+import contextlib
+import csv
+import os
+import resource
+import sys
+import tempfile
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalogo_produtos_avl import CatalogoProdutosAVL
+from catalogo_sintetico import GeradorCatalogo
+from importador_csv import importar_csv
+
+
+def medir(caminho, repeticoes):
+    """
+    Importa o arquivo várias vezes, cada vez em um catálogo vazio
+    
+    Args:
+        caminho (str): CSV a importar
+        repeticoes (int): Quantidade de importações
+    
+    Returns:
+        RelatorioImportacao: Relatório da importação mais rápida
+    """
+    melhor = None
+    for _ in range(repeticoes):
+        catalogo = CatalogoProdutosAVL()
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            relatorio = importar_csv(caminho, catalogo)
+        if melhor is None or relatorio.segundos < melhor.segundos:
+            melhor = relatorio
+        del catalogo
+    return melhor
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100000, 300000])
+    parser.add_argument("--repeticoes", type=int, default=3, help="importações por tamanho (vale a melhor)")
+    parser.add_argument("--meta", type=int, default=5000000, help="linhas da projeção de tempo")
+    parser.add_argument("--semente", type=int, default=42)
+    args = parser.parse_args()
+
+    print(f"{'linhas':>10} {'tempo (s)':>10} {'linhas/s':>10} {'pico RSS (MB)':>14} {'projeção (s)':>13}")
+    with tempfile.TemporaryDirectory() as diretorio:
+        for linhas in sorted(args.linhas):
+            caminho = os.path.join(diretorio, f"sintetico-{linhas}.csv")
+            gerador = GeradorCatalogo(args.semente)
+            with open(caminho, "w", newline="", encoding="utf-8") as arquivo:
+                csv.writer(arquivo).writerows(gerador.linhas_csv(linhas))
+            relatorio = medir(caminho, args.repeticoes)
+            # ru_maxrss é o pico do processo (em KB no Linux), por isso os tamanhos vão em ordem crescente
+            pico = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+            projecao = args.meta / relatorio.linhas_por_segundo
+            print(f"{linhas:>10} {relatorio.segundos:>10.2f} {relatorio.linhas_por_segundo:>10,.0f} {pico:>14} {projecao:>13.0f}")
+            os.remove(caminho)
+
+
+if __name__ == "__main__":
+    main()
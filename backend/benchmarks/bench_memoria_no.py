@@ -0,0 +1,83 @@
+"""
+Benchmark de memória por nó da ArvoreAVL
+Mede, com tracemalloc, os bytes por nó de um nó com __dict__ (layout
+anterior de No) e do No atual com __slots__, além do custo da chave
+composta e do Produto referenciado por cada nó
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_memoria_no.py --quantidade 200000
+"""
+
+import argparse
+import sys
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from modelo import CategoriaEnum, Produto
+from no import No
+
+
+class NoComDict:
+    """Nó com o layout anterior de No (atributos em __dict__)"""
+
+    def __init__(self, chave, valor=None):
+        self.chave = chave
+        self.valor = valor
+        self.esquerda = None
+        self.direita = None
+        self.altura = 1
+
+
+def bytes_por_item(fabrica, quantidade):
+    """
+    Mede a memória média alocada por item criado
+    
+    Args:
+        fabrica (callable): Função que recebe o índice e cria um item
+        quantidade (int): Número de itens a criar
+        
+    Returns:
+        float: Bytes alocados por item
+    """
+    tracemalloc.start()
+    inicio, _ = tracemalloc.get_traced_memory()
+    itens = [fabrica(i) for i in range(quantidade)]
+    fim, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    # Desconta a lista que mantém os itens vivos (um ponteiro por item)
+    return (fim - inicio) / len(itens) - 8
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--quantidade", type=int, default=200000)
+    args = parser.parse_args()
+    n = args.quantidade
+
+    produtos = [
+        Produto(codigo=1000001 + i, nome=f"Produto {i}", preco=10.0 + i / 100,
+                quantidade=i % 500, categoria=[CategoriaEnum.OUTROS])
+        for i in range(n)
+    ]
+    chaves = [(p.preco, p.codigo) for p in produtos]
+
+    antes = bytes_por_item(lambda i: NoComDict(chaves[i], produtos[i]), n)
+    depois = bytes_por_item(lambda i: No(chaves[i], produtos[i]), n)
+    chave = bytes_por_item(lambda i: (float(i) + 0.5, 1000001 + i), n)
+    produto = bytes_por_item(
+        lambda i: Produto(codigo=i, nome=f"Produto {i}", preco=1.5, quantidade=1,
+                          categoria=[CategoriaEnum.OUTROS]),
+        n,
+    )
+
+    print(f"nós medidos: {n}")
+    print(f"No com __dict__ (antes):   {antes:8.1f} bytes/nó")
+    print(f"No com __slots__ (depois): {depois:8.1f} bytes/nó ({(1 - depois / antes) * 100:.0f}% menor)")
+    print(f"chave (preco, codigo):     {chave:8.1f} bytes/nó")
+    print(f"Produto (Pydantic):        {produto:8.1f} bytes/nó")
+
+
+if __name__ == "__main__":
+    main()
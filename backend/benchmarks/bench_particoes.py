@@ -0,0 +1,181 @@
+"""
+Benchmark do catálogo particionado
+Compara a vazão do catálogo em um processo (CatalogoProdutosAVL) com a do
+catálogo dividido entre processos (CatalogoParticionado) nas consultas que
+percorrem várias partições: busca por nome, página filtrada por categoria e
+relatório por categoria, com leitores em várias threads. Antes de medir,
+confere se os dois devolvem os mesmos resultados.
+
+Com --escritores, mede também o catálogo particionado com threads aplicando
+lotes de atualizações que tocam várias partições. As páginas fixam a versão
+de cada partição e não usam a trava do coordenador; a busca por nome lê o
+estado atual das partições e espera cada lote terminar, então sua vazão cai
+com os escritores.
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_particoes.py --produtos 300000 --particoes 4 --leitores 8
+    python benchmarks/bench_particoes.py --produtos 300000 --particoes 4 --leitores 8 --escritores 1
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalogo_particionado import CatalogoParticionado
+from catalogo_produtos_avl import CatalogoProdutosAVL
+from modelo import CategoriaEnum, Operacao, Produto, ProdutoParcial, TipoOperacaoEnum
+
+CATEGORIAS = list(CategoriaEnum)
+PALAVRAS = ["caneta", "caderno", "mochila", "livro", "mouse", "teclado", "cafe", "camiseta", "tenis", "bola"]
+
+
+def criar_produto(codigo, gerador):
+    return Produto(
+        codigo=codigo,
+        nome=f"{gerador.choice(PALAVRAS)} {gerador.choice(PALAVRAS)} {codigo % 1000}",
+        preco=round(gerador.uniform(1, 1000), 2),
+        quantidade=gerador.randint(0, 500),
+        categoria=gerador.sample(CATEGORIAS, gerador.randint(1, 2)),
+    )
+
+
+def consultar(catalogo, gerador):
+    """Executa uma consulta sorteada entre as que atravessam partições"""
+    operacao = gerador.random()
+    if operacao < 0.4:
+        catalogo.buscar_por_nome(gerador.choice(PALAVRAS)[:gerador.randint(3, 6)], 20)
+    elif operacao < 0.8:
+        catalogo.listar_pagina(50, preco_min=gerador.uniform(1, 900), categorias=[gerador.choice(CATEGORIAS)])
+    else:
+        catalogo.relatorio_categorias(preco_min=gerador.uniform(1, 500))
+
+
+def consultar_pagina(catalogo, gerador):
+    """Página filtrada: fixa a versão das partições, sem a trava do coordenador"""
+    catalogo.listar_pagina(50, preco_min=gerador.uniform(1, 900), categorias=[gerador.choice(CATEGORIAS)])
+
+
+def consultar_nome(catalogo, gerador):
+    """Busca por nome: lê o estado atual das partições, sob a trava de leitura"""
+    catalogo.buscar_por_nome(gerador.choice(PALAVRAS)[:gerador.randint(3, 6)], 20)
+
+
+def leitor(catalogo, consulta, parar, contagem, semente):
+    gerador = random.Random(semente)
+    consultas = 0
+    while not parar.is_set():
+        consulta(catalogo, gerador)
+        consultas += 1
+    contagem.append(consultas)
+
+
+def escritor(catalogo, produtos, parar, contagem, semente):
+    """Aplica lotes de 50 atualizações de estoque em códigos sorteados (várias partições)"""
+    gerador = random.Random(semente)
+    lotes = 0
+    while not parar.is_set():
+        catalogo.aplicar_operacoes([
+            Operacao(
+                tipo=TipoOperacaoEnum.ATUALIZAR, codigo=gerador.randrange(produtos),
+                alteracoes=ProdutoParcial(quantidade=gerador.randint(0, 500)),
+            )
+            for _ in range(50)
+        ])
+        lotes += 1
+    contagem.append(lotes)
+
+
+def rodar(catalogo, leitores, duracao, consulta=consultar, escritores=0, produtos=0):
+    """
+    Executa os leitores (e os escritores) em paralelo durante o tempo informado
+    
+    Returns:
+        tuple: (consultas por segundo, lotes escritos por segundo)
+    """
+    parar = threading.Event()
+    consultas = []
+    lotes = []
+    threads = [threading.Thread(target=leitor, args=(catalogo, consulta, parar, consultas, i)) for i in range(leitores)]
+    threads += [
+        threading.Thread(target=escritor, args=(catalogo, produtos, parar, lotes, leitores + i))
+        for i in range(escritores)
+    ]
+    for thread in threads:
+        thread.start()
+    time.sleep(duracao)
+    parar.set()
+    for thread in threads:
+        thread.join()
+    return sum(consultas) / duracao, sum(lotes) / duracao
+
+
+def conferir(unico, particionado):
+    """
+    Returns:
+        bool: Se os dois catálogos devolvem os mesmos resultados
+    """
+    if unico.contar_produtos() != particionado.contar_produtos():
+        return False
+    for palavra in PALAVRAS:
+        if unico.buscar_por_nome(palavra[:4], 50) != particionado.buscar_por_nome(palavra[:4], 50):
+            return False
+    for categoria in CATEGORIAS:
+        if unico.listar_pagina(100, categorias=[categoria])[:2] != particionado.listar_pagina(100, categorias=[categoria])[:2]:
+            return False
+    for posicao in (1, unico.contar_produtos() // 2, unico.contar_produtos()):
+        if unico.produto_por_posicao(posicao) != particionado.produto_por_posicao(posicao):
+            return False
+    return unico.histograma_precos()["faixas"] == particionado.histograma_precos()["faixas"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=300000)
+    parser.add_argument("--particoes", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--leitores", type=int, default=8)
+    parser.add_argument("--escritores", type=int, default=0, help="threads escrevendo durante as leituras (só particionado)")
+    parser.add_argument("--duracao", type=float, default=5.0, help="segundos por cenário")
+    args = parser.parse_args()
+
+    gerador = random.Random(42)
+    produtos = [criar_produto(codigo, gerador) for codigo in range(args.produtos)]
+    unico = CatalogoProdutosAVL()
+    particionado = CatalogoParticionado(args.particoes)
+    try:
+        with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+            inicio = time.perf_counter()
+            unico.adicionar_produtos_lote(produtos)
+            carga_unico = time.perf_counter() - inicio
+            inicio = time.perf_counter()
+            particionado.adicionar_produtos_lote(produtos)
+            carga_particionado = time.perf_counter() - inicio
+
+        print(f"produtos: {args.produtos}, partições: {args.particoes}, leitores: {args.leitores}")
+        print(f"resultados iguais: {'sim' if conferir(unico, particionado) else 'NÃO'}")
+        print(f"carga em lote:  um processo {carga_unico:8.2f}s   particionado {carga_particionado:8.2f}s")
+        vazao_unico, _ = rodar(unico, args.leitores, args.duracao)
+        vazao_particionado, _ = rodar(particionado, args.leitores, args.duracao)
+        print(f"um processo:  {vazao_unico:10,.0f} consultas/s")
+        print(f"particionado: {vazao_particionado:10,.0f} consultas/s  ({vazao_particionado / vazao_unico:.2f}x)")
+        if args.escritores:
+            print(f"particionado com {args.escritores} escritor(es):")
+            for rotulo, consulta in (("páginas (sem trava)", consultar_pagina), ("nomes (trava de leitura)", consultar_nome)):
+                sozinho, _ = rodar(particionado, args.leitores, args.duracao, consulta)
+                junto, lotes = rodar(particionado, args.leitores, args.duracao, consulta, args.escritores, args.produtos)
+                print(
+                    f"  {rotulo:<25} {sozinho:10,.0f} -> {junto:10,.0f} consultas/s "
+                    f"({junto / sozinho:.2f}x, {lotes:,.1f} lotes/s)"
+                )
+    finally:
+        particionado.fechar()
+
+
+if __name__ == "__main__":
+    main()
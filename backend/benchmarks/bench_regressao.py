@@ -0,0 +1,482 @@
+"""
+Benchmark de regressão da árvore e da API
+Mede, com dados reprodutíveis, as operações da ArvoreAVL e as rotas da API
+e grava o resultado em JSON, para comparar uma execução com outra.
+
+- Árvore: inserção, busca, percurso em ordem, remoção e carga em lote em
+  vários tamanhos, com chaves (preco, codigo) aleatórias, já ordenadas ou
+  com muitos empates de preço (poucos preços, códigos únicos)
+- API: cenários de leitura e escrita pelo TestClient do FastAPI (no mesmo
+  processo, passando por roteamento, validação e serialização), sobre um
+  catálogo sintético (catalogo_sintetico.py), com vazão e latência p50, p95
+  e p99 por cenário; com --clientes, várias threads enviam ao mesmo tempo
+
+Com --comparar, aponta as medidas cuja vazão caiu mais que --tolerancia em
+relação a um JSON anterior e termina com código 1 se houver alguma.
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_regressao.py --saida antes.json
+    python benchmarks/bench_regressao.py --saida depois.json --comparar antes.json
+    python benchmarks/bench_regressao.py --partes api --produtos-api 100000 --clientes 4
+"""
+
+import argparse
+import gc
+import json
+import math
+import os
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from arvore_avl import ArvoreAVL
+from catalogo_sintetico import GeradorCatalogo
+from modelo import CategoriaEnum
+
+DISTRIBUICOES = ("aleatoria", "ordenada", "duplicadas")
+CATEGORIAS = [categoria.value for categoria in CategoriaEnum]
+# Duração mínima de cada medida da árvore, em segundos
+TEMPO_MINIMO = 0.05
+
+
+def cronometrar(funcao, repeticoes, preparar=None):
+    """
+    Mede o tempo de uma chamada, guardando o menor entre as repetições (o
+    menos afetado por ruído do sistema). Chamadas rápidas são repetidas em
+    cada medida até somarem TEMPO_MINIMO, como o autorange do timeit.
+    
+    Args:
+        funcao (callable): Recebe o resultado de preparar
+        repeticoes (int): Quantidade de medidas
+        preparar (callable | None): Monta, fora do tempo medido, o argumento
+            de cada chamada (ex.: a árvore a esvaziar)
+    
+    Returns:
+        float: Menor tempo por chamada, em segundos
+    """
+    preparar = preparar or (lambda: None)
+    argumento = preparar()
+    inicio = time.perf_counter()
+    funcao(argumento)
+    voltas = max(1, math.ceil(TEMPO_MINIMO / max(time.perf_counter() - inicio, 1e-9)))
+    melhor = math.inf
+    for _ in range(repeticoes):
+        argumentos = [preparar() for _ in range(voltas)]
+        gc.collect()
+        inicio = time.perf_counter()
+        for argumento in argumentos:
+            funcao(argumento)
+        melhor = min(melhor, (time.perf_counter() - inicio) / voltas)
+    return melhor
+
+
+def chaves_arvore(distribuicao, tamanho, gerador):
+    """
+    Args:
+        distribuicao (str): 'aleatoria', 'ordenada' ou 'duplicadas'
+        tamanho (int): Quantidade de chaves (todas distintas)
+        gerador (random.Random): Gerador pseudoaleatório
+    
+    Returns:
+        list[tuple]: Chaves (preco, codigo) na ordem de inserção
+    """
+    if distribuicao == "duplicadas":
+        # Muitos produtos com os mesmos vinte preços e códigos únicos: só o
+        # código desempata a chave (o cenário de preços repetidos do catálogo)
+        return [(float(gerador.randint(1, 20)), codigo) for codigo in range(tamanho)]
+    chaves = [(round(gerador.uniform(1, 1000), 2), codigo) for codigo in range(tamanho)]
+    if distribuicao == "ordenada":
+        chaves.sort()
+    return chaves
+
+
+def medir_arvore(tamanho, distribuicao, repeticoes, gerador):
+    """
+    Mede as operações da ArvoreAVL sobre um conjunto de chaves
+    
+    Returns:
+        list[dict]: Uma medida por operação
+    """
+    chaves = chaves_arvore(distribuicao, tamanho, gerador)
+    distintas = list(dict.fromkeys(chaves))
+    buscas = chaves[:]
+    gerador.shuffle(buscas)
+    remocoes = distintas[:]
+    gerador.shuffle(remocoes)
+    lote = [(chave, chave) for chave in chaves]
+
+    def inserir(_):
+        arvore = ArvoreAVL()
+        for chave in chaves:
+            arvore.inserir_chave(chave, chave)
+        return arvore
+
+    def cheia(_=None):
+        arvore = ArvoreAVL()
+        arvore.inserir_lote(lote)
+        return arvore
+
+    arvore = inserir(None)
+    altura = arvore.obter_altura(arvore.raiz)
+    valida = arvore.obter_tamanho(arvore.raiz) == len(distintas) and altura <= 1.45 * math.log2(len(distintas) + 2)
+
+    def buscar(_):
+        for chave in buscas:
+            arvore.buscar_chave(chave)
+
+    def percorrer(_):
+        for _ in arvore.iterar_nos():
+            pass
+
+    def remover(alvo):
+        for chave in remocoes:
+            alvo.remover_chave(chave)
+
+    tempos = {
+        "inserir": (len(chaves), cronometrar(inserir, repeticoes)),
+        "buscar": (len(buscas), cronometrar(buscar, repeticoes)),
+        "percorrer": (len(distintas), cronometrar(percorrer, repeticoes)),
+        "remover": (len(remocoes), cronometrar(remover, repeticoes, cheia)),
+        "inserir_lote": (len(lote), cronometrar(cheia, repeticoes)),
+    }
+    return [
+        {
+            "tamanho": tamanho,
+            "distribuicao": distribuicao,
+            "operacao": operacao,
+            "operacoes": quantidade,
+            "segundos": round(segundos, 6),
+            "ops_por_segundo": round(quantidade / segundos, 1) if segundos else None,
+            "altura": altura,
+            "valida": valida,
+        }
+        for operacao, (quantidade, segundos) in tempos.items()
+    ]
+
+
+class ContextoApi:
+    """
+    Estado compartilhado pelos cenários da API: códigos cadastrados, faixa
+    de preço, palavras dos nomes e códigos novos para as escritas
+    """
+
+    def __init__(self, produtos):
+        """
+        Args:
+            produtos (list[Produto]): Produtos carregados no catálogo
+        """
+        self.codigos = [produto.codigo for produto in produtos]
+        self.preco_maximo = max(produto.preco for produto in produtos)
+        self.palavras = sorted({palavra for produto in produtos[:1000] for palavra in produto.nome.split() if len(palavra) > 3})
+        self.total = len(produtos)
+        self._trava = threading.Lock()
+        self._proximo_codigo = max(self.codigos) + 1
+
+    def novo_codigo(self):
+        """int: Código ainda não usado (seguro entre threads)"""
+        with self._trava:
+            codigo = self._proximo_codigo
+            self._proximo_codigo += 1
+            return codigo
+
+
+def _produto_json(codigo, gerador):
+    return {
+        "codigo": codigo,
+        "nome": f"Produto benchmark {codigo}",
+        "preco": round(gerador.uniform(1, 500), 2),
+        "quantidade": gerador.randint(1, 100),
+        "categoria": [gerador.choice(CATEGORIAS)],
+    }
+
+
+def cenario_listar_pagina(cliente, gerador, contexto):
+    return [cliente.get("/produtos", params={"limite": 50, "preco_min": round(gerador.uniform(0, contexto.preco_maximo), 2)})]
+
+
+def cenario_listar_categoria(cliente, gerador, contexto):
+    return [cliente.get("/produtos", params={"limite": 50, "categoria": gerador.choice(CATEGORIAS)})]
+
+
+def cenario_buscar_codigo(cliente, gerador, contexto):
+    return [cliente.get(f"/produtos/{gerador.choice(contexto.codigos)}")]
+
+
+def cenario_buscar_nome(cliente, gerador, contexto):
+    palavra = gerador.choice(contexto.palavras)
+    return [cliente.get("/produtos/busca", params={"q": palavra[:gerador.randint(3, len(palavra))]})]
+
+
+def cenario_contagem(cliente, gerador, contexto):
+    inicio = gerador.uniform(0, contexto.preco_maximo)
+    return [cliente.get("/produtos/contagem", params={"preco_min": round(inicio, 2), "preco_max": round(inicio * 1.5, 2)})]
+
+
+def cenario_posicao(cliente, gerador, contexto):
+    return [cliente.get(f"/produtos/posicao/{gerador.randint(1, contexto.total)}")]
+
+
+def cenario_estatisticas(cliente, gerador, contexto):
+    return [cliente.get("/estatisticas")]
+
+
+def cenario_relatorio_categorias(cliente, gerador, contexto):
+    return [cliente.get("/relatorios/categorias", params={"preco_min": round(gerador.uniform(0, contexto.preco_maximo / 2), 2)})]
+
+
+def cenario_histograma(cliente, gerador, contexto):
+    return [cliente.get("/relatorios/histograma-precos", params={"faixas": 20})]
+
+
+def cenario_inserir_remover(cliente, gerador, contexto):
+    codigo = contexto.novo_codigo()
+    return [cliente.post("/produtos", json=_produto_json(codigo, gerador)), cliente.delete(f"/produtos/{codigo}")]
+
+
+def cenario_atualizar(cliente, gerador, contexto):
+    return [cliente.patch(f"/produtos/{gerador.choice(contexto.codigos)}", json={"quantidade": gerador.randint(1, 500)})]
+
+
+def cenario_operacoes(cliente, gerador, contexto):
+    # Dez inclusões, dez atualizações e a remoção das dez incluídas: o catálogo não cresce
+    novos = [contexto.novo_codigo() for _ in range(10)]
+    operacoes = [{"tipo": "adicionar", "produto": _produto_json(codigo, gerador)} for codigo in novos]
+    operacoes += [
+        {"tipo": "atualizar", "codigo": gerador.choice(contexto.codigos), "alteracoes": {"quantidade": gerador.randint(1, 500)}}
+        for _ in range(10)
+    ]
+    operacoes += [{"tipo": "remover", "codigo": codigo} for codigo in novos]
+    return [cliente.post("/produtos/operacoes", json=operacoes)]
+
+
+CENARIOS_API = {
+    "listar_pagina": cenario_listar_pagina,
+    "listar_categoria": cenario_listar_categoria,
+    "buscar_codigo": cenario_buscar_codigo,
+    "buscar_nome": cenario_buscar_nome,
+    "contagem": cenario_contagem,
+    "posicao": cenario_posicao,
+    "estatisticas": cenario_estatisticas,
+    "relatorio_categorias": cenario_relatorio_categorias,
+    "histograma": cenario_histograma,
+    "inserir_remover": cenario_inserir_remover,
+    "atualizar": cenario_atualizar,
+    "operacoes": cenario_operacoes,
+}
+
+
+def abrir_api(produtos):
+    """
+    Importa a API com um catálogo em memória e carrega os produtos pela rota de lote
+    A API é importada só aqui: as medidas da árvore não dependem do FastAPI
+    
+    Args:
+        produtos (list[Produto]): Produtos a carregar
+    
+    Returns:
+        TestClient: Cliente já iniciado (ciclo de vida da API ativo)
+    """
+    # Nunca grava em um diretório de dados real; CATALOGO_PARTICOES continua valendo
+    os.environ.pop("CATALOGO_DADOS", None)
+    os.environ.pop("CATALOGO_SOMENTE_LEITURA", None)
+    os.environ.setdefault("CATALOGO_LOG", "WARNING")
+    from fastapi.testclient import TestClient
+
+    import app
+
+    cliente = TestClient(app.app)
+    cliente.__enter__()
+    for inicio in range(0, len(produtos), 50000):
+        lote = [produto.model_dump(mode="json") for produto in produtos[inicio:inicio + 50000]]
+        resposta = cliente.post("/produtos/lote", json=lote)
+        if resposta.status_code != 200:
+            raise RuntimeError(f"Carga do catálogo falhou: {resposta.status_code} {resposta.text[:200]}")
+    return cliente
+
+
+def medir_cenario(cliente, nome, contexto, requisicoes, clientes, semente):
+    """
+    Executa um cenário da API em uma ou mais threads
+    
+    Returns:
+        dict: Vazão, latências (ms) e erros do cenário
+    """
+    cenario = CENARIOS_API[nome]
+    aquecimento = random.Random(semente)
+    for _ in range(min(50, requisicoes // 10)):
+        cenario(cliente, aquecimento, contexto)
+
+    latencias = []
+    erros = []
+
+    def enviar(quantidade, semente_thread):
+        gerador = random.Random(semente_thread)
+        proprias = []
+        falhas = 0
+        for _ in range(quantidade):
+            inicio = time.perf_counter()
+            respostas = cenario(cliente, gerador, contexto)
+            proprias.append(time.perf_counter() - inicio)
+            falhas += sum(1 for resposta in respostas if resposta.status_code >= 400)
+        latencias.extend(proprias)
+        erros.append(falhas)
+
+    por_thread = [requisicoes // clientes + (1 if i < requisicoes % clientes else 0) for i in range(clientes)]
+    threads = [threading.Thread(target=enviar, args=(quantidade, semente + 1 + i)) for i, quantidade in enumerate(por_thread)]
+    inicio = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    segundos = time.perf_counter() - inicio
+
+    latencias.sort()
+    percentis = statistics.quantiles(latencias, n=100, method="inclusive") if len(latencias) > 1 else latencias * 99
+    return {
+        "cenario": nome,
+        "requisicoes": len(latencias),
+        "clientes": clientes,
+        "segundos": round(segundos, 4),
+        "requisicoes_por_segundo": round(len(latencias) / segundos, 1),
+        "latencia_ms": {
+            "p50": round(percentis[49] * 1000, 3),
+            "p95": round(percentis[94] * 1000, 3),
+            "p99": round(percentis[98] * 1000, 3),
+            "max": round(latencias[-1] * 1000, 3),
+        },
+        "erros": sum(erros),
+    }
+
+
+def comparar(atual, anterior, tolerancia):
+    """
+    Compara a vazão de cada medida com a mesma medida de um resultado anterior
+    
+    Args:
+        atual (dict): Resultado desta execução
+        anterior (dict): Resultado carregado do JSON anterior
+        tolerancia (float): Queda relativa aceita (ex.: 0.2 para 20%)
+    
+    Returns:
+        list[str]: Descrição das medidas que caíram além da tolerância
+    """
+    def indexar(resultado):
+        medidas = {}
+        for medida in resultado.get("arvore", []):
+            chave = f"arvore {medida['operacao']} n={medida['tamanho']} {medida['distribuicao']}"
+            medidas[chave] = medida["ops_por_segundo"]
+        for medida in resultado.get("api", []):
+            medidas[f"api {medida['cenario']} clientes={medida['clientes']}"] = medida["requisicoes_por_segundo"]
+        return medidas
+
+    antes = indexar(anterior)
+    regressoes = []
+    for chave, vazao in indexar(atual).items():
+        referencia = antes.get(chave)
+        if not referencia or not vazao:
+            continue
+        razao = vazao / referencia
+        print(f"  {chave:55} {referencia:14,.1f} -> {vazao:14,.1f}  ({razao - 1:+.1%})")
+        if razao < 1 - tolerancia:
+            regressoes.append(f"{chave}: {referencia:,.1f} -> {vazao:,.1f} ({razao - 1:+.1%})")
+    return regressoes
+
+
+def versao_codigo():
+    """
+    Returns:
+        str | None: Commit atual do repositório (None fora de um repositório git)
+    """
+    try:
+        saida = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, timeout=10,
+            cwd=Path(__file__).resolve().parent,
+        )
+    except (OSError, subprocess.SubprocessError):
+        return None
+    return saida.stdout.strip() or None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--partes", nargs="+", choices=("arvore", "api"), default=["arvore", "api"])
+    parser.add_argument("--tamanhos", type=int, nargs="+", default=[1000, 10000, 100000], help="tamanhos da árvore")
+    parser.add_argument("--distribuicoes", nargs="+", choices=DISTRIBUICOES, default=list(DISTRIBUICOES))
+    parser.add_argument("--repeticoes", type=int, default=3, help="medidas de cada operação da árvore (vale a melhor)")
+    parser.add_argument("--produtos-api", type=int, default=20000, help="produtos do catálogo da API")
+    parser.add_argument("--cenarios", nargs="+", choices=list(CENARIOS_API), default=list(CENARIOS_API))
+    parser.add_argument("--requisicoes", type=int, default=500, help="requisições por cenário da API")
+    parser.add_argument("--clientes", type=int, default=1, help="threads enviando requisições ao mesmo tempo")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--saida", default="resultado_benchmark.json", help="arquivo JSON com os resultados")
+    parser.add_argument("--comparar", help="JSON de uma execução anterior")
+    parser.add_argument("--tolerancia", type=float, default=0.2, help="queda de vazão aceita na comparação")
+    args = parser.parse_args()
+
+    resultado = {
+        "execucao": {
+            "data": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "commit": versao_codigo(),
+            "python": platform.python_version(),
+            "plataforma": platform.platform(),
+            "processadores": os.cpu_count(),
+            "particoes": int(os.environ.get("CATALOGO_PARTICOES") or 0) or None,
+            "argumentos": {nome: valor for nome, valor in vars(args).items() if nome not in ("saida", "comparar")},
+        },
+    }
+
+    if "arvore" in args.partes:
+        resultado["arvore"] = []
+        print(f"{'árvore':10} {'n':>8} {'chaves':11} {'operação':13} {'ops/s':>14} {'altura':>7}")
+        for tamanho in args.tamanhos:
+            for distribuicao in args.distribuicoes:
+                gerador = random.Random(f"{args.semente}-{tamanho}-{distribuicao}")
+                for medida in medir_arvore(tamanho, distribuicao, args.repeticoes, gerador):
+                    resultado["arvore"].append(medida)
+                    aviso = "" if medida["valida"] else "  ÁRVORE INVÁLIDA"
+                    print(f"{'':10} {tamanho:8} {distribuicao:11} {medida['operacao']:13} "
+                          f"{medida['ops_por_segundo']:14,.0f} {medida['altura']:7}{aviso}")
+
+    if "api" in args.partes:
+        produtos = GeradorCatalogo(args.semente).produtos(args.produtos_api)
+        cliente = abrir_api(produtos)
+        contexto = ContextoApi(produtos)
+        resultado["api"] = []
+        print(f"{'api':10} {'cenário':22} {'req/s':>10} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9} {'erros':>6}")
+        try:
+            for nome in args.cenarios:
+                medida = medir_cenario(cliente, nome, contexto, args.requisicoes, args.clientes, args.semente)
+                resultado["api"].append(medida)
+                latencia = medida["latencia_ms"]
+                print(f"{'':10} {nome:22} {medida['requisicoes_por_segundo']:10,.1f} {latencia['p50']:9.3f} "
+                      f"{latencia['p95']:9.3f} {latencia['p99']:9.3f} {medida['erros']:6}")
+        finally:
+            cliente.__exit__(None, None, None)
+
+    with open(args.saida, "w", encoding="utf-8") as arquivo:
+        json.dump(resultado, arquivo, ensure_ascii=False, indent=2)
+    print(f"resultados gravados em {args.saida}")
+
+    if args.comparar:
+        with open(args.comparar, encoding="utf-8") as arquivo:
+            anterior = json.load(arquivo)
+        print(f"comparação com {args.comparar} (commit {anterior.get('execucao', {}).get('commit')}):")
+        regressoes = comparar(resultado, anterior, args.tolerancia)
+        if regressoes:
+            print(f"{len(regressoes)} medidas caíram mais de {args.tolerancia:.0%}:")
+            for regressao in regressoes:
+                print(f"  {regressao}")
+            sys.exit(1)
+        print("nenhuma queda além da tolerância")
+
+
+if __name__ == "__main__":
+    main()
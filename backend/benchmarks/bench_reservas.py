@@ -0,0 +1,119 @@
+"""
+Benchmark de reservas de estoque
+Compara a baixa de estoque feita com atualizar_produto (remove e reinsere o
+nó) com reservar_estoque (substitui o produto no próprio nó) e com
+reservar_lote, e depois dispara várias threads reservando os mesmos poucos
+produtos ("promoção relâmpago") para conferir que nenhuma unidade é vendida
+além do estoque.
+
+Uso (a partir da pasta backend):
+    python benchmarks/bench_reservas.py --produtos 100000 --reservas 20000 --threads 4
+"""
+
+import argparse
+import contextlib
+import os
+import random
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from catalogo_produtos_avl import CatalogoProdutosAVL
+from modelo import CategoriaEnum, Produto
+
+CATEGORIAS = list(CategoriaEnum)
+
+
+def criar_catalogo(total, estoque, gerador):
+    catalogo = CatalogoProdutosAVL()
+    catalogo.adicionar_produtos_lote([
+        Produto(
+            codigo=codigo,
+            nome=f"Produto {codigo}",
+            preco=round(gerador.uniform(1, 1000), 2),
+            quantidade=estoque,
+            categoria=[gerador.choice(CATEGORIAS)],
+        )
+        for codigo in range(total)
+    ])
+    return catalogo
+
+
+def medir(funcao, repeticoes):
+    inicio = time.perf_counter()
+    funcao()
+    return repeticoes / (time.perf_counter() - inicio)
+
+
+def comprador(catalogo, codigos, tentativas, vendidas, semente):
+    gerador = random.Random(semente)
+    total = 0
+    for _ in range(tentativas):
+        try:
+            catalogo.reservar_estoque(gerador.choice(codigos), 1)
+            total += 1
+        except ValueError:
+            pass
+    vendidas.append(total)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--produtos", type=int, default=100000)
+    parser.add_argument("--reservas", type=int, default=20000)
+    parser.add_argument("--lote", type=int, default=50, help="itens por reserva em lote")
+    parser.add_argument("--threads", type=int, default=4)
+    args = parser.parse_args()
+
+    gerador = random.Random(42)
+    codigos = [gerador.randrange(args.produtos) for _ in range(args.reservas)]
+    with open(os.devnull, "w") as nulo, contextlib.redirect_stdout(nulo):
+        catalogo = criar_catalogo(args.produtos, 10**9, gerador)
+
+        def por_atualizacao():
+            for codigo in codigos:
+                produto = catalogo.buscar_produto(codigo)
+                catalogo.atualizar_produto(codigo, produto.model_copy(update={"quantidade": produto.quantidade - 1}))
+
+        def por_reserva():
+            for codigo in codigos:
+                catalogo.reservar_estoque(codigo, 1)
+
+        def por_lote():
+            for i in range(0, len(codigos), args.lote):
+                catalogo.reservar_lote((codigo, 1) for codigo in codigos[i:i + args.lote])
+
+        atualizacoes = medir(por_atualizacao, args.reservas)
+        reservas = medir(por_reserva, args.reservas)
+        lotes = medir(por_lote, args.reservas)
+
+        # Promoção: 10 produtos com 1000 unidades e o dobro de tentativas de compra
+        promocao = criar_catalogo(10, 1000, gerador)
+        vendidas = []
+        threads = [
+            threading.Thread(target=comprador, args=(promocao, list(range(10)), 20000 // args.threads, vendidas, i))
+            for i in range(args.threads)
+        ]
+        inicio = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        concorrentes = (20000 // args.threads * args.threads) / (time.perf_counter() - inicio)
+
+    print(f"produtos: {args.produtos}, reservas: {args.reservas}")
+    print(f"atualizar_produto:      {atualizacoes:10,.0f} reservas/s")
+    print(f"reservar_estoque:       {reservas:10,.0f} reservas/s")
+    print(f"reservar_lote ({args.lote:>3}):   {lotes:10,.0f} itens/s")
+    print(f"{args.threads} threads concorrentes: {concorrentes:10,.0f} tentativas/s")
+
+    estoque = sum(promocao.buscar_produto(codigo).quantidade for codigo in range(10))
+    correto = sum(vendidas) == 10 * 1000 and estoque == 0
+    print(f"vendidas {sum(vendidas)} de 10000 unidades, estoque final {estoque}: {'ok' if correto else 'ERRO'}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""
+Gerador de catálogo sintético para os benchmarks
+Produz produtos no formato de produtos.csv (nome, preco, quantidade, imagem)
+a partir dos modelos desse arquivo: cada produto parte de um modelo
+sorteado, com nome variado (as palavras continuam reais, para a busca por
+nome), preço e estoque perturbados em torno dos do modelo e categorias
+sorteadas conforme PESOS_CATEGORIAS. A mesma semente gera sempre o mesmo
+catálogo, o que permite comparar execuções.
+
+Uso (a partir da pasta backend):
+    python benchmarks/catalogo_sintetico.py 100000 --saida sintetico.csv
+    python importador_csv.py sintetico.csv
+"""
+
+import argparse
+import csv
+import random
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from importador_csv import CODIGO_INICIAL, ler_linhas
+from modelo import CategoriaEnum, Produto
+
+CSV_MODELOS = Path(__file__).resolve().parent.parent.parent / "produtos.csv"
+
+# Participação de cada categoria no catálogo gerado (o CSV não traz categoria)
+PESOS_CATEGORIAS = {
+    CategoriaEnum.ELETRONICOS: 18,
+    CategoriaEnum.ROUPAS: 20,
+    CategoriaEnum.ALIMENTOS: 12,
+    CategoriaEnum.MOVEIS: 7,
+    CategoriaEnum.LIVROS: 10,
+    CategoriaEnum.BRINQUEDOS: 8,
+    CategoriaEnum.BELEZA: 9,
+    CategoriaEnum.ESPORTES: 8,
+    CategoriaEnum.OUTROS: 8,
+}
+
+# Fração dos produtos com uma segunda categoria e dos sem estoque
+FRACAO_DUAS_CATEGORIAS = 0.15
+FRACAO_SEM_ESTOQUE = 0.05
+
+
+def ler_modelos(caminho=CSV_MODELOS):
+    """
+    Args:
+        caminho (str | Path): CSV no formato de produtos.csv
+    
+    Returns:
+        list[tuple]: (nome, preço, quantidade) das linhas válidas do arquivo
+    """
+    modelos = []
+    for _, campos in ler_linhas(caminho):
+        try:
+            modelos.append((campos[0].strip(), float(campos[1]), int(campos[2])))
+        except (IndexError, ValueError):
+            continue
+    if not modelos:
+        raise ValueError(f"Nenhuma linha válida em {caminho}")
+    return modelos
+
+
+class GeradorCatalogo:
+    """
+    Gera produtos sintéticos reprodutíveis a partir dos modelos de um CSV
+    """
+
+    def __init__(self, semente=42, modelos=None, precos_distintos=None):
+        """
+        Args:
+            semente (int): Semente do gerador pseudoaleatório
+            modelos (list[tuple] | None): (nome, preço, quantidade) de base
+                (padrão: as linhas de produtos.csv)
+            precos_distintos (int | None): Se informado, os preços são
+                sorteados entre essa quantidade de valores, gerando muitos
+                empates na chave (preco, codigo) da árvore
+        """
+        self.gerador = random.Random(semente)
+        self.modelos = modelos or ler_modelos()
+        self.vocabulario = sorted({palavra for nome, _, _ in self.modelos for palavra in nome.split() if len(palavra) > 3})
+        self.categorias = list(PESOS_CATEGORIAS)
+        self.pesos = list(PESOS_CATEGORIAS.values())
+        self.precos = None
+        if precos_distintos:
+            menor = min(preco for _, preco, _ in self.modelos) / 2
+            maior = max(preco for _, preco, _ in self.modelos) * 2
+            passo = (maior - menor) / max(1, precos_distintos - 1)
+            self.precos = [round(menor + i * passo, 2) for i in range(precos_distintos)]
+
+    def _categorias(self):
+        gerador = self.gerador
+        primeira = gerador.choices(self.categorias, self.pesos)[0]
+        if gerador.random() >= FRACAO_DUAS_CATEGORIAS:
+            return [primeira]
+        segunda = gerador.choices(self.categorias, self.pesos)[0]
+        return [primeira] if segunda == primeira else [primeira, segunda]
+
+    def _campos(self):
+        """
+        Returns:
+            tuple: (nome, preço, quantidade) de um produto sorteado
+        """
+        gerador = self.gerador
+        nome, preco, quantidade = gerador.choice(self.modelos)
+        nome = f"{nome} {gerador.choice(self.vocabulario)} {gerador.randrange(1000)}"
+        if self.precos is not None:
+            preco = gerador.choice(self.precos)
+        else:
+            preco = round(max(0.01, preco * gerador.uniform(0.5, 2.0)), 2)
+        if gerador.random() < FRACAO_SEM_ESTOQUE:
+            quantidade = 0
+        else:
+            quantidade = gerador.randint(1, max(1, quantidade * 2))
+        return nome, preco, quantidade
+
+    def produto(self, codigo):
+        """
+        Args:
+            codigo (int): Código do produto gerado
+        
+        Returns:
+            Produto: Produto sintético
+        """
+        nome, preco, quantidade = self._campos()
+        return Produto(codigo=codigo, nome=nome, preco=preco, quantidade=quantidade, categoria=self._categorias())
+
+    def produtos(self, quantidade, codigo_inicial=CODIGO_INICIAL):
+        """
+        Args:
+            quantidade (int): Quantidade de produtos
+            codigo_inicial (int): Código do primeiro produto (os demais são sequenciais)
+        
+        Returns:
+            list[Produto]: Produtos sintéticos
+        """
+        return [self.produto(codigo) for codigo in range(codigo_inicial, codigo_inicial + quantidade)]
+
+    def linhas_csv(self, quantidade):
+        """
+        Yields:
+            list[str]: Linhas no formato de produtos.csv (nome, preco, quantidade, imagem)
+        """
+        for numero in range(quantidade):
+            nome, preco, quantidade_estoque = self._campos()
+            yield [nome, f"{preco:.2f}", str(quantidade_estoque), f"https://exemplo.com/img/sintetico-{numero}.jpg"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("quantidade", type=int, help="produtos a gerar")
+    parser.add_argument("--saida", required=True, help="arquivo CSV gerado")
+    parser.add_argument("--semente", type=int, default=42)
+    parser.add_argument("--precos-distintos", type=int, help="sorteia os preços entre poucos valores")
+    args = parser.parse_args()
+
+    gerador = GeradorCatalogo(args.semente, precos_distintos=args.precos_distintos)
+    with open(args.saida, "w", newline="", encoding="utf-8") as arquivo:
+        csv.writer(arquivo).writerows(gerador.linhas_csv(args.quantidade))
+    print(f"{args.quantidade} produtos gravados em {args.saida}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Módulo de Cache de Respostas
+Guarda o JSON já codificado das leituras mais pedidas (páginas, produtos,
+estatísticas), com um ETag por corpo para requisições condicionais
+
+As chaves incluem a versão do catálogo lida, então uma alteração (que
+publica uma nova versão) invalida as entradas da versão mais recente sem
+nenhum aviso ao cache: as leituras seguintes procuram outra chave, e as
+entradas antigas saem pela política LRU. Versões anteriores pedidas
+explicitamente (?versao=) são imutáveis e continuam válidas no cache.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+from typing import NamedTuple
+
+
+class RespostaCodificada(NamedTuple):
+    """Corpo JSON pronto para envio e o ETag calculado sobre ele"""
+    corpo: bytes
+    etag: str
+
+
+def codificar_json(dados):
+    """
+    Codifica uma resposta como o JSONResponse do FastAPI (compacto, UTF-8)
+    
+    Args:
+        dados: Estrutura serializável em JSON
+    
+    Returns:
+        bytes: Corpo da resposta
+    """
+    return json.dumps(dados, ensure_ascii=False, allow_nan=False, separators=(",", ":")).encode("utf-8")
+
+
+def calcular_etag(corpo):
+    """
+    ETag forte derivado do conteúdo: um produto que não mudou mantém o
+    mesmo ETag de uma versão do catálogo para a outra
+    
+    Args:
+        corpo (bytes): Corpo da resposta
+    
+    Returns:
+        str: ETag entre aspas
+    """
+    return '"' + hashlib.blake2b(corpo, digest_size=12).hexdigest() + '"'
+
+
+def etag_confere(if_none_match, etag):
+    """
+    Args:
+        if_none_match (str | None): Cabeçalho If-None-Match da requisição
+        etag (str): ETag atual do recurso
+    
+    Returns:
+        bool: Se o cliente já tem essa representação (resposta 304)
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # Comparação fraca (RFC 9110): o prefixo W/ é ignorado
+    return any(
+        candidato.strip().removeprefix("W/") == etag
+        for candidato in if_none_match.split(",")
+    )
+
+
+class CacheRespostas:
+    """
+    Cache LRU de respostas codificadas, seguro entre threads
+    Limitado pela quantidade de entradas e pelo total de bytes guardados
+    """
+
+    def __init__(self, max_entradas=4096, max_bytes=64 * 1024 * 1024):
+        """
+        Inicializa um cache vazio
+        
+        Args:
+            max_entradas (int): Quantidade máxima de respostas guardadas
+            max_bytes (int): Soma máxima do tamanho dos corpos guardados
+        """
+        self.max_entradas = max_entradas
+        self.max_bytes = max_bytes
+        self._entradas = OrderedDict()
+        self._bytes = 0
+        self._trava = threading.Lock()
+        self.acertos = 0
+        self.faltas = 0
+        self.descartes = 0
+
+    def obter(self, chave):
+        """
+        Args:
+            chave (tuple): Recurso, versão lida e parâmetros da consulta
+        
+        Returns:
+            RespostaCodificada | None: Resposta guardada ou None
+        """
+        with self._trava:
+            resposta = self._entradas.get(chave)
+            if resposta is None:
+                self.faltas += 1
+                return None
+            self._entradas.move_to_end(chave)
+            self.acertos += 1
+            return resposta
+
+    def guardar(self, chave, corpo):
+        """
+        Guarda uma resposta, descartando as usadas há mais tempo se necessário
+        Um corpo maior que o próprio limite é devolvido sem ser guardado
+        
+        Args:
+            chave (tuple): Recurso, versão lida e parâmetros da consulta
+            corpo (bytes): JSON codificado
+        
+        Returns:
+            RespostaCodificada: Corpo com o ETag calculado
+        """
+        resposta = RespostaCodificada(corpo, calcular_etag(corpo))
+        if len(corpo) > self.max_bytes:
+            return resposta
+        with self._trava:
+            anterior = self._entradas.pop(chave, None)
+            if anterior is not None:
+                self._bytes -= len(anterior.corpo)
+            self._entradas[chave] = resposta
+            self._bytes += len(corpo)
+            while len(self._entradas) > self.max_entradas or self._bytes > self.max_bytes:
+                _, descartada = self._entradas.popitem(last=False)
+                self._bytes -= len(descartada.corpo)
+                self.descartes += 1
+        return resposta
+
+    def medidas(self):
+        """
+        Returns:
+            list[tuple]: Métricas do cache no formato aceito por formatar_medidas
+        """
+        with self._trava:
+            entradas, tamanho = len(self._entradas), self._bytes
+        return [
+            ("cache_respostas_total", "counter", "Consultas ao cache de respostas, por resultado", [
+                ({"resultado": "acerto"}, self.acertos),
+                ({"resultado": "falta"}, self.faltas),
+            ]),
+            ("cache_respostas_descartes_total", "counter", "Respostas descartadas pela política LRU",
+             [({}, self.descartes)]),
+            ("cache_respostas_entradas", "gauge", "Respostas guardadas no cache", [({}, entradas)]),
+            ("cache_respostas_bytes", "gauge", "Tamanho dos corpos guardados no cache", [({}, tamanho)]),
+        ]
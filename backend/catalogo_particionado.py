@@ -0,0 +1,1307 @@
+"""
+Módulo de Catálogo Particionado
+Distribui os produtos entre vários processos, cada um com o próprio
+CatalogoProdutosAVL (e a própria árvore AVL), para que listagens, buscas e
+relatórios usem mais de um núcleo apesar do GIL
+
+- Partição pelo código (hash): cada operação pontual (buscar, adicionar,
+  remover, atualizar, reservar) vai para um único processo
+- Consultas por faixa, listagens, buscas por nome e relatórios são enviados a
+  todas as partições ao mesmo tempo e combinados no coordenador, com
+  intercalação k-way (heapq.merge) na ordem da chave (preco, codigo)
+- Cada versão do coordenador corresponde a uma versão de cada partição,
+  então as leituras com versao= e a restauração continuam funcionando
+
+O coordenador tem a própria trava de leitura/escrita: uma escrita que toca
+várias partições (lotes, troca de código entre partições, restauração) só
+fica visível quando termina, e as leituras combinadas veem um único estado.
+Listagens, contagens, estatísticas e diagramas fixam a versão de cada
+partição e por isso leem sem a trava, sem esperar as escritas. A busca por
+nome, os relatórios e as consultas por posição leem o estado atual das
+partições (o índice de nomes e os agregados por categoria não têm versões)
+e usam a trava de leitura: enquanto uma escrita em várias partições está em
+andamento, elas esperam por ela (bench_particoes.py --escritores mostra o
+efeito). Cada partição atende uma chamada por vez, no seu processo.
+Os processos são iniciados com 'spawn', seguro com as threads da API.
+"""
+
+import heapq
+import logging
+import math
+import multiprocessing
+import os
+import re
+import threading
+from itertools import islice
+from operator import itemgetter
+
+from arvore_avl import PerfilArvore
+from catalogo_produtos_avl import CatalogoProdutosAVL, chave_produto
+from indice_nomes import palavras
+from log_estruturado import configurar_log
+from metricas import MetricasOperacoes, medido
+from modelo import TipoOperacaoEnum
+from persistencia import PADRAO_ARQUIVO, PersistenciaCatalogo
+from trava_leitura_escrita import TravaLeituraEscrita, com_escrita, com_leitura
+from visao_analitica import resumo_das_somas
+
+logger = logging.getLogger(__name__)
+
+# Produtos pedidos a cada partição por vez ao percorrer o catálogo inteiro
+TAMANHO_LOTE_PERCURSO = 1000
+
+PADRAO_DIRETORIO = re.compile(r"^particao-(\d{2})$")
+
+# Chave (preco, codigo) de um produto já convertido em dicionário
+_chave_dict = itemgetter("preco", "codigo")
+
+
+class CatalogoParticao(CatalogoProdutosAVL):
+    """
+    Catálogo de uma partição, executado no processo dela
+    Acrescenta ao CatalogoProdutosAVL as consultas de que o coordenador
+    precisa para combinar os resultados das partições sem perder exatidão
+    (somas ainda sem arredondar, postos por chave, candidatas da busca por
+    nome), versões fixadas pelos percursos longos e a persistência em um
+    subdiretório próprio
+    """
+
+    def __init__(self, max_versoes=64):
+        """
+        Args:
+            max_versoes (int): Quantidade de versões mantidas para consulta e restauração
+        """
+        super().__init__(max_versoes)
+        self.persistencia = None
+        # Versão → [instantâneo, percursos que a usam]; o processo atende uma chamada por vez
+        self._fixadas = {}
+
+    def _obter_versao(self, versao=None):
+        """
+        Obtém a versão publicada usada por uma leitura, incluindo as fixadas
+        que já saíram das max_versoes mantidas
+        
+        Args:
+            versao (int | None): Número da versão (None para a mais recente)
+        
+        Returns:
+            Instantaneo: Versão da árvore
+        
+        Raises:
+            LookupError: Se a versão não existir ou já tiver sido descartada
+        """
+        fixada = self._fixadas.get(versao)
+        if fixada is not None:
+            return fixada[0]
+        return super()._obter_versao(versao)
+
+    def fixar_versao(self, versao):
+        """
+        Mantém uma versão legível até liberar_versao, mesmo depois de
+        descartada do histórico (um percurso longo continua lendo dela)
+        
+        Args:
+            versao (int): Versão da partição
+        
+        Returns:
+            bool: Se a versão estava disponível e foi fixada
+        """
+        try:
+            instantaneo = self._obter_versao(versao)
+        except LookupError:
+            return False
+        self._fixadas.setdefault(versao, [instantaneo, 0])[1] += 1
+        return True
+
+    def liberar_versao(self, versao):
+        """
+        Desfaz um fixar_versao; a versão volta a seguir o histórico quando
+        nenhum percurso a usa mais
+        
+        Args:
+            versao (int): Versão da partição
+        """
+        fixada = self._fixadas.get(versao)
+        if fixada is None:
+            return
+        fixada[1] -= 1
+        if not fixada[1]:
+            del self._fixadas[versao]
+
+    def abrir_persistencia(self, diretorio):
+        """
+        Carrega a partição do seu diretório e passa a gravar as alterações
+        
+        Args:
+            diretorio (str): Diretório de dados da partição
+        
+        Returns:
+            dict: Resultado de PersistenciaCatalogo.carregar
+        """
+        self.persistencia = PersistenciaCatalogo(self, diretorio)
+        return self.persistencia.carregar()
+
+    def sincronizar(self):
+        """Aguarda as alterações anotadas chegarem ao disco (se houver persistência)"""
+        if self.persistencia is not None:
+            self.persistencia.sincronizar()
+
+    def fechar_persistencia(self):
+        """Grava o que estiver pendente e encerra a persistência, se houver"""
+        if self.persistencia is not None:
+            self.persistencia.fechar()
+            self.persistencia = None
+
+    @com_leitura
+    def produtos_por_codigo(self, codigos):
+        """
+        Args:
+            codigos (list[int]): Códigos procurados
+        
+        Returns:
+            dict[int, Produto]: Os produtos encontrados, por código
+        """
+        return {codigo: self.indice_codigo[codigo] for codigo in codigos if codigo in self.indice_codigo}
+
+    def contar_menores(self, chave):
+        """
+        Args:
+            chave (tuple): Chave (preco, codigo)
+        
+        Returns:
+            int: Produtos da versão mais recente com chave menor que a informada
+        """
+        return self.avl.atual.contar_menores(chave)
+
+    def estatisticas_brutas(self, versao=None):
+        """
+        Agregados de uma versão ainda sem arredondar, para somar entre partições
+        
+        Args:
+            versao (int | None): Versão a ler (None para a mais recente)
+        
+        Returns:
+            dict: Agregados publicados com a versão, altura, total e faixa de preço
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        instantaneo = self._obter_versao(versao)
+        raiz = instantaneo.raiz
+        return {
+            **instantaneo.dados,
+            "altura": instantaneo.obter_altura(raiz),
+            "total_produtos": instantaneo.obter_tamanho(raiz),
+            "preco_minimo": instantaneo.obter_no_minimo(raiz).valor.preco if raiz else None,
+            "preco_maximo": instantaneo.obter_no_maximo(raiz).valor.preco if raiz else None,
+        }
+
+    def resumo_particao(self):
+        """
+        Returns:
+            dict: Produtos, altura, versão e rotações da partição (para as métricas)
+        """
+        instantaneo = self.avl.atual
+        return {
+            "produtos": instantaneo.obter_tamanho(instantaneo.raiz),
+            "altura": instantaneo.obter_altura(instantaneo.raiz),
+            "versao": instantaneo.versao,
+            "rotacoes_simples": self.avl.rotacoes_simples,
+            "rotacoes_duplas": self.avl.rotacoes_duplas,
+        }
+
+    def perfil_bruto(self):
+        """
+        Returns:
+            PerfilArvore | None: Contadores do perfil da árvore (None se desligado)
+        """
+        return self.avl.perfil
+
+    @com_leitura
+    def palavras_com_prefixo(self, termos):
+        """
+        Args:
+            termos (list[str]): Palavras normalizadas da consulta
+        
+        Returns:
+            list[list[str]]: Palavras do vocabulário da partição com cada prefixo
+        """
+        return [self.indice_nomes.com_prefixo(termo) for termo in termos]
+
+    @com_leitura
+    def palavras_parecidas(self, termo):
+        """
+        Args:
+            termo (str): Palavra normalizada sem prefixo correspondente
+        
+        Returns:
+            list[tuple]: Pares (-similaridade, palavra) do vocabulário da partição
+        """
+        return self.indice_nomes.parecidas_pontuadas(termo)
+
+    @com_leitura
+    def buscar_por_grupos(self, grupos, limite):
+        """
+        Busca por nome com as palavras já escolhidas pelo coordenador a partir
+        do vocabulário de todas as partições
+        
+        Args:
+            grupos (list[list[str]]): Palavras aceitas para cada palavra da consulta
+            limite (int): Máximo de produtos devolvidos
+        
+        Returns:
+            list[Produto]: Produtos encontrados, do mais barato ao mais caro
+        """
+        codigos = self.indice_nomes.codigos
+        presentes = [[palavra for palavra in grupo if palavra in codigos] for grupo in grupos]
+        if not all(presentes):
+            return []
+        return self._buscar_por_grupos(presentes, limite)
+
+    def somas_categorias(self, preco_min=None, preco_max=None):
+        """
+        Args:
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+        
+        Returns:
+            np.ndarray: Somas do total e de cada categoria (VisaoAnalitica.somas_por_categoria)
+        """
+        return self._com_visao(
+            lambda visao: {"somas": visao.somas_por_categoria(visao.selecionar(preco_min, preco_max))}
+        )["somas"]
+
+    def faixa_precos(self, preco_min=None, preco_max=None, categorias=None, modo="ou"):
+        """
+        Menor e maior preço dos produtos selecionados (início e fim padrão do histograma)
+        
+        Returns:
+            tuple | None: (menor, maior) ou None se nenhum produto for selecionado
+        """
+        def relatorio(visao):
+            selecao = visao.selecionar(preco_min, preco_max, categorias, modo)
+            precos = visao.precos if selecao is None else visao.precos[selecao]
+            return {"faixa": (float(precos.min()), float(precos.max())) if len(precos) else None}
+        return self._com_visao(relatorio)["faixa"]
+
+
+def _executar_particao(conexao, max_versoes, nivel_log):
+    """
+    Laço principal do processo de uma partição
+    Atende uma chamada por vez: recebe (método, args, kwargs), executa no
+    catálogo da partição e responde (True, resultado) ou (False, exceção).
+    Termina ao receber None ou quando o coordenador fecha a conexão.
+    
+    Args:
+        conexao (Connection): Ponta da partição no Pipe com o coordenador
+        max_versoes (int): Versões mantidas pelo catálogo da partição
+        nivel_log (str): Nível de log do processo do coordenador
+    """
+    configurar_log(nivel_log)
+    catalogo = CatalogoParticao(max_versoes)
+    try:
+        while True:
+            try:
+                mensagem = conexao.recv()
+            except EOFError:
+                break
+            if mensagem is None:
+                break
+            metodo, args, kwargs = mensagem
+            try:
+                resposta = (True, getattr(catalogo, metodo)(*args, **kwargs))
+            except Exception as erro:
+                resposta = (False, erro)
+            try:
+                conexao.send(resposta)
+            except Exception as erro:
+                # Resultado ou exceção que não pôde ser serializado
+                conexao.send((False, RuntimeError(f"{metodo}: {erro!r}")))
+    finally:
+        catalogo.fechar_persistencia()
+
+
+class CatalogoParticionado:
+    """
+    Coordenador de um catálogo dividido em partições pelo código
+    Oferece as operações do CatalogoProdutosAVL usadas pela API; cada uma é
+    encaminhada à partição do código ou difundida a todas, que trabalham em
+    paralelo em processos separados.
+    
+    Os métodos públicos são seguros entre threads. Cada conexão com uma
+    partição atende uma chamada por vez; chamadas difundidas tomam as
+    conexões em ordem de partição, sem impasse.
+    """
+
+    def __init__(self, particoes=None, max_versoes=64):
+        """
+        Inicia os processos das partições, com catálogos vazios
+        
+        Args:
+            particoes (int | None): Quantidade de partições (padrão: núcleos disponíveis)
+            max_versoes (int): Versões mantidas pelo coordenador e por partição
+        """
+        particoes = particoes or os.cpu_count() or 1
+        contexto = multiprocessing.get_context("spawn")
+        nivel_log = logging.getLevelName(logging.getLogger().getEffectiveLevel())
+        self._conexoes = []
+        self._travas_conexao = []
+        self._processos = []
+        for indice in range(particoes):
+            local, remota = contexto.Pipe()
+            processo = contexto.Process(
+                target=_executar_particao, args=(remota, max_versoes, nivel_log),
+                name=f"particao-{indice}", daemon=True,
+            )
+            processo.start()
+            remota.close()
+            self._conexoes.append(local)
+            # Só as threads do coordenador disputam a conexão
+            self._travas_conexao.append(threading.Lock())
+            self._processos.append(processo)
+        self.max_versoes = max_versoes
+        self.trava = TravaLeituraEscrita()
+        # Contagem e latência por operação (medidas no coordenador, com a espera pelas partições)
+        self.metricas = MetricasOperacoes()
+        # versão do coordenador → versão de cada partição, da mais antiga para a mais recente
+        self.versoes = {0: tuple(self._difundir("versao_atual"))}
+        self.versao = 0
+        # (versão, versões das partições) mais recente, trocada de uma vez
+        # para as leituras sem trava
+        self._publicada = (0, self.versoes[0])
+
+    @property
+    def particoes(self):
+        """int: Quantidade de partições"""
+        return len(self._conexoes)
+
+    def _particao(self, codigo):
+        """
+        Args:
+            codigo (int): Código do produto
+        
+        Returns:
+            int: Índice da partição dona do código
+        """
+        # Hash multiplicativo (Fibonacci): códigos sequenciais ou com passo
+        # fixo se espalham por igual entre as partições
+        return (((codigo * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) * len(self._conexoes)) >> 64
+
+    def _executar(self, chamadas):
+        """
+        Envia chamadas a várias partições e aguarda todas as respostas
+        As partições executam em paralelo; todas as respostas são lidas antes
+        de qualquer erro ser levantado, para as conexões não ficarem com
+        respostas pendentes
+        
+        Args:
+            chamadas (dict[int, tuple]): Partição → (método, args, kwargs)
+        
+        Returns:
+            dict[int, object]: Partição → resultado
+        
+        Raises:
+            Exception: O primeiro erro levantado por uma partição
+        """
+        indices = sorted(chamadas)
+        for indice in indices:
+            self._travas_conexao[indice].acquire()
+        try:
+            for indice in indices:
+                self._conexoes[indice].send(chamadas[indice])
+            respostas = {indice: self._conexoes[indice].recv() for indice in indices}
+        finally:
+            for indice in indices:
+                self._travas_conexao[indice].release()
+        for sucesso, valor in respostas.values():
+            if not sucesso:
+                raise valor
+        return {indice: valor for indice, (_, valor) in respostas.items()}
+
+    def _chamar(self, indice, metodo, *args, **kwargs):
+        """
+        Returns:
+            object: Resultado do método na partição informada
+        """
+        return self._executar({indice: (metodo, args, kwargs)})[indice]
+
+    def _difundir(self, metodo, *args, **kwargs):
+        """
+        Returns:
+            list: Resultado do método em cada partição, em ordem de partição
+        """
+        resultados = self._executar({indice: (metodo, args, kwargs) for indice in range(len(self._conexoes))})
+        return [resultados[indice] for indice in range(len(self._conexoes))]
+
+    def _agrupar(self, codigos):
+        """
+        Args:
+            codigos (iterable): Códigos de produtos
+        
+        Returns:
+            dict[int, list[int]]: Partição → códigos dela, na ordem recebida
+        """
+        grupos = {}
+        for codigo in codigos:
+            grupos.setdefault(self._particao(codigo), []).append(codigo)
+        return grupos
+
+    def _publicar(self, indices=None):
+        """
+        Registra uma nova versão do coordenador se alguma partição publicou
+        Chamado ao fim de cada escrita, ainda sob a trava de escrita
+        
+        Args:
+            indices (iterable | None): Partições que podem ter mudado (None para todas)
+        """
+        anteriores = self.versoes[self.versao]
+        atuais = list(anteriores)
+        indices = range(len(atuais)) if indices is None else indices
+        for indice, versao in self._executar({indice: ("versao_atual", (), {}) for indice in indices}).items():
+            atuais[indice] = versao
+        atuais = tuple(atuais)
+        if atuais == anteriores:
+            return
+        self.versoes[self.versao + 1] = atuais
+        self.versao += 1
+        self._publicada = (self.versao, atuais)
+        while len(self.versoes) > self.max_versoes:
+            del self.versoes[next(iter(self.versoes))]
+
+    def _versao_publicada(self, versao=None):
+        """
+        Resolve uma versão para uma leitura sem trava
+        As versões das partições de uma versão publicada não mudam, então a
+        leitura vê um único estado mesmo com uma escrita em andamento
+        
+        Args:
+            versao (int | None): Versão do coordenador (None para a mais recente)
+        
+        Returns:
+            tuple: (versão do coordenador, versão correspondente de cada partição)
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        if versao is None:
+            return self._publicada
+        versoes = self.versoes.get(versao)
+        if versoes is None:
+            raise LookupError(f"Versão {versao} não está disponível")
+        return versao, versoes
+
+    @com_escrita
+    def abrir_persistencia(self, diretorio):
+        """
+        Carrega cada partição do seu subdiretório (particao-NN) e passa a
+        gravar as alterações nele (o mesmo formato da PersistenciaCatalogo)
+        
+        Args:
+            diretorio (str): Diretório de dados
+        
+        Returns:
+            dict: Produtos dos instantâneos e operações reaplicadas (somados)
+                e segundos gastos
+        
+        Raises:
+            ValueError: Se o diretório tiver sido gravado sem partições ou com
+                outra quantidade delas (os códigos estariam nas partições erradas)
+        """
+        os.makedirs(diretorio, exist_ok=True)
+        nomes = os.listdir(diretorio)
+        if any(PADRAO_ARQUIVO.match(nome) for nome in nomes):
+            raise ValueError(f"{diretorio} contém um catálogo não particionado")
+        existentes = [nome for nome in nomes if PADRAO_DIRETORIO.match(nome)]
+        if existentes and len(existentes) != len(self._conexoes):
+            raise ValueError(f"{diretorio} foi gravado com {len(existentes)} partições, não {len(self._conexoes)}")
+        cargas = self._executar({
+            indice: ("abrir_persistencia", (os.path.join(diretorio, f"particao-{indice:02d}"),), {})
+            for indice in range(len(self._conexoes))
+        }).values()
+        self._publicar()
+        return {
+            "produtos_snapshot": sum(carga["produtos_snapshot"] for carga in cargas),
+            "operacoes_reaplicadas": sum(carga["operacoes_reaplicadas"] for carga in cargas),
+            "segundos": max(carga["segundos"] for carga in cargas),
+            "particoes": len(self._conexoes),
+        }
+
+    def sincronizar(self):
+        """
+        Aguarda todas as alterações anotadas pelas partições chegarem ao disco
+        Chamado fora da trava do coordenador, como PersistenciaCatalogo.sincronizar
+        """
+        self._difundir("sincronizar")
+
+    def fechar(self):
+        """Encerra a persistência das partições e os processos"""
+        self.trava.adquirir_escrita()
+        try:
+            self._difundir("fechar_persistencia")
+            for conexao in self._conexoes:
+                conexao.send(None)
+            for processo in self._processos:
+                processo.join(timeout=10)
+        finally:
+            self.trava.liberar_escrita()
+
+    def _mover(self, origem, codigo, novo_produto):
+        """
+        Troca o código de um produto para um código de outra partição
+        O produto novo é incluído antes de o antigo ser retirado: uma queda
+        entre as duas gravações deixa os dois códigos, sem perder o produto
+        
+        Args:
+            origem (int): Partição do código atual
+            codigo (int): Código atual, cadastrado
+            novo_produto (Produto): Novos dados, com o código da outra partição
+        
+        Raises:
+            ValueError: Se o novo código já pertencer a outro produto
+        """
+        destino = self._particao(novo_produto.codigo)
+        if self._chamar(destino, "buscar_produto", novo_produto.codigo) is not None:
+            raise ValueError(f"Produto {novo_produto.codigo} já cadastrado")
+        self._chamar(destino, "adicionar_produto", novo_produto)
+        self._chamar(origem, "remover_produto", codigo)
+
+    @medido("inserir")
+    @com_escrita
+    def adicionar_produto(self, produto):
+        """
+        Adiciona um produto na partição do seu código
+        
+        Raises:
+            ValueError: Se já existir um produto com o mesmo código
+        """
+        indice = self._particao(produto.codigo)
+        self._chamar(indice, "adicionar_produto", produto)
+        self._publicar([indice])
+
+    @medido("inserir_lote")
+    @com_escrita
+    def adicionar_produtos_lote(self, produtos):
+        """
+        Adiciona vários produtos de uma vez (tudo ou nada)
+        Os códigos já cadastrados são procurados em todas as partições antes
+        de qualquer inclusão; cada partição recebe a sua parte do lote
+        
+        Args:
+            produtos (list[Produto]): Produtos a serem adicionados
+        
+        Returns:
+            int: Quantidade de produtos adicionados
+        
+        Raises:
+            ValueError: Se houver códigos repetidos no lote ou já cadastrados
+        """
+        vistos = set()
+        repetidos = set()
+        for produto in produtos:
+            if produto.codigo in vistos:
+                repetidos.add(produto.codigo)
+            vistos.add(produto.codigo)
+        grupos = {}
+        for produto in produtos:
+            grupos.setdefault(self._particao(produto.codigo), []).append(produto)
+        cadastrados = self._executar({
+            indice: ("produtos_por_codigo", ([produto.codigo for produto in grupo],), {})
+            for indice, grupo in grupos.items()
+        })
+        for encontrados in cadastrados.values():
+            repetidos.update(encontrados)
+        if repetidos:
+            raise ValueError(f"Códigos repetidos ou já cadastrados: {sorted(repetidos)}")
+        self._executar({indice: ("adicionar_produtos_lote", (grupo,), {}) for indice, grupo in grupos.items()})
+        self._publicar(grupos)
+        return len(produtos)
+
+    @medido("remover")
+    @com_escrita
+    def remover_produto(self, codigo):
+        """
+        Returns:
+            Produto | None: Produto removido ou None se não existir
+        """
+        indice = self._particao(codigo)
+        produto = self._chamar(indice, "remover_produto", codigo)
+        if produto is not None:
+            self._publicar([indice])
+        return produto
+
+    @medido("atualizar")
+    @com_escrita
+    def atualizar_produto(self, codigo, novo_produto):
+        """
+        Substitui um produto; um novo código de outra partição move o produto
+        
+        Returns:
+            Produto | None: Produto atualizado ou None se o código não existir
+        
+        Raises:
+            ValueError: Se o novo código já pertencer a outro produto
+        """
+        origem = self._particao(codigo)
+        if self._particao(novo_produto.codigo) == origem:
+            produto = self._chamar(origem, "atualizar_produto", codigo, novo_produto)
+            if produto is not None:
+                self._publicar([origem])
+            return produto
+        if self._chamar(origem, "buscar_produto", codigo) is None:
+            return None
+        self._mover(origem, codigo, novo_produto)
+        self._publicar([origem, self._particao(novo_produto.codigo)])
+        return novo_produto
+
+    @medido("atualizar")
+    @com_escrita
+    def atualizar_parcial(self, codigo, alteracoes):
+        """
+        Altera só os campos informados; um novo código de outra partição move o produto
+        
+        Returns:
+            Produto | None: Produto alterado ou None se o código não existir
+        
+        Raises:
+            ValueError: Se o novo código já pertencer a outro produto
+        """
+        origem = self._particao(codigo)
+        if alteracoes.codigo is None or self._particao(alteracoes.codigo) == origem:
+            produto = self._chamar(origem, "atualizar_parcial", codigo, alteracoes)
+            if produto is not None:
+                self._publicar([origem])
+            return produto
+        produto = self._chamar(origem, "buscar_produto", codigo)
+        if produto is None:
+            return None
+        novo_produto = produto.model_copy(update=alteracoes.model_dump(exclude_unset=True, exclude_none=True))
+        self._mover(origem, codigo, novo_produto)
+        self._publicar([origem, self._particao(novo_produto.codigo)])
+        return novo_produto
+
+    @medido("reservar")
+    @com_escrita
+    def reservar_estoque(self, codigo, quantidade):
+        """
+        Returns:
+            Produto | None: Produto com o estoque atualizado ou None se o código não existir
+        
+        Raises:
+            ValueError: Se a quantidade não for positiva ou o estoque for insuficiente
+        """
+        indice = self._particao(codigo)
+        produto = self._chamar(indice, "reservar_estoque", codigo, quantidade)
+        if produto is not None:
+            self._publicar([indice])
+        return produto
+
+    @medido("reservar_lote")
+    @com_escrita
+    def reservar_lote(self, itens):
+        """
+        Reserva vários produtos de uma vez (tudo ou nada)
+        Os estoques de todas as partições envolvidas são conferidos antes de
+        qualquer baixa; sob a trava de escrita eles não mudam até a baixa
+        
+        Args:
+            itens (iterable): Pares (codigo, quantidade); códigos repetidos são somados
+        
+        Returns:
+            list[Produto]: Produtos com o estoque atualizado, um por código
+        
+        Raises:
+            LookupError: Se algum código não existir
+            ValueError: Se alguma quantidade não for positiva ou o estoque for insuficiente
+        """
+        pedidos = {}
+        for codigo, quantidade in itens:
+            if quantidade <= 0:
+                raise ValueError("A quantidade reservada deve ser maior que zero")
+            pedidos[codigo] = pedidos.get(codigo, 0) + quantidade
+        grupos = self._agrupar(pedidos)
+        encontrados = {}
+        for produtos in self._executar({
+            indice: ("produtos_por_codigo", (codigos,), {}) for indice, codigos in grupos.items()
+        }).values():
+            encontrados.update(produtos)
+        faltando = [codigo for codigo in pedidos if codigo not in encontrados]
+        if faltando:
+            raise LookupError(f"Produtos não encontrados: {faltando}")
+        insuficientes = [codigo for codigo, quantidade in pedidos.items()
+                         if quantidade > encontrados[codigo].quantidade]
+        if insuficientes:
+            raise ValueError(f"Estoque insuficiente para os produtos: {insuficientes}")
+        reservados = {}
+        for produtos in self._executar({
+            indice: ("reservar_lote", ([(codigo, pedidos[codigo]) for codigo in codigos],), {})
+            for indice, codigos in grupos.items()
+        }).values():
+            reservados.update((produto.codigo, produto) for produto in produtos)
+        self._publicar(grupos)
+        return [reservados[codigo] for codigo in pedidos]
+
+    def _particoes_da_operacao(self, operacao):
+        """
+        Args:
+            operacao (Operacao): Item de um lote de operações
+        
+        Returns:
+            tuple: (partição do código atual, partição do código resultante);
+                itens sem código vão para a partição 0, que os rejeita
+        """
+        codigo = operacao.codigo
+        if operacao.tipo == TipoOperacaoEnum.ADICIONAR and operacao.produto is not None:
+            codigo = operacao.produto.codigo
+        origem = self._particao(codigo) if codigo is not None else 0
+        if operacao.tipo != TipoOperacaoEnum.ATUALIZAR or operacao.codigo is None:
+            return origem, origem
+        if operacao.produto is not None:
+            novo_codigo = operacao.produto.codigo
+        elif operacao.alteracoes is not None:
+            novo_codigo = operacao.alteracoes.codigo
+        else:
+            novo_codigo = None
+        return origem, self._particao(novo_codigo) if novo_codigo is not None else origem
+
+    def _aplicar_trecho(self, trecho, resultados):
+        """
+        Aplica em paralelo as operações de um trecho do lote, cada partição
+        com as suas (na ordem do lote)
+        
+        Args:
+            trecho (dict[int, list[tuple]]): Partição → pares (posição no lote, operação)
+            resultados (list): Resultados do lote, preenchidos nas posições do trecho
+        """
+        if not trecho:
+            return
+        respostas = self._executar({
+            indice: ("aplicar_operacoes", ([operacao for _, operacao in itens],), {})
+            for indice, itens in trecho.items()
+        })
+        for indice, itens in trecho.items():
+            for (posicao, _), resultado in zip(itens, respostas[indice]):
+                resultados[posicao] = resultado
+
+    @medido("operacoes")
+    @com_escrita
+    def aplicar_operacoes(self, operacoes):
+        """
+        Aplica um lote misto de inserções, remoções e atualizações
+        Itens de partições diferentes não dependem uns dos outros, então cada
+        partição aplica os seus em paralelo, na ordem do lote. Uma atualização
+        que move o produto para outra partição divide o lote: os itens
+        anteriores são aplicados, ela é feita sozinha e o lote continua, o
+        que preserva a ordem em que os itens valem. O lote inteiro vira uma
+        única versão do coordenador.
+        
+        Args:
+            operacoes (list[Operacao]): Itens do lote
+        
+        Returns:
+            list: Para cada item, o produto resultante (o removido, em
+                remover) ou o erro (LookupError ou ValueError), como em
+                CatalogoProdutosAVL.aplicar_operacoes
+        """
+        resultados = [None] * len(operacoes)
+        trecho = {}
+        tocadas = set()
+        for posicao, operacao in enumerate(operacoes):
+            origem, destino = self._particoes_da_operacao(operacao)
+            if origem == destino:
+                trecho.setdefault(origem, []).append((posicao, operacao))
+                continue
+            self._aplicar_trecho(trecho, resultados)
+            tocadas.update(trecho)
+            trecho = {}
+            try:
+                produto = self._chamar(origem, "buscar_produto", operacao.codigo)
+                if produto is None:
+                    raise LookupError(f"Produto {operacao.codigo} não encontrado")
+                if operacao.produto is not None:
+                    novo_produto = operacao.produto
+                else:
+                    novo_produto = produto.model_copy(
+                        update=operacao.alteracoes.model_dump(exclude_unset=True, exclude_none=True)
+                    )
+                self._mover(origem, operacao.codigo, novo_produto)
+                tocadas.update((origem, destino))
+                resultados[posicao] = novo_produto
+            except (LookupError, ValueError) as erro:
+                resultados[posicao] = erro
+        self._aplicar_trecho(trecho, resultados)
+        tocadas.update(trecho)
+        self._publicar(tocadas)
+        return resultados
+
+    @medido("restaurar")
+    @com_escrita
+    def restaurar_versao(self, versao):
+        """
+        Volta cada partição à sua versão correspondente à versão informada
+        
+        Args:
+            versao (int): Versão do coordenador a restaurar
+        
+        Returns:
+            int | None: Número da nova versão ou None se a versão não estiver
+                disponível (no coordenador ou em alguma partição)
+        """
+        alvos = self.versoes.get(versao)
+        if alvos is None:
+            return None
+        disponiveis = [
+            {item["versao"] for item in versoes} for versoes in self._difundir("listar_versoes")
+        ]
+        if any(alvo not in versoes for alvo, versoes in zip(alvos, disponiveis)):
+            return None
+        atuais = self.versoes[self.versao]
+        mudar = {indice: alvo for indice, alvo in enumerate(alvos) if alvo != atuais[indice]}
+        self._executar({indice: ("restaurar_versao", (alvo,), {}) for indice, alvo in mudar.items()})
+        self._publicar(mudar)
+        logger.info("Versão %d restaurada como versão %d", versao, self.versao, extra={"operacao": "restaurar", "versao": versao, "nova_versao": self.versao})
+        return self.versao
+
+    def listar_versoes(self):
+        """
+        Returns:
+            list[dict]: Número e total de produtos de cada versão ainda
+                disponível em todas as partições, da mais antiga à mais recente
+        """
+        totais = [
+            {item["versao"]: item["total_produtos"] for item in versoes}
+            for versoes in self._difundir("listar_versoes")
+        ]
+        return [
+            {"versao": versao, "total_produtos": sum(totais[i][alvo] for i, alvo in enumerate(alvos))}
+            for versao, alvos in list(self.versoes.items())
+            if all(alvo in totais[i] for i, alvo in enumerate(alvos))
+        ]
+
+    @medido("buscar")
+    def buscar_produto(self, codigo):
+        """
+        Busca um produto pelo código na partição dele
+        
+        Returns:
+            Produto | None: Produto encontrado ou None se não existir
+        """
+        return self._chamar(self._particao(codigo), "buscar_produto", codigo)
+
+    @medido("buscar")
+    @com_leitura
+    def buscar_produto_versao(self, codigo):
+        """
+        Busca um produto junto com a versão do coordenador que o contém
+        (sob a trava de leitura, nenhuma escrita está no meio)
+        
+        Returns:
+            tuple: (versão lida, Produto encontrado ou None)
+        """
+        return self.versao, self._chamar(self._particao(codigo), "buscar_produto", codigo)
+
+    def listar_produtos(self):
+        """
+        Returns:
+            list: Todos os produtos em ordem de preço
+        """
+        return list(self.iterar_produtos())
+
+    def _percorrer_particao(self, indice, versao, cursor, preco_min, preco_max, categorias, modo):
+        """
+        Percorre uma versão de uma partição em páginas de TAMANHO_LOTE_PERCURSO
+        
+        Yields:
+            dict: Produtos da partição em ordem de chave
+        """
+        while True:
+            produtos, cursor, _ = self._chamar(
+                indice, "listar_pagina", TAMANHO_LOTE_PERCURSO, cursor, preco_min, preco_max, categorias, modo, versao
+            )
+            yield from produtos
+            if cursor is None:
+                return
+
+    def iterar_produtos(self, cursor=None, preco_min=None, preco_max=None, categorias=None, modo="ou",
+                        versao=None):
+        """
+        Percorre os produtos em ordem de preço sob demanda, intercalando as partições
+        Cada partição é lida em páginas, sempre na versão resolvida na
+        chamada. Essas versões são fixadas nas partições antes de o percurso
+        começar (o LookupError vem aqui, não no meio de uma resposta) e
+        liberadas quando ele termina ou é descartado, então escritas
+        publicadas durante um percurso longo não o interrompem.
+        
+        Returns:
+            iterator: Dicionários com os dados de cada produto
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        _, versoes = self._versao_publicada(versao)
+        percurso = self._percorrer_fixadas(versoes, cursor, preco_min, preco_max, categorias, modo)
+        # Avança até a primeira pausa: fixa as versões e entra no try que as libera
+        next(percurso)
+        return percurso
+
+    def _percorrer_fixadas(self, versoes, cursor, preco_min, preco_max, categorias, modo):
+        """
+        Fixa as versões das partições, pausa uma vez (em iterar_produtos) e
+        intercala os percursos das partições, liberando as versões no final
+        
+        Yields:
+            dict | None: None na pausa inicial, depois os produtos em ordem de chave
+        
+        Raises:
+            LookupError: Se alguma partição já tiver descartado a sua versão
+        """
+        fixadas = []
+        try:
+            resultados = self._executar({
+                indice: ("fixar_versao", (versao_particao,), {})
+                for indice, versao_particao in enumerate(versoes)
+            })
+            fixadas = [indice for indice, fixada in resultados.items() if fixada]
+            if len(fixadas) < len(versoes):
+                raise LookupError("Versão não está mais disponível em todas as partições")
+            yield None
+            yield from heapq.merge(*(
+                self._percorrer_particao(indice, versao_particao, cursor, preco_min, preco_max, categorias, modo)
+                for indice, versao_particao in enumerate(versoes)
+            ), key=_chave_dict)
+        finally:
+            if fixadas:
+                try:
+                    self._executar({indice: ("liberar_versao", (versoes[indice],), {}) for indice in fixadas})
+                except (OSError, EOFError):
+                    # Catálogo já fechado: as partições não existem mais
+                    pass
+
+    @medido("listar")
+    def listar_pagina(self, limite, cursor=None, preco_min=None, preco_max=None, categorias=None, modo="ou",
+                      versao=None):
+        """
+        Lista uma página de produtos em ordem de preço
+        Cada partição devolve a sua página de até limite produtos após o
+        cursor; a página final é o início da intercalação delas
+        
+        Returns:
+            tuple: (lista de produtos, chave para a próxima página ou None, versão lida)
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        versao, versoes = self._versao_publicada(versao)
+        paginas = self._executar({
+            indice: ("listar_pagina", (limite, cursor, preco_min, preco_max, categorias, modo, versao_particao), {})
+            for indice, versao_particao in enumerate(versoes)
+        })
+        produtos = list(islice(heapq.merge(*(pagina for pagina, _, _ in paginas.values()), key=_chave_dict), limite))
+        restantes = any(proximo is not None for _, proximo, _ in paginas.values()) or \
+            sum(len(pagina) for pagina, _, _ in paginas.values()) > len(produtos)
+        proximo = _chave_dict(produtos[-1]) if restantes and produtos else None
+        return produtos, proximo, versao
+
+    @medido("buscar_nome")
+    @com_leitura
+    def buscar_por_nome(self, consulta, limite=20, aproximada=True):
+        """
+        Busca produtos pelo nome, em ordem de preço
+        As palavras aceitas para cada palavra da consulta são escolhidas no
+        vocabulário de todas as partições juntas (prefixo ou, sem nenhum
+        prefixo, as mais parecidas), com o mesmo resultado do catálogo único
+        
+        Returns:
+            list[Produto]: Produtos encontrados, do mais barato ao mais caro
+        """
+        termos = palavras(consulta)
+        if not termos:
+            return []
+        por_particao = self._difundir("palavras_com_prefixo", termos)
+        grupos = []
+        for posicao, termo in enumerate(termos):
+            encontradas = sorted(set().union(*(prefixos[posicao] for prefixos in por_particao)))
+            if not encontradas and aproximada:
+                pontuadas = set().union(*self._difundir("palavras_parecidas", termo))
+                encontradas = [palavra for _, palavra in sorted(pontuadas)[:5]]
+            if not encontradas:
+                return []
+            grupos.append(encontradas)
+        resultados = self._difundir("buscar_por_grupos", grupos, limite)
+        return list(islice(heapq.merge(*resultados, key=chave_produto), limite))
+
+    @medido("contar")
+    def contar_por_preco(self, preco_min=None, preco_max=None, versao=None):
+        """
+        Returns:
+            int: Quantidade de produtos na faixa, somada entre as partições
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        _, versoes = self._versao_publicada(versao)
+        return sum(self._executar({
+            indice: ("contar_por_preco", (preco_min, preco_max, versao_particao), {})
+            for indice, versao_particao in enumerate(versoes)
+        }).values())
+
+    @medido("posicao")
+    @com_leitura
+    def produto_por_posicao(self, posicao):
+        """
+        Busca o k-ésimo produto mais barato entre todas as partições
+        
+        Args:
+            posicao (int): Posição na ordem de preço, começando em 1
+        
+        Returns:
+            Produto | None: Produto na posição ou None se estiver fora do catálogo
+        """
+        return self._selecionar_posicao(posicao)
+
+    def _selecionar_posicao(self, posicao):
+        """
+        Seleciona o k-ésimo produto; chamado sob a trava de leitura
+        Seleção sobre listas ordenadas: a cada passo, o produto do meio do
+        maior intervalo ainda possível serve de pivô e o posto dele em cada
+        partição estreita todos os intervalos. São O(p log n) passos de duas
+        rodadas de mensagens, sem percorrer produtos.
+        
+        Args:
+            posicao (int): Posição na ordem de preço, começando em 1
+        
+        Returns:
+            Produto | None: Produto na posição ou None se estiver fora do catálogo
+        """
+        fim = self._difundir("contar_produtos")
+        if not 1 <= posicao <= sum(fim):
+            return None
+        alvo = posicao - 1
+        inicio = [0] * len(fim)
+        while True:
+            j = max(range(len(fim)), key=lambda indice: fim[indice] - inicio[indice])
+            meio = (inicio[j] + fim[j]) // 2
+            pivo = self._chamar(j, "produto_por_posicao", meio + 1)
+            postos = self._difundir("contar_menores", chave_produto(pivo))
+            menores = sum(postos)
+            if menores == alvo:
+                return pivo
+            if menores < alvo:
+                inicio = [max(atual, posto) for atual, posto in zip(inicio, postos)]
+                inicio[j] = meio + 1
+            else:
+                fim = [min(atual, posto) for atual, posto in zip(fim, postos)]
+
+    @medido("percentil")
+    @com_leitura
+    def percentil_preco(self, percentil):
+        """
+        Busca o produto no percentil de preço informado (método do posto mais próximo)
+        
+        Returns:
+            Produto | None: Produto no percentil ou None se o catálogo estiver vazio
+        """
+        total = sum(self._difundir("contar_produtos"))
+        if total == 0:
+            return None
+        return self._selecionar_posicao(max(1, math.ceil(percentil / 100 * total)))
+
+    def para_mermaid(self, raiz=None, profundidade=None, versao=None):
+        """
+        Desenha as árvores das partições, cada uma em um subgrafo, ou só a
+        subárvore do produto raiz (na partição dele)
+        
+        Returns:
+            str | None: String em formato Mermaid, ou None se o produto raiz
+                não existir na versão
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        _, versoes = self._versao_publicada(versao)
+        if raiz is not None:
+            indice = self._particao(raiz)
+            return self._chamar(indice, "para_mermaid", raiz, profundidade, versoes[indice])
+        diagramas = self._executar({
+            indice: ("para_mermaid", (None, profundidade, versao_particao), {})
+            for indice, versao_particao in enumerate(versoes)
+        })
+        linhas = ["graph TD;"]
+        arestas = []
+        estilos = []
+        for indice in range(len(versoes)):
+            linhas.append(f'    subgraph Particao{indice}["Partição {indice}"]')
+            for linha in diagramas[indice].splitlines()[1:]:
+                if not linha:
+                    continue
+                if linha.startswith("Vazio"):
+                    linhas.append(f'        Particao{indice}_vazia["Partição vazia"]')
+                elif "classDef" in linha:
+                    if linha not in estilos:
+                        estilos.append(linha)
+                elif "-->" in linha or "-.->" in linha:
+                    arestas.append(linha)
+                else:
+                    linhas.append("    " + linha)
+            linhas.append("    end")
+        return "\n".join(linhas + [""] + arestas + [""] + estilos)
+
+    def versao_atual(self):
+        """
+        Returns:
+            int: Número da versão mais recente do coordenador
+        """
+        return self.versao
+
+    def contar_produtos(self):
+        """
+        Returns:
+            int: Quantidade de produtos em todas as partições
+        """
+        return sum(self._difundir("contar_produtos"))
+
+    def maior_codigo(self):
+        """
+        Returns:
+            int | None: Maior código ou None se o catálogo estiver vazio
+        """
+        return max((codigo for codigo in self._difundir("maior_codigo") if codigo is not None), default=None)
+
+    def exportar_metricas(self):
+        """
+        Gera as métricas do coordenador e das partições no formato do Prometheus
+        
+        Returns:
+            str: Texto de exposição do Prometheus
+        """
+        resumos = self._difundir("resumo_particao")
+        return self.metricas.exportar([
+            ("catalogo_rotacoes_total", "counter", "Rotações feitas no rebalanceamento da AVL", [
+                ({"tipo": "simples"}, sum(resumo["rotacoes_simples"] for resumo in resumos)),
+                ({"tipo": "dupla"}, sum(resumo["rotacoes_duplas"] for resumo in resumos)),
+            ]),
+            ("catalogo_altura_arvore", "gauge", "Altura da árvore AVL de cada partição",
+             [({"particao": indice}, resumo["altura"]) for indice, resumo in enumerate(resumos)]),
+            ("catalogo_produtos", "gauge", "Produtos no catálogo",
+             [({}, sum(resumo["produtos"] for resumo in resumos))]),
+            ("catalogo_produtos_particao", "gauge", "Produtos em cada partição",
+             [({"particao": indice}, resumo["produtos"]) for indice, resumo in enumerate(resumos)]),
+            ("catalogo_versao", "gauge", "Versão publicada mais recente", [({}, self.versao)]),
+        ])
+
+    @com_escrita
+    def configurar_perfil_arvore(self, ativo):
+        """
+        Liga (com contadores zerados) ou desliga o perfil da árvore de todas as partições
+        
+        Args:
+            ativo (bool): Se os contadores devem ser alimentados
+        """
+        self._difundir("configurar_perfil_arvore", ativo)
+
+    def perfil_arvore(self):
+        """
+        Returns:
+            dict | None: Contadores somados das partições, ou None se o perfil
+                estiver desligado
+        """
+        perfis = self._difundir("perfil_bruto")
+        if any(perfil is None for perfil in perfis):
+            return None
+        total = PerfilArvore()
+        for perfil in perfis:
+            total.acumular(perfil)
+        return total.resumo()
+
+    def estatisticas(self, versao=None):
+        """
+        Estatísticas do catálogo, somadas a partir dos agregados das partições
+        
+        Returns:
+            dict: Mesmos campos de CatalogoProdutosAVL.estatisticas (a altura
+                é a da maior árvore entre as partições)
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        versao, versoes = self._versao_publicada(versao)
+        brutas = list(self._executar({
+            indice: ("estatisticas_brutas", (versao_particao,), {})
+            for indice, versao_particao in enumerate(versoes)
+        }).values())
+        total = sum(bruta["total_produtos"] for bruta in brutas)
+        minimos = [bruta["preco_minimo"] for bruta in brutas if bruta["preco_minimo"] is not None]
+        maximos = [bruta["preco_maximo"] for bruta in brutas if bruta["preco_maximo"] is not None]
+        por_categoria = {}
+        for bruta in brutas:
+            for categoria, quantidade in bruta["produtos_por_categoria"]:
+                por_categoria[categoria.value] = por_categoria.get(categoria.value, 0) + quantidade
+        return {
+            "versao": versao,
+            "altura": max(bruta["altura"] for bruta in brutas),
+            "total_produtos": total,
+            "total_unidades": sum(bruta["total_unidades"] for bruta in brutas),
+            "valor_estoque": round(sum(bruta["valor_estoque"] for bruta in brutas), 2),
+            "preco_minimo": min(minimos, default=None),
+            "preco_maximo": max(maximos, default=None),
+            "preco_medio": round(sum(bruta["soma_precos"] for bruta in brutas) / total, 2) if total else None,
+            "produtos_por_categoria": por_categoria,
+        }
+
+    @medido("relatorio")
+    @com_leitura
+    def relatorio_categorias(self, preco_min=None, preco_max=None):
+        """
+        Agregados por categoria, somando as somas ainda sem arredondar das partições
+        
+        Returns:
+            dict: 'versao', 'total' e 'categorias' (nome → agregados)
+        """
+        somas = sum(self._difundir("somas_categorias", preco_min, preco_max))
+        return {"versao": self.versao, **resumo_das_somas(somas)}
+
+    @medido("relatorio")
+    @com_leitura
+    def histograma_precos(self, faixas=10, preco_min=None, preco_max=None, categorias=None, modo="ou"):
+        """
+        Distribuição dos preços em faixas de mesma largura
+        Sem preco_min ou preco_max, o início ou o fim vem do menor ou maior
+        preço selecionado em todas as partições; com as mesmas faixas em todas,
+        as contagens de cada faixa são somadas
+        
+        Returns:
+            dict: 'versao' e 'faixas' (início, fim, produtos e unidades)
+        """
+        extremos = [faixa for faixa in self._difundir("faixa_precos", preco_min, preco_max, categorias, modo)
+                    if faixa is not None]
+        if not extremos:
+            return {"versao": self.versao, "faixas": []}
+        inicio = preco_min if preco_min is not None else min(menor for menor, _ in extremos)
+        fim = preco_max if preco_max is not None else max(maior for _, maior in extremos)
+        combinadas = []
+        for parcial in self._difundir("histograma_precos", faixas, inicio, fim, categorias, modo):
+            if not combinadas:
+                combinadas = parcial["faixas"]
+                continue
+            for total, faixa in zip(combinadas, parcial["faixas"]):
+                total["produtos"] += faixa["produtos"]
+                total["unidades"] += faixa["unidades"]
+        return {"versao": self.versao, "faixas": combinadas}
+
+    @medido("relatorio")
+    @com_leitura
+    def estoque_baixo(self, quantidade_maxima, limite=100, categorias=None, modo="ou"):
+        """
+        Produtos com estoque até quantidade_maxima, do menor estoque para o maior
+        Cada partição devolve os seus primeiros; a intercalação deles dá os
+        primeiros do catálogo
+        
+        Returns:
+            dict: 'versao', 'total' de produtos com estoque baixo e os primeiros 'produtos'
+        """
+        parciais = self._difundir("estoque_baixo", quantidade_maxima, limite, categorias, modo)
+        produtos = heapq.merge(*(parcial["produtos"] for parcial in parciais), key=itemgetter("quantidade", "codigo"))
+        return {
+            "versao": self.versao,
+            "total": sum(parcial["total"] for parcial in parciais),
+            "produtos": list(islice(produtos, limite)),
+        }
@@ -3,101 +3,1068 @@ Módulo de Catálogo de Produtos usando Árvore AVL
 Camada de abstração entre a API e a estrutura de dados AVL
 """
 
-from arvore_avl import ArvoreAVL
-from modelo import Produto
+import gc
+import heapq
+import logging
+import math
+from contextlib import contextmanager
+from operator import itemgetter
+
+from arvore_avl import PerfilArvore
+from arvore_persistente import ArvoreAVLPersistente
+from indice_nomes import IndiceNomes, palavras
+from metricas import MetricasOperacoes, medido
+from modelo import CategoriaEnum, Produto, ProdutoParcial, TipoOperacaoEnum
+from trava_leitura_escrita import TravaLeituraEscrita, com_escrita, com_leitura
+from visao_analitica import VisaoSincronizada
+
+logger = logging.getLogger(__name__)
+
+
+def chave_produto(produto: Produto):
+    """
+    Chave de ordenação de um produto na árvore AVL
+    Ordena por preço e desempata pelo código, tornando cada chave única
+    
+    Args:
+        produto (Produto): Produto a ser indexado
+    
+    Returns:
+        tuple: Chave composta (preco, codigo)
+    """
+    return (produto.preco, produto.codigo)
+
+
+def intervalo_preco(preco_min=None, preco_max=None):
+    """
+    Converte uma faixa de preço em chaves-limite da árvore
+    (preco_min,) fica antes de qualquer chave (preco_min, codigo) e
+    (preco_max, inf) depois de qualquer chave (preco_max, codigo)
+    
+    Args:
+        preco_min (float | None): Menor preço, inclusivo
+        preco_max (float | None): Maior preço, inclusivo
+    
+    Returns:
+        tuple: (chave inicial, chave final), com None para lado sem limite
+    """
+    inicio = (preco_min,) if preco_min is not None else None
+    fim = (preco_max, math.inf) if preco_max is not None else None
+    return inicio, fim
+
+
+def produto_para_dict(produto: Produto):
+    """
+    Converte um produto no dicionário usado nas listagens da API
+    
+    Args:
+        produto (Produto): Produto a ser convertido
+    
+    Returns:
+        dict: Dados do produto com categorias como texto
+    """
+    return {
+        "codigo": produto.codigo,
+        "nome": produto.nome,
+        "preco": produto.preco,
+        "categoria": [c.value for c in produto.categoria],
+        "quantidade": produto.quantidade
+    }
+
+
+def codificar_cursor(chave):
+    """
+    Codifica a chave (preco, codigo) de um produto como cursor de paginação
+    
+    Args:
+        chave (tuple): Chave composta do último produto entregue
+    
+    Returns:
+        str: Cursor no formato 'preco:codigo'
+    """
+    preco, codigo = chave
+    return f"{preco!r}:{codigo}"
+
+
+def decodificar_cursor(cursor: str):
+    """
+    Converte um cursor de paginação de volta para a chave (preco, codigo)
+    O cursor guarda a chave, e não só o código, para continuar válido
+    mesmo que o produto seja removido entre duas páginas
+    
+    Args:
+        cursor (str): Cursor no formato 'preco:codigo'
+    
+    Returns:
+        tuple: Chave composta (preco, codigo)
+    
+    Raises:
+        ValueError: Se o cursor for inválido
+    """
+    preco, separador, codigo = cursor.rpartition(":")
+    if not separador:
+        raise ValueError(f"Cursor inválido: {cursor}")
+    return (float(preco), int(codigo))
+
+
+@contextmanager
+def coleta_de_lixo_pausada():
+    """
+    Pausa o coletor de lixo cíclico durante cargas em lote
+    As cargas criam centenas de milhares de nós e tuplas sem ciclos, e as
+    coletas disparadas por essas alocações dominariam o tempo da operação
+    """
+    ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if ativo:
+            gc.enable()
+
 
 class CatalogoProdutosAVL:
     """
     Gerencia um catálogo de produtos utilizando uma Árvore AVL
     Fornece operações de alto nível para CRUD de produtos
+    
+    Os métodos públicos são seguros entre threads. As alterações usam a trava
+    de escrita e, ao terminar, publicam uma nova versão da árvore persistente
+    junto com os agregados daquele momento. Listagens, contagens,
+    estatísticas e diagramas leem uma versão publicada sem trava, então não
+    esperam as escritas; só o filtro pelo índice de categorias e a busca por
+    nome usam a trava de leitura. As últimas versões podem ser consultadas (versao=) e
+    restauradas.
     """
     
-    def __init__(self):
-        """Inicializa o catálogo com uma árvore AVL vazia"""
-        self.avl = ArvoreAVL()
+    def __init__(self, max_versoes=64):
+        """
+        Inicializa o catálogo com uma árvore AVL vazia
+        
+        Args:
+            max_versoes (int): Quantidade de versões mantidas para consulta e restauração
+        """
+        self.avl = ArvoreAVLPersistente(max_versoes)
+        self.trava = TravaLeituraEscrita()
+        # Índice secundário código → produto, mantido em sincronia com a AVL
+        # (a árvore é ordenada por preço, então sem ele a busca por código é O(n))
+        self.indice_codigo = {}
+        # Índice invertido categoria → códigos dos produtos da categoria
+        self.indice_categoria = {categoria: set() for categoria in CategoriaEnum}
+        # Índice invertido palavra do nome → códigos, para a busca por nome
+        self.indice_nomes = IndiceNomes()
+        # Agregados mantidos a cada inserção/remoção para estatísticas em O(1)
+        self.soma_precos = 0.0
+        self.total_unidades = 0
+        self.valor_estoque = 0.0
+        # Contagem e latência por operação, exportadas em /metricas
+        self.metricas = MetricasOperacoes()
+        # Colunas NumPy para os relatórios, sincronizadas sob demanda
+        self.visao_analitica = VisaoSincronizada()
+        # Destino opcional das alterações (ex.: PersistenciaCatalogo), avisado
+        # sob a trava de escrita na mesma ordem em que elas são aplicadas
+        self.diario = None
+        self._publicar()
+
+    def _registrar(self, produto: Produto):
+        """
+        Soma um produto recém-inserido aos índices secundários e agregados
+        
+        Args:
+            produto (Produto): Produto inserido
+        """
+        self.soma_precos += produto.preco
+        self.total_unidades += produto.quantidade
+        self.valor_estoque += produto.preco * produto.quantidade
+        for categoria in produto.categoria:
+            self.indice_categoria[categoria].add(produto.codigo)
+        self.indice_nomes.adicionar(produto.codigo, produto.nome)
+        self.visao_analitica.marcar(produto.codigo)
+
+    def _registrar_lote(self, produtos):
+        """
+        Como _registrar, para um lote de produtos recém-inseridos
+        Os agregados são somados na mesma ordem, e o índice de nomes e a
+        visão analítica recebem o lote inteiro de uma vez
+        
+        Args:
+            produtos (list[Produto]): Produtos inseridos
+        """
+        soma_precos, total_unidades, valor_estoque = self.soma_precos, self.total_unidades, self.valor_estoque
+        indice_categoria = self.indice_categoria
+        for produto in produtos:
+            soma_precos += produto.preco
+            total_unidades += produto.quantidade
+            valor_estoque += produto.preco * produto.quantidade
+            for categoria in produto.categoria:
+                indice_categoria[categoria].add(produto.codigo)
+        self.soma_precos, self.total_unidades, self.valor_estoque = soma_precos, total_unidades, valor_estoque
+        self.indice_nomes.adicionar_lote([(produto.codigo, produto.nome) for produto in produtos])
+        self.visao_analitica.marcar_lote([produto.codigo for produto in produtos])
+
+    def _desregistrar(self, produto: Produto):
+        """
+        Retira um produto removido dos índices secundários e agregados
+        
+        Args:
+            produto (Produto): Produto removido
+        """
+        self.soma_precos -= produto.preco
+        self.total_unidades -= produto.quantidade
+        self.valor_estoque -= produto.preco * produto.quantidade
+        for categoria in produto.categoria:
+            self.indice_categoria[categoria].discard(produto.codigo)
+        self.indice_nomes.remover(produto.codigo, produto.nome)
+        self.visao_analitica.marcar(produto.codigo)
+
+    def _inserir(self, produto: Produto):
+        """
+        Insere um produto na árvore, nos índices e nos agregados (sem publicar)
+        
+        Args:
+            produto (Produto): Produto com código ainda não cadastrado
+        """
+        self.avl.inserir_chave(chave_produto(produto), produto)
+        self.indice_codigo[produto.codigo] = produto
+        self._registrar(produto)
+
+    def _retirar(self, codigo: int):
+        """
+        Retira um produto da árvore, dos índices e dos agregados (sem publicar)
+        
+        Args:
+            codigo (int): Código do produto
+        
+        Returns:
+            Produto | None: Produto retirado ou None se não existir
+        """
+        produto = self.indice_codigo.pop(codigo, None)
+        if produto is None:
+            return None
+        self.avl.remover_chave(chave_produto(produto))
+        self._desregistrar(produto)
+        return produto
+
+    def _substituir(self, codigo: int, novo_produto: Produto):
+        """
+        Troca um produto cadastrado pelos novos dados (sem publicar)
+        Se a chave (preco, codigo) não muda, o produto é substituído no próprio
+        nó: só o caminho até ele é copiado, sem rebalanceamento. Se muda, o nó
+        é retirado e reinserido na nova posição.
+        
+        Args:
+            codigo (int): Código do produto cadastrado
+            novo_produto (Produto): Novos dados (o código pode mudar)
+        
+        Raises:
+            ValueError: Se o novo código já pertencer a outro produto
+        """
+        antigo = self.indice_codigo[codigo]
+        chave = chave_produto(antigo)
+        if chave_produto(novo_produto) == chave:
+            self.avl.inserir_chave(chave, novo_produto)
+            self.indice_codigo[codigo] = novo_produto
+            self._desregistrar(antigo)
+            self._registrar(novo_produto)
+            return
+        if novo_produto.codigo != codigo and novo_produto.codigo in self.indice_codigo:
+            raise ValueError(f"Produto {novo_produto.codigo} já cadastrado")
+        self._retirar(codigo)
+        self._inserir(novo_produto)
+
+    def _publicar(self):
+        """
+        Publica a árvore atual como nova versão, com os agregados do catálogo
+        Chamado ao fim de cada alteração, ainda sob a trava de escrita, para
+        que os leitores nunca vejam uma alteração pela metade
+        """
+        self.indice_nomes.consolidar()
+        self.avl.publicar({
+            "total_unidades": self.total_unidades,
+            "valor_estoque": self.valor_estoque,
+            "soma_precos": self.soma_precos,
+            "produtos_por_categoria": [
+                (categoria, len(codigos)) for categoria, codigos in self.indice_categoria.items()
+            ],
+        })
 
+    def _anotar(self, tipo, *args):
+        """
+        Repassa uma alteração aplicada ao diário, se houver um ligado
+        
+        Args:
+            tipo (str): 'adicionar', 'lote', 'remover', 'atualizar', 'reservar',
+                'operacoes' ou 'restaurar'
+            *args: Produto(s), código, itens reservados, operações aplicadas
+                ou versão restaurada e alterações resultantes
+        """
+        if self.diario is not None:
+            self.diario.anotar(tipo, *args)
+
+    def _obter_versao(self, versao=None):
+        """
+        Obtém a versão publicada usada por uma leitura
+        
+        Args:
+            versao (int | None): Número da versão (None para a mais recente)
+        
+        Returns:
+            Instantaneo: Versão da árvore
+        
+        Raises:
+            LookupError: Se a versão não existir ou já tiver sido descartada
+        """
+        instantaneo = self.avl.obter_versao(versao)
+        if instantaneo is None:
+            raise LookupError(f"Versão {versao} não está disponível")
+        return instantaneo
+
+    def _no_do_codigo(self, instantaneo, codigo):
+        """
+        Localiza o nó de um produto em uma versão publicada
+        O índice por código só vale para a versão atual: em versões antigas o
+        produto pode ter outro preço (outra chave) ou nem existir mais. A
+        chave atual é tentada primeiro, em O(log n); se ela não levar ao
+        produto em uma versão antiga, a versão é percorrida em O(n).
+        
+        Args:
+            instantaneo (Instantaneo): Versão publicada da árvore
+            codigo (int): Código do produto
+        
+        Returns:
+            No | None: Nó do produto ou None se ele não existir na versão
+        """
+        produto = self.indice_codigo.get(codigo)
+        if produto is not None:
+            no = instantaneo.buscar_chave(chave_produto(produto))
+            if no is not None and no.valor.codigo == codigo:
+                return no
+        if instantaneo is self.avl.atual:
+            return None
+        for no in instantaneo.iterar_nos():
+            if no.valor.codigo == codigo:
+                return no
+        return None
+
+    @medido("inserir")
+    @com_escrita
     def adicionar_produto(self, produto: Produto):
         """
         Adiciona um produto no catálogo
         
         Args:
             produto (Produto): Produto a ser adicionado com código único
+        
+        Raises:
+            ValueError: Se já existir um produto com o mesmo código
+        """
+        if produto.codigo in self.indice_codigo:
+            raise ValueError(f"Produto {produto.codigo} já cadastrado")
+        # Inserindo pelo PREÇO (desempatado pelo código) conforme solicitado
+        self._inserir(produto)
+        self._publicar()
+        self._anotar("adicionar", produto)
+        logger.debug("Produto adicionado: %s", produto, extra={"operacao": "inserir", "codigo": produto.codigo})
+
+    @medido("inserir_lote")
+    @com_escrita
+    def adicionar_produtos_lote(self, produtos):
+        """
+        Adiciona vários produtos de uma vez
+        A validação de códigos é feita uma única vez para o lote inteiro
+        (tudo ou nada). Lotes grandes em relação ao catálogo são intercalados
+        com a árvore e reconstruídos em O(n + m); lotes pequenos são inseridos
+        um a um em O(m log n). O lote inteiro vira uma única versão, que pode
+        ser desfeita restaurando a versão anterior.
+        
+        Args:
+            produtos (list[Produto]): Produtos a serem adicionados
+        
+        Returns:
+            int: Quantidade de produtos adicionados
+        
+        Raises:
+            ValueError: Se houver códigos repetidos no lote ou já cadastrados
         """
-        # Inserindo pelo PREÇO conforme solicitado
-        self.avl.inserir_chave(produto.preco, produto)
-        print(f"Produto adicionado: {produto}")
+        vistos = set()
+        repetidos = set()
+        for produto in produtos:
+            if produto.codigo in vistos or produto.codigo in self.indice_codigo:
+                repetidos.add(produto.codigo)
+            vistos.add(produto.codigo)
+        if repetidos:
+            raise ValueError(f"Códigos repetidos ou já cadastrados: {sorted(repetidos)}")
+
+        with coleta_de_lixo_pausada():
+            if len(produtos) * 8 < len(self.indice_codigo):
+                for produto in produtos:
+                    self._inserir(produto)
+            else:
+                self.avl.inserir_lote((chave_produto(produto), produto) for produto in produtos)
+                self.indice_codigo.update((produto.codigo, produto) for produto in produtos)
+                self._registrar_lote(produtos)
+            self._publicar()
+            self._anotar("lote", produtos)
+        logger.info("Lote adicionado: %d produtos", len(produtos), extra={"operacao": "inserir_lote", "total": len(produtos)})
+        return len(produtos)
 
+    @medido("remover")
+    @com_escrita
     def remover_produto(self, codigo: int):
         """
         Remove um produto do catálogo pelo código
+        Complexidade: O(log n) usando o índice por código
         
         Args:
             codigo (int): Código do produto a ser removido
+        
+        Returns:
+            Produto | None: Produto removido ou None se não existir
         """
-        # Busca o produto para saber o preço (chave)
-        produto = self.buscar_produto(codigo)
-        if produto:
-            self.avl.remover_chave(produto.preco)
-            print(f"Produto removido: código {codigo}")
-        else:
-            print(f"Erro ao remover: Produto {codigo} não encontrado")
+        produto = self._retirar(codigo)
+        if produto is None:
+            logger.debug("Produto %s não encontrado para remoção", codigo, extra={"operacao": "remover", "codigo": codigo})
+            return None
+
+        self._publicar()
+        self._anotar("remover", codigo)
+        logger.debug("Produto removido: código %s", codigo, extra={"operacao": "remover", "codigo": codigo})
+        return produto
+
+    @medido("atualizar")
+    @com_escrita
+    def atualizar_produto(self, codigo: int, novo_produto: Produto):
+        """
+        Substitui um produto de forma atômica, publicado como uma única versão
+        Com o mesmo preço e código, o produto troca de valor no próprio nó;
+        senão, o nó é retirado e reinserido sob a mesma trava
+        
+        Args:
+            codigo (int): Código do produto a ser atualizado
+            novo_produto (Produto): Novos dados (o código pode mudar)
+        
+        Returns:
+            Produto | None: Produto atualizado ou None se o código não existir
+        
+        Raises:
+            ValueError: Se o novo código já pertencer a outro produto
+        """
+        if codigo not in self.indice_codigo:
+            return None
+        self._substituir(codigo, novo_produto)
+        self._publicar()
+        self._anotar("atualizar", codigo, novo_produto)
+        logger.debug("Produto atualizado: %s", novo_produto, extra={"operacao": "atualizar", "codigo": codigo})
+        return novo_produto
+
+    @medido("atualizar")
+    @com_escrita
+    def atualizar_parcial(self, codigo: int, alteracoes: ProdutoParcial):
+        """
+        Altera só os campos informados de um produto, de forma atômica
+        Os demais campos vêm do produto cadastrado, sem nova validação
+        
+        Args:
+            codigo (int): Código do produto a ser alterado
+            alteracoes (ProdutoParcial): Campos a alterar (os ausentes ou nulos são mantidos)
+        
+        Returns:
+            Produto | None: Produto alterado ou None se o código não existir
+        
+        Raises:
+            ValueError: Se o novo código já pertencer a outro produto
+        """
+        produto = self.indice_codigo.get(codigo)
+        if produto is None:
+            return None
+        novo_produto = produto.model_copy(update=alteracoes.model_dump(exclude_unset=True, exclude_none=True))
+        self._substituir(codigo, novo_produto)
+        self._publicar()
+        self._anotar("atualizar", codigo, novo_produto)
+        logger.debug("Produto atualizado: %s", novo_produto, extra={"operacao": "atualizar", "codigo": codigo})
+        return novo_produto
+
+    def _reservar(self, pedidos):
+        """
+        Baixa o estoque dos produtos (sem publicar)
+        A chave (preco, codigo) não muda, então cada produto é substituído no
+        próprio nó: só o caminho até ele é copiado, sem rebalanceamento, e os
+        índices por código e categoria continuam válidos
+        
+        Args:
+            pedidos (dict[int, int]): Código → unidades, já validados
+        
+        Returns:
+            list[Produto]: Produtos com o estoque atualizado
+        """
+        reservados = []
+        for codigo, quantidade in pedidos.items():
+            produto = self.indice_codigo[codigo]
+            novo = produto.model_copy(update={"quantidade": produto.quantidade - quantidade})
+            self.avl.inserir_chave(chave_produto(produto), novo)
+            self.indice_codigo[codigo] = novo
+            self.total_unidades -= quantidade
+            self.valor_estoque -= produto.preco * quantidade
+            self.visao_analitica.marcar(codigo)
+            reservados.append(novo)
+        return reservados
+
+    @medido("reservar")
+    @com_escrita
+    def reservar_estoque(self, codigo: int, quantidade: int):
+        """
+        Reserva unidades de um produto, baixando o estoque de forma atômica
+        Complexidade: O(log n), sem rotações
+        
+        Args:
+            codigo (int): Código do produto
+            quantidade (int): Unidades a reservar
+        
+        Returns:
+            Produto | None: Produto com o estoque atualizado ou None se o código não existir
+        
+        Raises:
+            ValueError: Se a quantidade não for positiva ou o estoque for insuficiente
+        """
+        if quantidade <= 0:
+            raise ValueError("A quantidade reservada deve ser maior que zero")
+        produto = self.indice_codigo.get(codigo)
+        if produto is None:
+            return None
+        if quantidade > produto.quantidade:
+            raise ValueError(f"Estoque insuficiente do produto {codigo}: {produto.quantidade} disponíveis")
+        reservado, = self._reservar({codigo: quantidade})
+        self._publicar()
+        self._anotar("reservar", [(codigo, quantidade)])
+        logger.debug("Estoque reservado: %d un. de %s", quantidade, reservado, extra={"operacao": "reservar", "codigo": codigo, "quantidade": quantidade})
+        return reservado
+
+    @medido("reservar_lote")
+    @com_escrita
+    def reservar_lote(self, itens):
+        """
+        Reserva vários produtos de uma vez: ou todos os itens são reservados
+        ou nenhum (a verificação acontece antes de qualquer baixa) e o lote é
+        publicado como uma única versão
+        
+        Args:
+            itens (iterable): Pares (codigo, quantidade); códigos repetidos são somados
+        
+        Returns:
+            list[Produto]: Produtos com o estoque atualizado, um por código
+        
+        Raises:
+            LookupError: Se algum código não existir
+            ValueError: Se alguma quantidade não for positiva ou o estoque for insuficiente
+        """
+        pedidos = {}
+        for codigo, quantidade in itens:
+            if quantidade <= 0:
+                raise ValueError("A quantidade reservada deve ser maior que zero")
+            pedidos[codigo] = pedidos.get(codigo, 0) + quantidade
+        faltando = [codigo for codigo in pedidos if codigo not in self.indice_codigo]
+        if faltando:
+            raise LookupError(f"Produtos não encontrados: {faltando}")
+        insuficientes = [codigo for codigo, quantidade in pedidos.items()
+                         if quantidade > self.indice_codigo[codigo].quantidade]
+        if insuficientes:
+            raise ValueError(f"Estoque insuficiente para os produtos: {insuficientes}")
+        reservados = self._reservar(pedidos)
+        if reservados:
+            self._publicar()
+            self._anotar("reservar", list(pedidos.items()))
+        logger.debug("Reserva em lote: %d produtos", len(reservados), extra={"operacao": "reservar_lote", "total": len(reservados)})
+        return reservados
+
+    @medido("operacoes")
+    @com_escrita
+    def aplicar_operacoes(self, operacoes):
+        """
+        Aplica um lote misto de inserções, remoções e atualizações
+        Cada item é validado na ordem do lote, contra o estado deixado pelos
+        anteriores, e um item com erro não impede os demais. Só o efeito
+        final de cada código chega à árvore, ordenado pela chave: lotes
+        grandes em relação ao catálogo são intercalados com a árvore e
+        reconstruídos em O(n + m); lotes pequenos fazem inserções e remoções
+        pontuais em O(m log n), que reaproveitam as cópias dos caminhos até a
+        publicação. O lote inteiro vira uma única versão.
+        
+        Args:
+            operacoes (list[Operacao]): Itens do lote; atualizar aceita o
+                produto completo (como PUT) ou só as alterações (como PATCH)
+        
+        Returns:
+            list: Para cada item, na ordem do lote, o produto resultante (o
+                removido, em remover) ou o erro: LookupError se o código não
+                existir, ValueError se o item for inválido ou o código já
+                estiver cadastrado
+        """
+        # Código → produto depois dos itens já aceitos (None: removido)
+        estado = {}
+        resultados = []
+        aplicadas = []
+        for operacao in operacoes:
+            try:
+                if operacao.tipo == TipoOperacaoEnum.ADICIONAR:
+                    produto = operacao.produto
+                    if produto is None:
+                        raise ValueError("Informe o produto a adicionar")
+                    if operacao.codigo is not None and operacao.codigo != produto.codigo:
+                        raise ValueError(f"O código {operacao.codigo} difere do código do produto ({produto.codigo})")
+                    if estado.get(produto.codigo, self.indice_codigo.get(produto.codigo)) is not None:
+                        raise ValueError(f"Produto {produto.codigo} já cadastrado")
+                    estado[produto.codigo] = produto
+                    aplicadas.append((operacao.tipo.value, produto.codigo, produto))
+                    resultados.append(produto)
+                    continue
+                codigo = operacao.codigo
+                if codigo is None:
+                    raise ValueError("Informe o código do produto")
+                produto = estado.get(codigo, self.indice_codigo.get(codigo))
+                if produto is None:
+                    raise LookupError(f"Produto {codigo} não encontrado")
+                if operacao.tipo == TipoOperacaoEnum.REMOVER:
+                    estado[codigo] = None
+                    aplicadas.append((operacao.tipo.value, codigo, None))
+                    resultados.append(produto)
+                    continue
+                if operacao.produto is not None:
+                    novo = operacao.produto
+                elif operacao.alteracoes is not None:
+                    novo = produto.model_copy(update=operacao.alteracoes.model_dump(exclude_unset=True, exclude_none=True))
+                else:
+                    raise ValueError("Informe o produto ou as alterações")
+                if novo.codigo != codigo:
+                    if estado.get(novo.codigo, self.indice_codigo.get(novo.codigo)) is not None:
+                        raise ValueError(f"Produto {novo.codigo} já cadastrado")
+                    estado[codigo] = None
+                estado[novo.codigo] = novo
+                aplicadas.append((operacao.tipo.value, codigo, novo))
+                resultados.append(novo)
+            except (LookupError, ValueError) as erro:
+                resultados.append(erro)
+
+        alterados = [(codigo, self.indice_codigo.get(codigo), novo) for codigo, novo in estado.items()
+                     if self.indice_codigo.get(codigo) is not novo]
+        if alterados:
+            # Com a mesma chave, o nó só troca de valor; senão sai da posição antiga
+            remocoes = [chave_produto(antigo) for _, antigo, novo in alterados
+                        if antigo is not None and (novo is None or chave_produto(novo) != chave_produto(antigo))]
+            gravacoes = [(chave_produto(novo), novo) for _, _, novo in alterados if novo is not None]
+            with coleta_de_lixo_pausada():
+                if (len(remocoes) + len(gravacoes)) * 8 < len(self.indice_codigo):
+                    for chave in sorted(remocoes):
+                        self.avl.remover_chave(chave)
+                    for chave, produto in sorted(gravacoes, key=itemgetter(0)):
+                        self.avl.inserir_chave(chave, produto)
+                else:
+                    self.avl.aplicar_lote(gravacoes, remocoes)
+                for codigo, antigo, novo in alterados:
+                    if antigo is not None:
+                        del self.indice_codigo[codigo]
+                        self._desregistrar(antigo)
+                    if novo is not None:
+                        self.indice_codigo[codigo] = novo
+                        self._registrar(novo)
+                self._publicar()
+                self._anotar("operacoes", aplicadas)
+        erros = len(resultados) - len(aplicadas)
+        logger.info("Lote de operações: %d aplicadas, %d com erro", len(aplicadas), erros, extra={"operacao": "operacoes", "aplicadas": len(aplicadas), "erros": erros})
+        return resultados
+
+    @medido("restaurar")
+    @com_escrita
+    def restaurar_versao(self, versao: int):
+        """
+        Volta o catálogo a uma versão anterior (ex.: para desfazer uma carga)
+        A árvore é restaurada em O(1) e os índices são refeitos em O(n); a
+        restauração é publicada como uma nova versão e anotada no diário
+        como as alterações entre a versão atual e a restaurada
+        
+        Args:
+            versao (int): Versão a restaurar
+        
+        Returns:
+            int | None: Número da nova versão ou None se a versão não estiver disponível
+        """
+        instantaneo = self.avl.obter_versao(versao)
+        if instantaneo is None:
+            return None
+        anteriores = self.indice_codigo
+        self.avl.restaurar(instantaneo)
+        self.indice_codigo = {}
+        self.indice_categoria = {categoria: set() for categoria in CategoriaEnum}
+        self.indice_nomes = IndiceNomes()
+        for no in instantaneo.iterar_nos():
+            produto = no.valor
+            self.indice_codigo[produto.codigo] = produto
+            for categoria in produto.categoria:
+                self.indice_categoria[categoria].add(produto.codigo)
+            self.indice_nomes.adicionar(produto.codigo, produto.nome)
+        self.visao_analitica.invalidar()
+        dados = instantaneo.dados
+        self.total_unidades = dados["total_unidades"]
+        self.valor_estoque = dados["valor_estoque"]
+        self.soma_precos = dados["soma_precos"]
+        # O diário recebe o efeito líquido da restauração (a versão restaurada
+        # não existe mais depois de um reinício), no formato de aplicar_operacoes
+        alteracoes = [("remover", codigo, None) for codigo in anteriores if codigo not in self.indice_codigo]
+        alteracoes.extend(
+            ("adicionar" if anteriores.get(codigo) is None else "atualizar", codigo, produto)
+            for codigo, produto in self.indice_codigo.items() if anteriores.get(codigo) is not produto
+        )
+        self._publicar()
+        self._anotar("restaurar", versao, alteracoes)
+        logger.info("Versão %d restaurada como versão %d", versao, self.avl.versao, extra={"operacao": "restaurar", "versao": versao, "nova_versao": self.avl.versao})
+        return self.avl.versao
+
+    def listar_versoes(self):
+        """
+        Lista as versões publicadas ainda disponíveis
+        
+        Returns:
+            list[dict]: Número e total de produtos de cada versão, da mais antiga à mais recente
+        """
+        return [
+            {"versao": instantaneo.versao, "total_produtos": instantaneo.obter_tamanho(instantaneo.raiz)}
+            for instantaneo in list(self.avl.versoes.values())
+        ]
 
+    @medido("buscar")
     def buscar_produto(self, codigo: int):
         """
         Busca um produto pelo código
-        Complexidade: O(n) pois a árvore está ordenada por preço
+        Complexidade: O(1) usando o índice por código
         
         Args:
             codigo (int): Código do produto a buscar
-            
+        
         Returns:
             Produto | None: Produto encontrado ou None se não existir
         """
-        # Busca linear recursiva pois a chave agora é o preço
-        def buscar_recursivo(no):
-            if not no:
-                return None
-            if no.valor and no.valor.codigo == codigo:
-                return no.valor
-            
-            res_esq = buscar_recursivo(no.esquerda)
-            if res_esq: return res_esq
-            
-            return buscar_recursivo(no.direita)
+        return self.indice_codigo.get(codigo)
 
-        return buscar_recursivo(self.avl.raiz)
+    @medido("buscar")
+    @com_leitura
+    def buscar_produto_versao(self, codigo: int):
+        """
+        Busca um produto junto com a versão publicada que o contém
+        Sob a trava de leitura nenhuma escrita está no meio, então o índice
+        por código corresponde à versão (usada como chave de cache)
+        
+        Args:
+            codigo (int): Código do produto a buscar
+        
+        Returns:
+            tuple: (versão lida, Produto encontrado ou None)
+        """
+        return self.avl.atual.versao, self.indice_codigo.get(codigo)
 
     def listar_produtos(self):
         """
-        Lista todos os produtos em ordem crescente de código
+        Lista todos os produtos em ordem crescente de preço (e código)
         Utiliza percurso em-ordem na árvore AVL
         
         Returns:
             list: Lista de dicionários com dados dos produtos
         """
+        return list(self.iterar_produtos())
+
+    def _itens_em_ordem(self, instantaneo, cursor=None, preco_min=None, preco_max=None, categorias=None,
+                        modo="ou"):
+        """
+        Percorre os produtos de uma versão em ordem de preço a partir do
+        cursor, dentro da faixa e, se informadas, apenas das categorias pedidas
+        
+        Args:
+            instantaneo (Instantaneo): Versão da árvore a percorrer
+            cursor (tuple | None): Chave após a qual continuar
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Returns:
+            iterable: Pares (chave, produto) em ordem de chave
+        """
+        inicio, fim = intervalo_preco(preco_min, preco_max)
+        if cursor is not None and (inicio is None or cursor > inicio):
+            inicio = cursor
+        # Nenhuma chave é igual a (preco_min,), então a busca exclusiva também
+        # inclui os produtos com preço igual a preco_min
+        if categorias:
+            categorias = set(categorias)
+            itens = self._itens_por_indice(instantaneo, inicio, fim, categorias, modo)
+            if itens is not None:
+                return itens
+            teste = categorias.issubset if modo == "e" else categorias.intersection
+            return (
+                (no.chave, no.valor) for no in instantaneo.iterar_intervalo(inicio, fim, inclusivo=False)
+                if teste(no.valor.categoria)
+            )
+        return ((no.chave, no.valor) for no in instantaneo.iterar_intervalo(inicio, fim, inclusivo=False))
+
+    @com_leitura
+    def _itens_por_indice(self, instantaneo, inicio, fim, categorias, modo):
+        """
+        Resolve um filtro de categorias pelo índice invertido, quando compensa
+        Se a faixa de preço tem menos produtos que os candidatos do índice, é
+        mais barato percorrer a faixa filtrando pela categoria (retorna None);
+        caso contrário, combina os conjuntos do índice (interseção para 'e',
+        união para 'ou') e ordena só o resultado pela chave. O índice reflete
+        apenas a versão mais recente, então versões anteriores sempre
+        percorrem a faixa.
+        
+        Args:
+            instantaneo (Instantaneo): Versão da árvore lida
+            inicio (tuple | None): Chave exclusiva de início
+            fim (tuple | None): Chave inclusiva de fim
+            categorias (set[CategoriaEnum]): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Returns:
+            list | None: Pares (chave, produto) em ordem de chave, ou None
+                para percorrer a faixa
+        """
+        if instantaneo is not self.avl.atual:
+            return None
+        conjuntos = sorted((self.indice_categoria[c] for c in categorias), key=len)
+        if modo == "e":
+            candidatos = len(conjuntos[0])
+        else:
+            candidatos = sum(len(conjunto) for conjunto in conjuntos)
+        if (inicio is not None or fim is not None) and instantaneo.contar_intervalo(inicio, fim) < candidatos:
+            return None
+
+        if modo == "e":
+            codigos = conjuntos[0].intersection(*conjuntos[1:])
+        else:
+            codigos = set().union(*conjuntos)
+        itens = []
+        for codigo in codigos:
+            produto = self.indice_codigo[codigo]
+            chave = chave_produto(produto)
+            if (inicio is None or chave > inicio) and (fim is None or chave <= fim):
+                itens.append((chave, produto))
+        itens.sort(key=itemgetter(0))
+        return itens
+
+    def iterar_produtos(self, cursor=None, preco_min=None, preco_max=None, categorias=None, modo="ou",
+                        versao=None):
+        """
+        Percorre os produtos em ordem de preço sob demanda, sem montar a lista
+        A versão é resolvida na chamada e todo o percurso lê essa mesma versão,
+        sem trava: um consumidor lento não bloqueia as escritas nem vê
+        alterações no meio
+        
+        Args:
+            cursor (tuple | None): Chave após a qual continuar (None para o início)
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+            versao (int | None): Versão a ler (None para a mais recente)
+        
+        Returns:
+            iterator: Dicionários com os dados de cada produto
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        instantaneo = self._obter_versao(versao)
+        itens = self._itens_em_ordem(instantaneo, cursor, preco_min, preco_max, categorias, modo)
+        return (produto_para_dict(produto) for _, produto in itens)
+
+    @medido("listar")
+    def listar_pagina(self, limite: int, cursor=None, preco_min=None, preco_max=None, categorias=None, modo="ou",
+                      versao=None):
+        """
+        Lista uma página de produtos em ordem de preço
+        Retoma o percurso em ordem a partir do cursor em O(log n + k)
+        
+        Args:
+            limite (int | None): Quantidade máxima de produtos na página (None para todos)
+            cursor (tuple | None): Chave do último produto da página anterior
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+            versao (int | None): Versão a ler (None para a mais recente)
+        
+        Returns:
+            tuple: (lista de produtos, chave para a próxima página ou None,
+                versão lida)
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        instantaneo = self._obter_versao(versao)
         produtos = []
-        def em_ordem(no):
-            if no:
-                em_ordem(no.esquerda)
-                produtos.append({
-                    "codigo": no.chave,
-                    "nome": no.valor.nome,
-                    "preco": no.valor.preco,
-                    "categoria": [c.value for c in no.valor.categoria],
-                    "quantidade": no.valor.quantidade
-                })
-                em_ordem(no.direita)
-        em_ordem(self.avl.raiz)
-        return produtos
-
-    def para_mermaid(self):
+        ultimo = None
+        for chave, produto in self._itens_em_ordem(instantaneo, cursor, preco_min, preco_max, categorias, modo):
+            if len(produtos) == limite:
+                return produtos, ultimo, instantaneo.versao
+            ultimo = chave
+            produtos.append(produto_para_dict(produto))
+        return produtos, None, instantaneo.versao
+
+    @medido("buscar_nome")
+    @com_leitura
+    def buscar_por_nome(self, consulta: str, limite: int = 20, aproximada: bool = True):
+        """
+        Busca produtos pelo nome, em ordem de preço (autocompletar)
+        Cada palavra da consulta deve ser prefixo de alguma palavra do nome,
+        sem diferenciar maiúsculas nem acentos. Uma palavra sem nenhum
+        prefixo correspondente é trocada pelas mais parecidas do vocabulário
+        (aproximada=True). Quando os candidatos são muitos, percorre a
+        árvore em ordem de preço e para no limite (desistindo se a
+        combinação das palavras se mostrar rara); senão, ordena só os
+        candidatos pela chave.
+        
+        Args:
+            consulta (str): Texto digitado
+            limite (int): Máximo de produtos devolvidos
+            aproximada (bool): Se deve tolerar erros de digitação
+        
+        Returns:
+            list[Produto]: Produtos encontrados, do mais barato ao mais caro
+        """
+        grupos = []
+        for palavra in palavras(consulta):
+            encontradas = self.indice_nomes.com_prefixo(palavra)
+            if not encontradas and aproximada:
+                encontradas = self.indice_nomes.parecidas(palavra)
+            if not encontradas:
+                return []
+            grupos.append(encontradas)
+        if not grupos:
+            return []
+        return self._buscar_por_grupos(grupos, limite)
+
+    def _buscar_por_grupos(self, grupos, limite):
+        """
+        Produtos cujo nome tem, para cada grupo, alguma das palavras dele
+        Chamado sob a trava de leitura
+        
+        Args:
+            grupos (list[list[str]]): Palavras do vocabulário aceitas para
+                cada palavra da consulta (nenhum grupo vazio)
+            limite (int): Máximo de produtos devolvidos
+        
+        Returns:
+            list[Produto]: Produtos encontrados, do mais barato ao mais caro
+        """
+        # Estima quantos nomes têm todas as palavras supondo-as independentes.
+        # Com densidade d = estimativa / total, o percurso visita cerca de
+        # limite / d nós; ordenar os candidatos custa proporcional a estimativa
+        instantaneo = self.avl.atual
+        total = len(self.indice_codigo)
+        estimativa = total
+        for grupo in grupos:
+            estimativa *= min(1.0, self.indice_nomes.contar(grupo) / total)
+        if estimativa * estimativa > 4 * limite * total:
+            aceitas = [set(grupo) for grupo in grupos]
+            encontrados = []
+            orcamento = int(4 * limite * total / estimativa)
+            for visitados, no in enumerate(instantaneo.iterar_nos()):
+                if visitados == orcamento:
+                    break
+                nome = set(palavras(no.valor.nome))
+                if all(nome & grupo for grupo in aceitas):
+                    encontrados.append(no.valor)
+                    if len(encontrados) == limite:
+                        return encontrados
+            else:
+                return encontrados
+
+        conjuntos = sorted((self.indice_nomes.uniao(grupo) for grupo in grupos), key=len)
+        codigos = conjuntos[0].intersection(*conjuntos[1:])
+        return heapq.nsmallest(limite, (self.indice_codigo[codigo] for codigo in codigos), key=chave_produto)
+
+    @medido("contar")
+    def contar_por_preco(self, preco_min=None, preco_max=None, versao=None):
+        """
+        Conta os produtos em uma faixa de preço
+        Complexidade: O(log n) usando o tamanho das subárvores
+        
+        Args:
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+            versao (int | None): Versão a ler (None para a mais recente)
+        
+        Returns:
+            int: Quantidade de produtos na faixa
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        return self._obter_versao(versao).contar_intervalo(*intervalo_preco(preco_min, preco_max))
+
+    @medido("posicao")
+    def produto_por_posicao(self, posicao: int):
+        """
+        Busca o k-ésimo produto mais barato
+        Complexidade: O(log n)
+        
+        Args:
+            posicao (int): Posição na ordem de preço, começando em 1
+        
+        Returns:
+            Produto | None: Produto na posição ou None se estiver fora do catálogo
+        """
+        no = self.avl.atual.selecionar(posicao - 1)
+        return no.valor if no else None
+
+    @medido("percentil")
+    def percentil_preco(self, percentil: float):
+        """
+        Busca o produto no percentil de preço informado (método do posto mais próximo)
+        Complexidade: O(log n)
+        
+        Args:
+            percentil (float): Percentil entre 0 e 100
+        
+        Returns:
+            Produto | None: Produto no percentil ou None se o catálogo estiver vazio
+        """
+        instantaneo = self.avl.atual
+        total = instantaneo.obter_tamanho(instantaneo.raiz)
+        if total == 0:
+            return None
+        posicao = max(1, math.ceil(percentil / 100 * total))
+        return instantaneo.selecionar(posicao - 1).valor
+
+    def para_mermaid(self, raiz=None, profundidade=None, versao=None):
         """
         Gera representação da árvore em formato Mermaid
         
+        Args:
+            raiz (int | None): Código do produto usado como raiz do diagrama
+                (None para a árvore inteira)
+            profundidade (int | None): Níveis desenhados abaixo da raiz
+            versao (int | None): Versão a desenhar (None para a mais recente)
+        
+        Returns:
+            str | None: String em formato Mermaid para visualização gráfica,
+                ou None se o produto raiz não existir na versão
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        instantaneo = self._obter_versao(versao)
+        no = None
+        if raiz is not None:
+            no = self._no_do_codigo(instantaneo, raiz)
+            if no is None:
+                return None
+        return instantaneo.gerar_mermaid(no, profundidade)
+
+    def versao_atual(self):
+        """
         Returns:
-            str: String em formato Mermaid para visualização gráfica
+            int: Número da versão publicada mais recente
         """
-        return self.avl.gerar_mermaid()
+        return self.avl.atual.versao
 
     def contar_produtos(self):
         """
@@ -106,4 +1073,168 @@ class CatalogoProdutosAVL:
         Returns:
             int: Quantidade de produtos cadastrados
         """
-        return len(self.listar_produtos())
+        return len(self.indice_codigo)
+
+    @com_leitura
+    def maior_codigo(self):
+        """
+        Retorna o maior código cadastrado
+        
+        Returns:
+            int | None: Maior código ou None se o catálogo estiver vazio
+        """
+        return max(self.indice_codigo) if self.indice_codigo else None
+
+    def exportar_metricas(self):
+        """
+        Gera as métricas do catálogo no formato de texto do Prometheus
+        Além das operações, inclui rotações, altura da árvore, produtos e versão
+        
+        Returns:
+            str: Texto de exposição do Prometheus
+        """
+        instantaneo = self.avl.atual
+        return self.metricas.exportar([
+            ("catalogo_rotacoes_total", "counter", "Rotações feitas no rebalanceamento da AVL", [
+                ({"tipo": "simples"}, self.avl.rotacoes_simples),
+                ({"tipo": "dupla"}, self.avl.rotacoes_duplas),
+            ]),
+            ("catalogo_altura_arvore", "gauge", "Altura da árvore AVL",
+             [({}, instantaneo.obter_altura(instantaneo.raiz))]),
+            ("catalogo_produtos", "gauge", "Produtos no catálogo",
+             [({}, instantaneo.obter_tamanho(instantaneo.raiz))]),
+            ("catalogo_versao", "gauge", "Versão publicada mais recente", [({}, instantaneo.versao)]),
+        ])
+
+    @com_escrita
+    def configurar_perfil_arvore(self, ativo: bool):
+        """
+        Liga (com contadores zerados) ou desliga o perfil interno da árvore
+        Sob a trava de escrita para que a próxima versão publicada já nasça
+        com o mesmo perfil da árvore
+        
+        Args:
+            ativo (bool): Se os contadores devem ser alimentados
+        """
+        perfil = PerfilArvore() if ativo else None
+        self.avl.perfil = perfil
+        self.avl.atual.perfil = perfil
+
+    def perfil_arvore(self):
+        """
+        Retorna os contadores do perfil interno da árvore
+        
+        Returns:
+            dict | None: Nós visitados por busca e por escrita, rotações e
+                tempo de rebalanceamento, ou None se o perfil estiver desligado
+        """
+        perfil = self.avl.perfil
+        return perfil.resumo() if perfil is not None else None
+
+    def estatisticas(self, versao=None):
+        """
+        Retorna estatísticas do catálogo sem percorrer os produtos
+        Os agregados são mantidos incrementalmente e publicados com cada
+        versão; menor e maior preço vêm das extremidades da árvore em O(log n)
+        
+        Args:
+            versao (int | None): Versão a ler (None para a mais recente)
+        
+        Returns:
+            dict: Versão, altura, totais, valor em estoque, faixa e média de
+                preço e quantidade de produtos por categoria
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        instantaneo = self._obter_versao(versao)
+        dados = instantaneo.dados
+        raiz = instantaneo.raiz
+        total = instantaneo.obter_tamanho(raiz)
+        return {
+            "versao": instantaneo.versao,
+            "altura": instantaneo.obter_altura(raiz),
+            "total_produtos": total,
+            "total_unidades": dados["total_unidades"],
+            "valor_estoque": round(dados["valor_estoque"], 2),
+            "preco_minimo": instantaneo.obter_no_minimo(raiz).valor.preco if raiz else None,
+            "preco_maximo": instantaneo.obter_no_maximo(raiz).valor.preco if raiz else None,
+            "preco_medio": round(dados["soma_precos"] / total, 2) if total else None,
+            "produtos_por_categoria": {
+                categoria.value: total for categoria, total in dados["produtos_por_categoria"]
+            },
+        }
+
+    @com_leitura
+    def _com_visao(self, relatorio):
+        """
+        Executa um relatório sobre a visão analítica, já sincronizada
+        Sob a trava de leitura nenhuma alteração está em andamento, então as
+        colunas refletem exatamente a versão publicada mais recente
+        
+        Args:
+            relatorio (callable): Recebe a VisaoSincronizada e devolve um dict
+        
+        Returns:
+            dict: 'versao' lida e o resultado do relatório
+        """
+        visao = self.visao_analitica
+        with visao.trava:
+            visao.sincronizar(self.indice_codigo)
+            return {"versao": self.avl.atual.versao, **relatorio(visao)}
+
+    @medido("relatorio")
+    def relatorio_categorias(self, preco_min=None, preco_max=None):
+        """
+        Produtos, unidades, valor em estoque, preço médio e produtos sem
+        estoque do catálogo e de cada categoria, calculados sobre as colunas
+        
+        Args:
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+        
+        Returns:
+            dict: 'versao', 'total' e 'categorias' (nome → agregados)
+        """
+        return self._com_visao(lambda visao: visao.resumo_por_categoria(visao.selecionar(preco_min, preco_max)))
+
+    @medido("relatorio")
+    def histograma_precos(self, faixas=10, preco_min=None, preco_max=None, categorias=None, modo="ou"):
+        """
+        Distribuição dos preços em faixas de mesma largura
+        
+        Args:
+            faixas (int): Quantidade de faixas
+            preco_min (float | None): Menor preço, inclusivo (início da primeira faixa)
+            preco_max (float | None): Maior preço, inclusivo (fim da última faixa)
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Returns:
+            dict: 'versao' e 'faixas' (início, fim, produtos e unidades)
+        """
+        def relatorio(visao):
+            selecao = visao.selecionar(preco_min, preco_max, categorias, modo)
+            return {"faixas": visao.histograma_precos(faixas, selecao, preco_min, preco_max)}
+        return self._com_visao(relatorio)
+
+    @medido("relatorio")
+    def estoque_baixo(self, quantidade_maxima, limite=100, categorias=None, modo="ou"):
+        """
+        Produtos com estoque até quantidade_maxima, do menor estoque para o maior
+        
+        Args:
+            quantidade_maxima (int): Maior quantidade considerada baixa
+            limite (int): Máximo de produtos devolvidos
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Returns:
+            dict: 'versao', 'total' de produtos com estoque baixo e os primeiros 'produtos'
+        """
+        def relatorio(visao):
+            selecao = visao.selecionar(categorias=categorias, modo=modo)
+            total, linhas = visao.estoque_baixo(quantidade_maxima, limite, selecao)
+            codigos = visao.codigos[linhas].tolist()
+            return {"total": total, "produtos": [produto_para_dict(self.indice_codigo[codigo]) for codigo in codigos]}
+        return self._com_visao(relatorio)
@@ -0,0 +1,259 @@
+"""
+Módulo de Índice de Nomes
+Índice invertido palavra → códigos para busca por nome de produto, sem
+diferenciar maiúsculas nem acentos ("eletronicos" encontra "Eletrônicos")
+
+- Prefixo: o vocabulário é mantido em uma lista ordenada, então as palavras
+  que começam com um prefixo formam uma faixa contínua (busca binária)
+- Aproximada: cada palavra do vocabulário é indexada pelos seus trigramas;
+  uma palavra digitada com erro encontra as que compartilham mais trigramas
+  (só palavras com letras apenas; números e modelos, como "128gb", não)
+"""
+
+import math
+import re
+import unicodedata
+from bisect import bisect_left
+
+PALAVRA = re.compile(r"\w+")
+# Blocos Unicode de marcas combinantes (acentos separados pela decomposição NFKD)
+MARCAS = re.compile("[\u0300-\u036f\u1ab0-\u1aff\u1dc0-\u1dff\u20d0-\u20ff\ufe20-\ufe2f]")
+
+
+def normalizar(texto):
+    """
+    Remove acentos e diferenças de maiúsculas de um texto
+    
+    Args:
+        texto (str): Texto original
+    
+    Returns:
+        str: Texto sem marcas diacríticas, em minúsculas
+    """
+    if texto.isascii():
+        return texto.lower()
+    return MARCAS.sub("", unicodedata.normalize("NFKD", texto)).casefold()
+
+
+def palavras(texto):
+    """
+    Separa um texto nas palavras usadas pelo índice
+    
+    Args:
+        texto (str): Nome do produto ou consulta
+    
+    Returns:
+        list[str]: Palavras normalizadas, na ordem do texto
+    """
+    return PALAVRA.findall(normalizar(texto))
+
+
+def trigramas(palavra):
+    """
+    Args:
+        palavra (str): Palavra normalizada
+    
+    Returns:
+        set[str]: Trigramas da palavra, com espaços marcando início e fim
+    """
+    marcada = f"  {palavra} "
+    return {marcada[i:i + 3] for i in range(len(marcada) - 2)}
+
+
+class IndiceNomes:
+    """
+    Índice invertido dos nomes do catálogo
+    As alterações devem ser serializadas pelo chamador e seguidas de
+    consolidar(), que atualiza o vocabulário ordenado; as consultas só leem.
+    """
+
+    def __init__(self):
+        """Inicializa um índice vazio"""
+        # Palavra → códigos dos produtos cujo nome contém a palavra
+        self.codigos = {}
+        # Trigrama → palavras do vocabulário que o contêm
+        self.por_trigrama = {}
+        # Vocabulário ordenado; pode conter palavras já removidas, que são
+        # ignoradas nas consultas e descartadas na próxima reconstrução
+        self.ordenadas = []
+        self._novas = []
+        self._removidas = 0
+
+    def adicionar(self, codigo, nome):
+        """
+        Indexa o nome de um produto
+        
+        Args:
+            codigo (int): Código do produto
+            nome (str): Nome do produto
+        """
+        for palavra in palavras(nome):
+            codigos = self.codigos.get(palavra)
+            if codigos is None:
+                codigos = self.codigos[palavra] = set()
+                self._novas.append(palavra)
+                if palavra.isalpha():
+                    for trigrama in trigramas(palavra):
+                        self.por_trigrama.setdefault(trigrama, set()).add(palavra)
+            codigos.add(codigo)
+
+    def adicionar_lote(self, pares):
+        """
+        Indexa os nomes de vários produtos
+        Os nomes são normalizados juntos, em uma única chamada, o que pesa
+        bem menos que normalizá-los um a um em cargas grandes
+        
+        Args:
+            pares (list[tuple]): Pares (código, nome) dos produtos
+        """
+        normalizados = normalizar("\n".join(nome for _, nome in pares)).split("\n")
+        if len(normalizados) != len(pares):
+            # Algum nome tinha quebra de linha: normaliza um a um
+            normalizados = [normalizar(nome) for _, nome in pares]
+        indice = self.codigos
+        for (codigo, _), nome in zip(pares, normalizados):
+            for palavra in PALAVRA.findall(nome):
+                codigos = indice.get(palavra)
+                if codigos is None:
+                    codigos = indice[palavra] = set()
+                    self._novas.append(palavra)
+                    if palavra.isalpha():
+                        for trigrama in trigramas(palavra):
+                            self.por_trigrama.setdefault(trigrama, set()).add(palavra)
+                codigos.add(codigo)
+
+    def remover(self, codigo, nome):
+        """
+        Retira do índice o nome de um produto
+        
+        Args:
+            codigo (int): Código do produto
+            nome (str): Nome indexado do produto
+        """
+        for palavra in palavras(nome):
+            codigos = self.codigos.get(palavra)
+            if codigos is None:
+                continue
+            codigos.discard(codigo)
+            if not codigos:
+                del self.codigos[palavra]
+                self._removidas += 1
+                if not palavra.isalpha():
+                    continue
+                for trigrama in trigramas(palavra):
+                    vizinhas = self.por_trigrama[trigrama]
+                    vizinhas.discard(palavra)
+                    if not vizinhas:
+                        del self.por_trigrama[trigrama]
+
+    def consolidar(self):
+        """
+        Leva as palavras novas ao vocabulário ordenado
+        Poucas palavras novas são inseridas por busca binária; muitas (ou
+        muitas removidas acumuladas) fazem o vocabulário ser reordenado.
+        Palavras removidas e readicionadas antes da consolidação (ex.: um
+        produto atualizado sem mudar o nome) não contam como novas.
+        """
+        novas = 0
+        for palavra in self._novas:
+            posicao = bisect_left(self.ordenadas, palavra)
+            if posicao == len(self.ordenadas) or self.ordenadas[posicao] != palavra:
+                novas += 1
+        if novas > 64 or self._removidas > len(self.ordenadas) // 4:
+            self.ordenadas = sorted(self.codigos)
+            self._removidas = 0
+        else:
+            for palavra in self._novas:
+                # Uma palavra removida e readicionada ainda pode estar na lista
+                posicao = bisect_left(self.ordenadas, palavra)
+                if posicao == len(self.ordenadas) or self.ordenadas[posicao] != palavra:
+                    self.ordenadas.insert(posicao, palavra)
+                else:
+                    self._removidas -= 1
+        self._novas = []
+
+    def com_prefixo(self, prefixo):
+        """
+        Palavras do vocabulário que começam com o prefixo
+        Complexidade: O(log V + k)
+        
+        Args:
+            prefixo (str): Prefixo normalizado
+        
+        Returns:
+            list[str]: Palavras encontradas, em ordem alfabética
+        """
+        encontradas = []
+        for i in range(bisect_left(self.ordenadas, prefixo), len(self.ordenadas)):
+            palavra = self.ordenadas[i]
+            if not palavra.startswith(prefixo):
+                break
+            if palavra in self.codigos:
+                encontradas.append(palavra)
+        return encontradas
+
+    def parecidas(self, palavra, limite=5, similaridade_minima=0.3):
+        """
+        Palavras do vocabulário parecidas com a informada (erros de digitação)
+        Usa a similaridade de Jaccard entre os conjuntos de trigramas. Uma
+        palavra com similaridade s compartilha pelo menos s * t dos t
+        trigramas da consulta, então basta buscar candidatas pelos
+        t - ceil(s * t) + 1 trigramas mais raros (os comuns, como o do
+        início, são ignorados)
+        
+        Args:
+            palavra (str): Palavra normalizada
+            limite (int): Máximo de palavras devolvidas
+            similaridade_minima (float): Similaridade mínima, entre 0 e 1
+        
+        Returns:
+            list[str]: Palavras mais parecidas primeiro
+        """
+        return [candidata for _, candidata in self.parecidas_pontuadas(palavra, limite, similaridade_minima)]
+
+    def parecidas_pontuadas(self, palavra, limite=5, similaridade_minima=0.3):
+        """
+        Como parecidas, mas com a similaridade de cada palavra (permite
+        combinar as candidatas de vários índices, ex.: de cada partição)
+        
+        Args:
+            palavra (str): Palavra normalizada
+            limite (int): Máximo de palavras devolvidas
+            similaridade_minima (float): Similaridade mínima, entre 0 e 1
+        
+        Returns:
+            list[tuple]: Pares (-similaridade, palavra), os mais parecidos primeiro
+        """
+        seus = trigramas(palavra)
+        raros = sorted(seus, key=lambda trigrama: len(self.por_trigrama.get(trigrama, ())))
+        necessarios = max(1, math.ceil(similaridade_minima * len(seus)))
+        candidatas = set().union(*(self.por_trigrama.get(t, ()) for t in raros[:len(raros) - necessarios + 1]))
+        pontuadas = []
+        for candidata in candidatas:
+            dela = trigramas(candidata)
+            comuns = len(seus & dela)
+            similaridade = comuns / (len(seus) + len(dela) - comuns)
+            if similaridade >= similaridade_minima:
+                pontuadas.append((-similaridade, candidata))
+        pontuadas.sort()
+        return pontuadas[:limite]
+
+    def contar(self, palavras_encontradas):
+        """
+        Args:
+            palavras_encontradas (list[str]): Palavras do vocabulário
+        
+        Returns:
+            int: Soma dos produtos de cada palavra (limite superior da união)
+        """
+        return sum(len(self.codigos[palavra]) for palavra in palavras_encontradas)
+
+    def uniao(self, palavras_encontradas):
+        """
+        Args:
+            palavras_encontradas (list[str]): Palavras do vocabulário
+        
+        Returns:
+            set[int]: Códigos dos produtos que contêm alguma das palavras
+        """
+        return set().union(*(self.codigos[palavra] for palavra in palavras_encontradas))
@@ -0,0 +1,54 @@
+"""
+Módulo de Log Estruturado
+Configura o logging da API com um registro JSON por linha, incluindo os
+campos passados em extra= (ex.: operacao, codigo), para ser consumido por
+coletores de log sem parsing de texto livre
+"""
+
+import json
+import logging
+import sys
+
+# Atributos padrão de um LogRecord; o que não estiver aqui veio de extra=
+CAMPOS_PADRAO = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime"}
+
+
+class FormatadorJSON(logging.Formatter):
+    """Formata cada registro como um objeto JSON em uma linha"""
+
+    def format(self, registro):
+        """
+        Args:
+            registro (logging.LogRecord): Registro a formatar
+        
+        Returns:
+            str: Objeto JSON com horário, nível, origem, mensagem e campos extras
+        """
+        dados = {
+            "horario": self.formatTime(registro),
+            "nivel": registro.levelname,
+            "origem": registro.name,
+            "mensagem": registro.getMessage(),
+        }
+        for campo, valor in vars(registro).items():
+            if campo not in CAMPOS_PADRAO:
+                dados[campo] = valor
+        if registro.exc_info:
+            dados["excecao"] = self.formatException(registro.exc_info)
+        return json.dumps(dados, ensure_ascii=False, default=str)
+
+
+def configurar_log(nivel="INFO"):
+    """
+    Envia os logs para a saída de erro em JSON, a partir do nível informado
+    Mensagens abaixo do nível não são nem formatadas (ex.: o DEBUG de cada
+    inserção e remoção do catálogo)
+    
+    Args:
+        nivel (str): Nome do nível mínimo ('DEBUG', 'INFO', 'WARNING', ...)
+    """
+    saida = logging.StreamHandler(sys.stderr)
+    saida.setFormatter(FormatadorJSON())
+    raiz = logging.getLogger()
+    raiz.handlers[:] = [saida]
+    raiz.setLevel(nivel.upper())
@@ -0,0 +1,156 @@
+"""
+Módulo de Métricas
+Contadores e histogramas de latência das operações do catálogo, exportados
+no formato de texto do Prometheus (sem depender do prometheus_client)
+"""
+
+import threading
+from bisect import bisect_left
+from functools import wraps
+from time import perf_counter
+
+from perfilador import PERFIL_REQUISICAO
+
+# Limites superiores, em segundos, das faixas do histograma de latência
+LIMITES_LATENCIA = (
+    0.00001, 0.000025, 0.00005, 0.0001, 0.00025, 0.0005,
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0,
+)
+
+
+def _rotulos(rotulos):
+    """
+    Args:
+        rotulos (dict): Nome → valor dos rótulos
+    
+    Returns:
+        str: Rótulos no formato {nome="valor",...} (vazio se não houver)
+    """
+    if not rotulos:
+        return ""
+    pares = ",".join(f'{nome}="{valor}"' for nome, valor in rotulos.items())
+    return "{" + pares + "}"
+
+
+def formatar_medidas(medidas):
+    """
+    Args:
+        medidas (iterable): Métricas como tuplas (nome, tipo, ajuda, [(rótulos, valor), ...])
+    
+    Returns:
+        str: Métricas no formato de texto do Prometheus
+    """
+    linhas = []
+    for nome, tipo, ajuda, valores in medidas:
+        linhas.append(f"# HELP {nome} {ajuda}")
+        linhas.append(f"# TYPE {nome} {tipo}")
+        for rotulos, valor in valores:
+            linhas.append(f"{nome}{_rotulos(rotulos)} {valor}")
+    return "".join(linha + "\n" for linha in linhas)
+
+
+class MetricasOperacoes:
+    """
+    Contagem e latência por operação, seguras entre threads
+    Cada observação custa uma busca binária nas faixas e um incremento sob
+    uma trava própria (independente da trava do catálogo)
+    """
+
+    def __init__(self, limites=LIMITES_LATENCIA):
+        """
+        Inicializa as métricas vazias
+        
+        Args:
+            limites (tuple[float]): Limites das faixas do histograma, em segundos
+        """
+        self.limites = limites
+        self._trava = threading.Lock()
+        # operação → [contagem por faixa (a última é +Inf), soma dos segundos, erros]
+        self._operacoes = {}
+
+    def observar(self, operacao, segundos, erro=False):
+        """
+        Registra uma execução de uma operação
+        
+        Args:
+            operacao (str): Nome da operação (ex.: 'inserir')
+            segundos (float): Duração da execução
+            erro (bool): Se a execução terminou com exceção
+        """
+        faixa = bisect_left(self.limites, segundos)
+        with self._trava:
+            dados = self._operacoes.get(operacao)
+            if dados is None:
+                dados = self._operacoes[operacao] = [[0] * (len(self.limites) + 1), 0.0, 0]
+            dados[0][faixa] += 1
+            dados[1] += segundos
+            if erro:
+                dados[2] += 1
+
+    def exportar(self, medidas=()):
+        """
+        Gera o texto de exposição do Prometheus
+        
+        Args:
+            medidas (iterable): Métricas adicionais como tuplas
+                (nome, tipo, ajuda, [(rótulos, valor), ...])
+        
+        Returns:
+            str: Métricas no formato de texto do Prometheus
+        """
+        with self._trava:
+            operacoes = {nome: (list(faixas), soma, erros) for nome, (faixas, soma, erros) in self._operacoes.items()}
+
+        linhas = [
+            "# HELP catalogo_operacoes_total Operações do catálogo executadas, por resultado",
+            "# TYPE catalogo_operacoes_total counter",
+        ]
+        for nome, (faixas, _, erros) in sorted(operacoes.items()):
+            total = sum(faixas)
+            linhas.append(f'catalogo_operacoes_total{{operacao="{nome}",resultado="ok"}} {total - erros}')
+            linhas.append(f'catalogo_operacoes_total{{operacao="{nome}",resultado="erro"}} {erros}')
+
+        linhas.append("# HELP catalogo_operacao_segundos Latência das operações do catálogo")
+        linhas.append("# TYPE catalogo_operacao_segundos histogram")
+        for nome, (faixas, soma, _) in sorted(operacoes.items()):
+            acumulado = 0
+            for limite, quantidade in zip(self.limites + ("+Inf",), faixas):
+                acumulado += quantidade
+                linhas.append(f'catalogo_operacao_segundos_bucket{{operacao="{nome}",le="{limite}"}} {acumulado}')
+            linhas.append(f'catalogo_operacao_segundos_sum{{operacao="{nome}"}} {soma}')
+            linhas.append(f'catalogo_operacao_segundos_count{{operacao="{nome}"}} {acumulado}')
+
+        return "\n".join(linhas) + "\n" + formatar_medidas(medidas)
+
+
+def medido(operacao):
+    """
+    Decorador que registra contagem e latência do método em self.metricas
+    Deve ficar por fora dos decoradores de trava, para incluir a espera.
+    Nas requisições sorteadas pelo perfilador, executa o método sob o cProfile.
+    
+    Args:
+        operacao (str): Nome da operação nas métricas
+    """
+    def decorador(metodo):
+        @wraps(metodo)
+        def medir(self, *args, **kwargs):
+            perfil = PERFIL_REQUISICAO.get()
+            if perfil is not None:
+                # Operações chamadas por esta já ficam dentro do mesmo perfil
+                PERFIL_REQUISICAO.set(None)
+                perfil.enable()
+            inicio = perf_counter()
+            try:
+                resultado = metodo(self, *args, **kwargs)
+            except Exception:
+                self.metricas.observar(operacao, perf_counter() - inicio, erro=True)
+                raise
+            finally:
+                if perfil is not None:
+                    perfil.disable()
+                    PERFIL_REQUISICAO.set(perfil)
+            self.metricas.observar(operacao, perf_counter() - inicio)
+            return resultado
+        return medir
+    return decorador
@@ -1,50 +1,132 @@
-"""
-Módulo de Modelos de Dados
-Define schemas Pydantic para validação e serialização de produtos
-"""
-
-from pydantic import BaseModel, Field
-from typing import List
-from enum import Enum
-
-class CategoriaEnum(str, Enum):
-    """
-    Enumeração de categorias de produtos disponíveis
-    Garante consistência nas categorias do catálogo
-    """
-    ELETRONICOS = "Eletrônicos"
-    ROUPAS = "Roupas"
-    ALIMENTOS = "Alimentos"
-    MOVEIS = "Móveis"
-    LIVROS = "Livros"
-    BRINQUEDOS = "Brinquedos"
-    BELEZA = "Beleza"
-    ESPORTES = "Esportes"
-    OUTROS = "Outros"
-
-class Produto(BaseModel):
-    """
-    Modelo de dados para Produto
-    Utiliza Pydantic para validação automática de tipos e valores
-    
-    Attributes:
-        codigo (int): Identificador único do produto
-        nome (str): Nome descritivo do produto
-        preco (float): Preço unitário (deve ser maior que 0)
-        quantidade (int): Estoque disponível (maior ou igual a 0)
-        categoria (List[CategoriaEnum]): Lista de categorias do produto
-    """
-    codigo: int = Field(..., description="Código único do produto")
-    nome: str = Field(..., description="Nome do produto")
-    preco: float = Field(..., gt=0, description="Preço do produto")
-    quantidade: int = Field(..., ge=0, description="Quantidade em estoque")
-    categoria: List[CategoriaEnum] = Field(..., description="Categorias do produto")
-
-    def __str__(self):
-        """
-        Representação em string formatada do produto
-        
-        Returns:
-            str: Formato '[codigo] nome - R$preco (quantidade un.)'
-        """
-        return f"[{self.codigo}] {self.nome} - R${self.preco:.2f} ({self.quantidade} un.)"
+"""
+Módulo de Modelos de Dados
+Define schemas Pydantic para validação e serialização de produtos
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from enum import Enum
+
+class CategoriaEnum(str, Enum):
+    """
+    Enumeração de categorias de produtos disponíveis
+    Garante consistência nas categorias do catálogo
+    """
+    ELETRONICOS = "Eletrônicos"
+    ROUPAS = "Roupas"
+    ALIMENTOS = "Alimentos"
+    MOVEIS = "Móveis"
+    LIVROS = "Livros"
+    BRINQUEDOS = "Brinquedos"
+    BELEZA = "Beleza"
+    ESPORTES = "Esportes"
+    OUTROS = "Outros"
+
+# Ordem fixa das categorias, usada nas máscaras de bits
+CATEGORIAS = list(CategoriaEnum)
+
+def mascara_categorias(categorias):
+    """
+    Codifica uma lista de categorias como máscara de bits (ordem de CategoriaEnum)
+    
+    Args:
+        categorias (list[CategoriaEnum]): Categorias do produto
+    
+    Returns:
+        int: Máscara com um bit por categoria
+    """
+    mascara = 0
+    for categoria in categorias:
+        mascara |= 1 << CATEGORIAS.index(categoria)
+    return mascara
+
+def categorias_da_mascara(mascara):
+    """
+    Decodifica uma máscara de bits de categorias
+    
+    Args:
+        mascara (int): Máscara gerada por mascara_categorias
+    
+    Returns:
+        list[CategoriaEnum]: Categorias marcadas, na ordem de CategoriaEnum
+    """
+    return [categoria for i, categoria in enumerate(CATEGORIAS) if mascara >> i & 1]
+
+class Produto(BaseModel):
+    """
+    Modelo de dados para Produto
+    Utiliza Pydantic para validação automática de tipos e valores
+    
+    Attributes:
+        codigo (int): Identificador único do produto
+        nome (str): Nome descritivo do produto
+        preco (float): Preço unitário (deve ser maior que 0)
+        quantidade (int): Estoque disponível (maior ou igual a 0)
+        categoria (List[CategoriaEnum]): Lista de categorias do produto
+    """
+    codigo: int = Field(..., description="Código único do produto")
+    nome: str = Field(..., description="Nome do produto")
+    preco: float = Field(..., gt=0, description="Preço do produto")
+    quantidade: int = Field(..., ge=0, description="Quantidade em estoque")
+    categoria: List[CategoriaEnum] = Field(..., description="Categorias do produto")
+
+    def __str__(self):
+        """
+        Representação em string formatada do produto
+        
+        Returns:
+            str: Formato '[codigo] nome - R$preco (quantidade un.)'
+        """
+        return f"[{self.codigo}] {self.nome} - R${self.preco:.2f} ({self.quantidade} un.)"
+
+class ProdutoParcial(BaseModel):
+    """
+    Alteração parcial de um produto (PATCH)
+    Só os campos informados mudam; as restrições são as mesmas de Produto
+    
+    Attributes:
+        codigo (int | None): Novo código
+        nome (str | None): Novo nome
+        preco (float | None): Novo preço (maior que 0)
+        quantidade (int | None): Novo estoque (maior ou igual a 0)
+        categoria (List[CategoriaEnum] | None): Novas categorias
+    """
+    codigo: Optional[int] = Field(None, description="Novo código do produto")
+    nome: Optional[str] = Field(None, description="Novo nome do produto")
+    preco: Optional[float] = Field(None, gt=0, description="Novo preço do produto")
+    quantidade: Optional[int] = Field(None, ge=0, description="Nova quantidade em estoque")
+    categoria: Optional[List[CategoriaEnum]] = Field(None, description="Novas categorias do produto")
+
+class Reserva(BaseModel):
+    """
+    Item de uma reserva de estoque em lote
+    
+    Attributes:
+        codigo (int): Código do produto
+        quantidade (int): Unidades a reservar (maior que 0)
+    """
+    codigo: int = Field(..., description="Código do produto")
+    quantidade: int = Field(..., gt=0, description="Unidades a reservar")
+
+class TipoOperacaoEnum(str, Enum):
+    """
+    Tipos de operação aceitos em um lote de operações
+    """
+    ADICIONAR = "adicionar"
+    REMOVER = "remover"
+    ATUALIZAR = "atualizar"
+
+class Operacao(BaseModel):
+    """
+    Item de um lote misto de alterações (POST /produtos/operacoes)
+    
+    Attributes:
+        tipo (TipoOperacaoEnum): Operação a aplicar
+        codigo (int | None): Código do produto (remover e atualizar)
+        produto (Produto | None): Produto a adicionar
+        alteracoes (ProdutoParcial | None): Campos a alterar (atualizar)
+    """
+    tipo: TipoOperacaoEnum = Field(..., description="Operação: adicionar, remover ou atualizar")
+    codigo: Optional[int] = Field(None, description="Código do produto (remover e atualizar)")
+    produto: Optional[Produto] = Field(None, description="Produto a adicionar")
+    alteracoes: Optional[ProdutoParcial] = Field(None, description="Campos a alterar (atualizar)")
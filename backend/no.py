@@ -1,24 +1,31 @@
-"""
-Módulo de Nó da Árvore AVL
-Define a estrutura básica de um nó na árvore binária
-"""
-
-class No:
-    """
-    Representa um nó na Árvore AVL
-    Armazena chave, valor e referências aos filhos
-    """
-    
-    def __init__(self, chave, valor=None):
-        """
-        Inicializa um novo nó da árvore
-        
-        Args:
-            chave (int): Chave de ordenação do nó (código do produto)
-            valor: Objeto produto ou dado associado à chave
-        """
-        self.chave = chave
-        self.valor = valor
-        self.esquerda = None
-        self.direita = None
-        self.altura = 1
+"""
+Módulo de Nó da Árvore AVL
+Define a estrutura básica de um nó na árvore binária
+"""
+
+class No:
+    """
+    Representa um nó na Árvore AVL
+    Armazena chave, valor, referências aos filhos e o tamanho da subárvore
+    (usado nas consultas de estatística de ordem: posição e k-ésimo elemento)
+    
+    Usa __slots__ para dispensar o __dict__ de cada instância, reduzindo
+    a memória por nó em catálogos com milhões de produtos
+    """
+    
+    __slots__ = ("chave", "valor", "esquerda", "direita", "altura", "tamanho")
+
+    def __init__(self, chave, valor=None):
+        """
+        Inicializa um novo nó da árvore
+        
+        Args:
+            chave: Chave de ordenação do nó (no catálogo, a tupla (preco, codigo))
+            valor: Objeto produto ou dado associado à chave
+        """
+        self.chave = chave
+        self.valor = valor
+        self.esquerda = None
+        self.direita = None
+        self.altura = 1
+        self.tamanho = 1
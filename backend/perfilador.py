@@ -0,0 +1,124 @@
+"""
+Módulo de Perfil por Amostragem
+Executa uma fração das requisições sob o cProfile e acumula as estatísticas,
+para descobrir onde uma operação lenta gasta o tempo sem perfilar todo o
+tráfego
+
+O perfil é ligado pelo decorador medido (metricas.py) dentro das operações
+do catálogo, na thread que as executa: o cProfile só enxerga a thread em
+que foi ativado, e os endpoints síncronos rodam no pool de threads.
+"""
+
+import cProfile
+import io
+import pstats
+import random
+import threading
+from contextvars import ContextVar
+
+# Perfil da requisição atual; só é definido nas requisições sorteadas
+PERFIL_REQUISICAO = ContextVar("perfil_requisicao", default=None)
+
+
+class Perfilador:
+    """
+    Sorteia as requisições perfiladas e acumula as estatísticas delas
+    Com amostra 0 (padrão), o custo por requisição é uma comparação
+    """
+
+    def __init__(self):
+        """Inicializa o perfilador desligado"""
+        self.amostra = 0.0
+        self._trava = threading.Lock()
+        self._estatisticas = None
+        self.requisicoes = {}
+
+    def configurar(self, amostra):
+        """
+        Define a fração de requisições perfiladas e descarta o acumulado
+        
+        Args:
+            amostra (float): Fração entre 0 (desligado) e 1 (todas)
+        """
+        with self._trava:
+            self.amostra = amostra
+            self._estatisticas = None
+            self.requisicoes = {}
+
+    def sortear(self):
+        """
+        Returns:
+            bool: Se a próxima requisição deve ser perfilada
+        """
+        return self.amostra > 0 and random.random() < self.amostra
+
+    def registrar(self, rota, perfil):
+        """
+        Soma o perfil de uma requisição às estatísticas acumuladas
+        
+        Args:
+            rota (str): Método e rota da requisição (ex.: 'PUT /produtos/{codigo}')
+            perfil (cProfile.Profile): Perfil já desativado
+        """
+        perfil.create_stats()
+        if not perfil.stats:
+            # Requisição que não chegou a nenhuma operação do catálogo
+            return
+        with self._trava:
+            if self._estatisticas is None:
+                self._estatisticas = pstats.Stats(perfil)
+            else:
+                self._estatisticas.add(perfil)
+            self.requisicoes[rota] = self.requisicoes.get(rota, 0) + 1
+
+    def relatorio(self, linhas=30, ordem="cumulative"):
+        """
+        Args:
+            linhas (int): Funções listadas
+            ordem (str): Critério do pstats ('cumulative', 'tottime', 'calls', ...)
+        
+        Returns:
+            dict: Amostra, requisições perfiladas por rota e o relatório do pstats
+        """
+        saida = io.StringIO()
+        with self._trava:
+            if self._estatisticas is not None:
+                self._estatisticas.stream = saida
+                self._estatisticas.sort_stats(ordem).print_stats(linhas)
+            requisicoes = dict(self.requisicoes)
+        return {
+            "amostra": self.amostra,
+            "requisicoes": requisicoes,
+            "perfil": saida.getvalue(),
+        }
+
+
+class AmostragemPerfil:
+    """
+    Middleware ASGI que marca as requisições sorteadas pelo perfilador
+    Escrito direto sobre ASGI (e não com BaseHTTPMiddleware) para não
+    acrescentar uma tarefa por requisição quando o perfil está desligado
+    """
+
+    def __init__(self, app, perfilador):
+        """
+        Args:
+            app: Aplicação ASGI envolvida
+            perfilador (Perfilador): Perfilador que sorteia e acumula
+        """
+        self.app = app
+        self.perfilador = perfilador
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self.perfilador.sortear():
+            await self.app(scope, receive, send)
+            return
+        perfil = cProfile.Profile()
+        token = PERFIL_REQUISICAO.set(perfil)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            PERFIL_REQUISICAO.reset(token)
+            # Agrupa pelo modelo da rota (/produtos/{codigo}), não pelo caminho
+            rota = getattr(scope.get("route"), "path", scope["path"])
+            self.perfilador.registrar(f"{scope['method']} {rota}", perfil)
@@ -0,0 +1,417 @@
+"""
+Módulo de Persistência do Catálogo
+Diário de escrita antecipada (WAL) com gravação em grupo e instantâneos
+periódicos no formato mapeável (snapshot_mapeado), para que o catálogo
+sobreviva a reinícios
+
+Arquivos no diretório de dados:
+    wal-NNNNNNNN.log       segmentos do diário, em ordem de número
+    snapshot-NNNNNNNN.bin  instantâneo com todas as operações anteriores ao
+                           segmento NNNNNNNN
+
+Na carga, o instantâneo mais recente é lido em ordem de chave e montado
+pela carga em lote (O(n)); depois os segmentos a partir dele são reaplicados.
+Os instantâneos também podem ser servidos diretamente, sem carga, pelo
+CatalogoMapeado (modo somente leitura).
+"""
+
+import json
+import logging
+import os
+import re
+import struct
+import threading
+import time
+import zlib
+
+from catalogo_produtos_avl import coleta_de_lixo_pausada, produto_para_dict
+from modelo import Operacao, Produto
+from snapshot_mapeado import SnapshotMapeado, gravar_snapshot_mapeado
+
+# Cabeçalho do registro do diário: tamanho e CRC32 do conteúdo
+CABECALHO_REGISTRO = struct.Struct("<II")
+
+PADRAO_ARQUIVO = re.compile(r"^(wal|snapshot)-(\d{8})\.(log|bin)$")
+
+logger = logging.getLogger(__name__)
+
+
+def operacoes_para_dicts(aplicadas):
+    """
+    Args:
+        aplicadas (list[tuple]): (tipo, código, produto resultante ou None)
+    
+    Returns:
+        list[dict]: Itens no formato de Operacao, para o diário
+    """
+    return [
+        {"tipo": tipo, "codigo": codigo, "produto": produto_para_dict(produto) if produto is not None else None}
+        for tipo, codigo, produto in aplicadas
+    ]
+
+
+def ler_segmento(caminho):
+    """
+    Lê os registros de um segmento do diário
+    Para no primeiro registro incompleto ou com CRC inválido: é uma escrita
+    interrompida por queda, que nunca foi confirmada ao cliente
+    
+    Args:
+        caminho (str): Caminho do segmento
+    
+    Yields:
+        dict: Operações na ordem em que foram aplicadas
+    """
+    with open(caminho, "rb") as arquivo:
+        dados = arquivo.read()
+    posicao = 0
+    while posicao + CABECALHO_REGISTRO.size <= len(dados):
+        tamanho, crc = CABECALHO_REGISTRO.unpack_from(dados, posicao)
+        inicio = posicao + CABECALHO_REGISTRO.size
+        conteudo = dados[inicio:inicio + tamanho]
+        if len(conteudo) < tamanho or zlib.crc32(conteudo) != crc:
+            return
+        yield json.loads(conteudo)
+        posicao = inicio + tamanho
+
+
+class DiarioEscrita:
+    """
+    Diário de escrita antecipada com gravação em grupo (group commit)
+    anotar() só enfileira o registro; uma thread gravadora escreve tudo o que
+    se acumulou e faz um único fsync para o grupo. Quem precisa de
+    durabilidade chama aguardar() fora das travas do catálogo, de modo que
+    várias escritas concorrentes compartilham o mesmo fsync.
+    Se uma gravação falhar (ex.: disco cheio), o diário para de gravar e
+    anotar() e aguardar() passam a levantar o erro, em vez de esperar por
+    uma gravação que nunca vai acontecer.
+    """
+
+    def __init__(self, caminho, espera_grupo=0.002):
+        """
+        Abre (ou cria) um segmento do diário para acrescentar registros
+        
+        Args:
+            caminho (str): Caminho do segmento
+            espera_grupo (float): Segundos que a gravadora espera por mais
+                registros antes de gravar um grupo
+        """
+        self.espera_grupo = espera_grupo
+        self._arquivo = open(caminho, "ab")
+        self._condicao = threading.Condition()
+        self._pendentes = []
+        self._anotados = 0
+        self._duraveis = 0
+        self._gravando = False
+        self._fechado = False
+        # Erro de E/S que encerrou a thread gravadora
+        self._erro = None
+        self._gravadora = threading.Thread(target=self._gravar_grupos, name="diario-escrita", daemon=True)
+        self._gravadora.start()
+
+    @property
+    def anotados(self):
+        """int: Quantidade de registros anotados desde a abertura"""
+        return self._anotados
+
+    def anotar(self, operacao):
+        """
+        Enfileira uma operação para gravação
+        
+        Args:
+            operacao (dict): Operação serializável em JSON
+        
+        Returns:
+            int: Número de sequência do registro (para aguardar)
+        
+        Raises:
+            OSError: Se uma gravação anterior do diário falhou
+        """
+        conteudo = json.dumps(operacao, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        registro = CABECALHO_REGISTRO.pack(len(conteudo), zlib.crc32(conteudo)) + conteudo
+        with self._condicao:
+            self._verificar_erro()
+            self._pendentes.append(registro)
+            self._anotados += 1
+            self._condicao.notify_all()
+            return self._anotados
+
+    def aguardar(self, sequencia=None):
+        """
+        Bloqueia até que o registro informado esteja gravado em disco
+        
+        Args:
+            sequencia (int | None): Número devolvido por anotar (None para
+                tudo o que já foi anotado)
+        
+        Raises:
+            OSError: Se a gravação do diário falhou antes de chegar ao registro
+        """
+        with self._condicao:
+            if sequencia is None:
+                sequencia = self._anotados
+            while self._duraveis < sequencia and not self._fechado and self._erro is None:
+                self._condicao.wait()
+            if self._duraveis < sequencia:
+                self._verificar_erro()
+
+    def _verificar_erro(self):
+        """Levanta o erro que encerrou a gravadora, se houve um (chamado com a condição)"""
+        if self._erro is not None:
+            raise OSError(f"Falha ao gravar o diário: {self._erro}") from self._erro
+
+    def trocar_arquivo(self, caminho):
+        """
+        Grava o que está pendente e passa a acrescentar em outro segmento
+        O chamador deve impedir novas anotações durante a troca
+        
+        Args:
+            caminho (str): Caminho do novo segmento
+        """
+        self.aguardar()
+        with self._condicao:
+            while self._gravando:
+                self._condicao.wait()
+            self._arquivo.close()
+            self._arquivo = open(caminho, "ab")
+
+    def fechar(self):
+        """
+        Grava os registros pendentes e encerra a thread gravadora
+        
+        Raises:
+            OSError: Se a gravação do diário falhou (o arquivo é fechado mesmo assim)
+        """
+        try:
+            self.aguardar()
+        finally:
+            with self._condicao:
+                self._fechado = True
+                self._condicao.notify_all()
+            self._gravadora.join()
+            self._arquivo.close()
+
+    def _gravar_grupos(self):
+        """Laço da thread gravadora: escreve e sincroniza um grupo por vez"""
+        while True:
+            with self._condicao:
+                while not self._pendentes and not self._fechado:
+                    self._condicao.wait()
+                if self._fechado and not self._pendentes:
+                    return
+            if self.espera_grupo:
+                time.sleep(self.espera_grupo)
+            with self._condicao:
+                grupo = self._pendentes
+                self._pendentes = []
+                ultimo = self._anotados
+                self._gravando = True
+            try:
+                self._arquivo.write(b"".join(grupo))
+                self._arquivo.flush()
+                os.fsync(self._arquivo.fileno())
+            except Exception as erro:
+                logger.exception("Falha ao gravar o diário; novas alterações serão recusadas")
+                with self._condicao:
+                    self._erro = erro
+                    self._gravando = False
+                    self._condicao.notify_all()
+                return
+            with self._condicao:
+                self._duraveis = ultimo
+                self._gravando = False
+                self._condicao.notify_all()
+
+
+class PersistenciaCatalogo:
+    """
+    Liga um catálogo a um diretório de dados
+    carregar() reconstrói o catálogo a partir do último instantâneo e do
+    diário; depois disso cada alteração do catálogo é anotada no diário, e
+    uma thread grava um novo instantâneo a cada intervalo_snapshot segundos
+    (se houve alterações), descartando os segmentos já cobertos por ele.
+    """
+
+    def __init__(self, catalogo, diretorio, intervalo_snapshot=300.0, espera_grupo=0.002):
+        """
+        Inicializa a persistência (nada é lido até carregar())
+        
+        Args:
+            catalogo (CatalogoProdutosAVL): Catálogo vazio a ser persistido
+            diretorio (str): Diretório dos arquivos de dados
+            intervalo_snapshot (float): Segundos entre instantâneos periódicos
+            espera_grupo (float): Janela de agrupamento dos fsync do diário
+        """
+        self.catalogo = catalogo
+        self.diretorio = diretorio
+        self.intervalo_snapshot = intervalo_snapshot
+        self.espera_grupo = espera_grupo
+        self.diario = None
+        self.segmento = 0
+        self._anotados_no_snapshot = 0
+        self._parar = threading.Event()
+        self._periodica = None
+
+    def _caminho(self, tipo, segmento):
+        extensao = "log" if tipo == "wal" else "bin"
+        return os.path.join(self.diretorio, f"{tipo}-{segmento:08d}.{extensao}")
+
+    def _arquivos(self, tipo):
+        """
+        Returns:
+            list[int]: Números dos arquivos do tipo ('wal' ou 'snapshot'), em ordem
+        """
+        numeros = []
+        for nome in os.listdir(self.diretorio):
+            encontrado = PADRAO_ARQUIVO.match(nome)
+            if encontrado and encontrado.group(1) == tipo:
+                numeros.append(int(encontrado.group(2)))
+        return sorted(numeros)
+
+    def carregar(self):
+        """
+        Reconstrói o catálogo (instantâneo + diário) e passa a registrar as alterações
+        
+        Returns:
+            dict: Produtos do instantâneo, operações reaplicadas e segundos gastos
+        """
+        inicio = time.perf_counter()
+        os.makedirs(self.diretorio, exist_ok=True)
+        snapshots = self._arquivos("snapshot")
+        segmento_inicial = 0
+        carregados = 0
+        if snapshots:
+            with coleta_de_lixo_pausada():
+                snapshot = SnapshotMapeado(self._caminho("snapshot", snapshots[-1]))
+                segmento_inicial, produtos = snapshot.segmento, snapshot.produtos()
+                snapshot.fechar()
+                if produtos:
+                    self.catalogo.adicionar_produtos_lote(produtos)
+            carregados = len(produtos)
+
+        reaplicadas = 0
+        segmentos = [s for s in self._arquivos("wal") if s >= segmento_inicial]
+        for segmento in segmentos:
+            for operacao in ler_segmento(self._caminho("wal", segmento)):
+                self._reaplicar(operacao)
+                reaplicadas += 1
+
+        # Sempre começa um segmento novo: o último pode terminar em um
+        # registro interrompido
+        self.segmento = max(segmentos + [segmento_inicial - 1]) + 1
+        self.diario = DiarioEscrita(self._caminho("wal", self.segmento), self.espera_grupo)
+        self.catalogo.diario = self
+        if reaplicadas:
+            self.gravar_snapshot()
+        self._periodica = threading.Thread(target=self._snapshots_periodicos, name="snapshot-periodico", daemon=True)
+        self._periodica.start()
+        return {
+            "produtos_snapshot": carregados,
+            "operacoes_reaplicadas": reaplicadas,
+            "segundos": round(time.perf_counter() - inicio, 3),
+        }
+
+    def _reaplicar(self, operacao):
+        """
+        Aplica ao catálogo uma operação lida do diário
+        
+        Args:
+            operacao (dict): Registro gerado por anotar
+        """
+        tipo = operacao["op"]
+        if tipo == "adicionar":
+            self.catalogo.adicionar_produto(Produto(**operacao["produto"]))
+        elif tipo == "lote":
+            self.catalogo.adicionar_produtos_lote([Produto(**dados) for dados in operacao["produtos"]])
+        elif tipo == "remover":
+            self.catalogo.remover_produto(operacao["codigo"])
+        elif tipo == "atualizar":
+            self.catalogo.atualizar_produto(operacao["codigo"], Produto(**operacao["produto"]))
+        elif tipo == "reservar":
+            self.catalogo.reservar_lote(operacao["itens"])
+        elif tipo in ("operacoes", "restaurar"):
+            self.catalogo.aplicar_operacoes([Operacao(**dados) for dados in operacao["operacoes"]])
+        else:
+            raise ValueError(f"Operação desconhecida no diário: {tipo}")
+
+    def anotar(self, tipo, *args):
+        """
+        Registra uma alteração do catálogo; chamado pelo catálogo sob a trava
+        de escrita, na mesma ordem em que as alterações são aplicadas.
+        As versões não são gravadas, então a restauração de uma versão é
+        registrada pelas alterações que ela causou e reaplicada como um
+        lote de operações.
+        
+        Args:
+            tipo (str): 'adicionar', 'lote', 'remover', 'atualizar', 'reservar',
+                'operacoes' ou 'restaurar'
+            *args: Produto(s), código, itens reservados, operações aplicadas
+                ou versão restaurada e alterações resultantes
+        """
+        if tipo == "adicionar":
+            operacao = {"op": tipo, "produto": produto_para_dict(args[0])}
+        elif tipo == "lote":
+            operacao = {"op": tipo, "produtos": [produto_para_dict(produto) for produto in args[0]]}
+        elif tipo == "remover":
+            operacao = {"op": tipo, "codigo": args[0]}
+        elif tipo == "atualizar":
+            operacao = {"op": tipo, "codigo": args[0], "produto": produto_para_dict(args[1])}
+        elif tipo == "reservar":
+            operacao = {"op": tipo, "itens": args[0]}
+        elif tipo == "operacoes":
+            # Só os itens aceitos, com o produto resultante: reaplicados na
+            # mesma ordem, levam ao mesmo estado
+            operacao = {"op": tipo, "operacoes": operacoes_para_dicts(args[0])}
+        elif tipo == "restaurar":
+            operacao = {"op": tipo, "versao": args[0], "operacoes": operacoes_para_dicts(args[1])}
+        else:
+            raise ValueError(f"Operação desconhecida: {tipo}")
+        self.diario.anotar(operacao)
+
+    def sincronizar(self):
+        """Aguarda até que todas as alterações anotadas estejam em disco"""
+        self.diario.aguardar()
+
+    def gravar_snapshot(self):
+        """
+        Grava um instantâneo da versão atual e descarta os arquivos cobertos
+        Só a troca de segmento acontece sob a trava de escrita; a gravação lê
+        uma versão publicada, sem bloquear leituras nem escritas
+        
+        Returns:
+            int: Número do segmento a partir do qual o diário continua
+        """
+        trava = self.catalogo.trava
+        trava.adquirir_escrita()
+        try:
+            instantaneo = self.catalogo.avl.atual
+            self.segmento += 1
+            segmento = self.segmento
+            self.diario.trocar_arquivo(self._caminho("wal", segmento))
+            self._anotados_no_snapshot = self.diario.anotados
+        finally:
+            trava.liberar_escrita()
+
+        gravar_snapshot_mapeado(self._caminho("snapshot", segmento), instantaneo, segmento)
+        for tipo in ("snapshot", "wal"):
+            for numero in self._arquivos(tipo):
+                if numero < segmento:
+                    os.remove(self._caminho(tipo, numero))
+        return segmento
+
+    def _snapshots_periodicos(self):
+        """Laço da thread de instantâneos: grava um a cada intervalo, se houve alterações"""
+        while not self._parar.wait(self.intervalo_snapshot):
+            if self.diario.anotados != self._anotados_no_snapshot:
+                try:
+                    self.gravar_snapshot()
+                except OSError:
+                    logger.exception("Falha ao gravar o instantâneo periódico")
+
+    def fechar(self):
+        """Encerra a thread periódica e grava o que estiver pendente no diário"""
+        self._parar.set()
+        if self._periodica is not None:
+            self._periodica.join()
+        self.diario.fechar()
+        self.catalogo.diario = None
@@ -0,0 +1,738 @@
+"""
+Módulo de Instantâneo Mapeado em Memória
+Formato de arquivo do catálogo que pode ser aberto com mmap e consultado
+diretamente, sem desserializar os produtos na inicialização. Vários
+processos que abrem o mesmo arquivo compartilham as páginas do cache do
+sistema operacional.
+
+Layout (little-endian, seções alinhadas em 8 bytes), com os produtos em
+ordem de chave (preco, codigo):
+    cabeçalho      identificador, segmento do diário, versão, total e agregados
+    codigos        int64[n]
+    precos         float64[n]
+    quantidades    int64[n]
+    inicio_nomes   uint64[n + 1]  deslocamento de cada nome na seção de nomes
+    por_codigo     int64[n]       posições ordenadas por código (busca binária)
+    mascaras       uint16[n]      uma máscara de bits de categorias por produto
+    nomes          bytes UTF-8 concatenados
+
+Como a ordem do arquivo é a ordem da árvore, a posição de um produto é o
+seu posto: contagens por faixa, k-ésimo e percentil saem de buscas binárias.
+"""
+
+import heapq
+import math
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+from typing import List
+
+import numpy as np
+from pydantic import TypeAdapter
+
+from catalogo_produtos_avl import intervalo_preco
+from indice_nomes import IndiceNomes, palavras
+from metricas import MetricasOperacoes, medido
+from modelo import CATEGORIAS, Produto, categorias_da_mascara, mascara_categorias
+from visao_analitica import VisaoAnalitica
+
+MAGICO = b"AVLMAP01"
+# identificador, segmento do diário, versão da árvore, total de produtos,
+# total de unidades, valor em estoque, soma dos preços e contagem por categoria
+CABECALHO = struct.Struct("<8sQQQqdd" + "Q" * len(CATEGORIAS))
+TAMANHO_CABECALHO = (CABECALHO.size + 7) // 8 * 8
+
+# Valida a lista inteira de uma vez (laço em Rust), mais rápido que criar
+# cada Produto separadamente
+LISTA_PRODUTOS = TypeAdapter(List[Produto])
+
+
+def _secoes(total, tamanho_nomes):
+    """
+    Calcula a posição de cada seção do arquivo
+    
+    Args:
+        total (int): Quantidade de produtos
+        tamanho_nomes (int): Bytes da seção de nomes
+    
+    Returns:
+        dict: Nome da seção → (deslocamento, quantidade de itens, formato)
+    """
+    secoes = {}
+    deslocamento = TAMANHO_CABECALHO
+    for nome, quantidade, formato in (
+        ("codigos", total, "q"),
+        ("precos", total, "d"),
+        ("quantidades", total, "q"),
+        ("inicio_nomes", total + 1, "Q"),
+        ("por_codigo", total, "q"),
+        ("mascaras", total, "H"),
+        ("nomes", tamanho_nomes, "B"),
+    ):
+        secoes[nome] = (deslocamento, quantidade, formato)
+        deslocamento += (quantidade * struct.calcsize(formato) + 7) // 8 * 8
+    return secoes
+
+
+def gravar_snapshot_mapeado(caminho, instantaneo, segmento=0):
+    """
+    Grava uma versão publicada do catálogo no formato mapeável
+    O arquivo é escrito com outro nome e renomeado só depois do fsync, então
+    quem já tem o arquivo anterior mapeado continua lendo-o sem interferência
+    
+    Args:
+        caminho (str): Caminho final do arquivo
+        instantaneo (Instantaneo): Versão da árvore do catálogo (com os agregados em dados)
+        segmento (int): Primeiro segmento do diário não incluído no instantâneo
+    """
+    codigos = array("q")
+    precos = array("d")
+    quantidades = array("q")
+    inicio_nomes = array("Q", [0])
+    mascaras = array("H")
+    nomes = []
+    tamanho_nomes = 0
+    cache_mascaras = {}
+    for no in instantaneo.iterar_nos():
+        produto = no.valor
+        codigos.append(produto.codigo)
+        precos.append(produto.preco)
+        quantidades.append(produto.quantidade)
+        nome = produto.nome.encode("utf-8")
+        nomes.append(nome)
+        tamanho_nomes += len(nome)
+        inicio_nomes.append(tamanho_nomes)
+        categorias = tuple(produto.categoria)
+        mascara = cache_mascaras.get(categorias)
+        if mascara is None:
+            mascara = cache_mascaras[categorias] = mascara_categorias(categorias)
+        mascaras.append(mascara)
+    por_codigo = array("q", sorted(range(len(codigos)), key=codigos.__getitem__))
+
+    dados = instantaneo.dados
+    contagens = dict(dados["produtos_por_categoria"])
+    cabecalho = CABECALHO.pack(
+        MAGICO, segmento, instantaneo.versao, len(codigos), dados["total_unidades"],
+        dados["valor_estoque"], dados["soma_precos"], *(contagens.get(c, 0) for c in CATEGORIAS)
+    )
+    colunas = {
+        "codigos": codigos, "precos": precos, "quantidades": quantidades,
+        "inicio_nomes": inicio_nomes, "por_codigo": por_codigo, "mascaras": mascaras,
+    }
+    if sys.byteorder != "little":
+        for coluna in colunas.values():
+            coluna.byteswap()
+
+    temporario = caminho + ".tmp"
+    with open(temporario, "wb") as arquivo:
+        arquivo.write(cabecalho)
+        for nome, (deslocamento, _, _) in _secoes(len(codigos), tamanho_nomes).items():
+            arquivo.write(b"\0" * (deslocamento - arquivo.tell()))
+            if nome == "nomes":
+                arquivo.write(b"".join(nomes))
+            else:
+                colunas[nome].tofile(arquivo)
+        arquivo.flush()
+        os.fsync(arquivo.fileno())
+    os.replace(temporario, caminho)
+
+
+class SnapshotMapeado:
+    """
+    Visão somente leitura de um instantâneo mapeado em memória
+    Cada coluna é um memoryview sobre o mmap: nada é copiado na abertura,
+    e um produto só é montado quando é pedido. Posições seguem a ordem de
+    preço (e código), começando em 0.
+    """
+
+    def __init__(self, caminho):
+        """
+        Mapeia o arquivo e lê o cabeçalho
+        
+        Args:
+            caminho (str): Caminho do arquivo
+        
+        Raises:
+            ValueError: Se o arquivo não estiver no formato esperado
+        """
+        if sys.byteorder != "little":
+            raise ValueError("O formato mapeado só pode ser lido em máquinas little-endian")
+        self.caminho = caminho
+        with open(caminho, "rb") as arquivo:
+            self._mapa = mmap.mmap(arquivo.fileno(), 0, access=mmap.ACCESS_READ)
+        campos = CABECALHO.unpack_from(self._mapa)
+        if campos[0] != MAGICO:
+            raise ValueError(f"Instantâneo inválido: {caminho}")
+        (_, self.segmento, self.versao, self.total, self.total_unidades,
+         self.valor_estoque, self.soma_precos) = campos[:7]
+        self.contagem_categorias = dict(zip(CATEGORIAS, campos[7:]))
+
+        memoria = memoryview(self._mapa)
+        tamanho_nomes = struct.unpack_from("<Q", self._mapa, _secoes(self.total, 0)["inicio_nomes"][0] + 8 * self.total)[0]
+        for nome, (deslocamento, quantidade, formato) in _secoes(self.total, tamanho_nomes).items():
+            fim = deslocamento + quantidade * struct.calcsize(formato)
+            setattr(self, nome, memoria[deslocamento:fim].cast(formato))
+        self._categorias = {}
+        self._indice_nomes = None
+        self._trava_indice = threading.Lock()
+
+    def __len__(self):
+        return self.total
+
+    def chave(self, posicao):
+        """
+        Args:
+            posicao (int): Posição na ordem de preço
+        
+        Returns:
+            tuple: Chave (preco, codigo) do produto na posição
+        """
+        return (self.precos[posicao], self.codigos[posicao])
+
+    def _categorias_da_mascara(self, mascara):
+        categorias = self._categorias.get(mascara)
+        if categorias is None:
+            categorias = self._categorias[mascara] = categorias_da_mascara(mascara)
+        return categorias
+
+    def nome(self, posicao):
+        """
+        Args:
+            posicao (int): Posição na ordem de preço
+        
+        Returns:
+            str: Nome do produto na posição
+        """
+        return bytes(self.nomes[self.inicio_nomes[posicao]:self.inicio_nomes[posicao + 1]]).decode("utf-8")
+
+    def registro(self, posicao):
+        """
+        Monta o dicionário de listagem de um produto (como produto_para_dict)
+        
+        Args:
+            posicao (int): Posição na ordem de preço
+        
+        Returns:
+            dict: Dados do produto com categorias como texto
+        """
+        return {
+            "codigo": self.codigos[posicao],
+            "nome": self.nome(posicao),
+            "preco": self.precos[posicao],
+            "categoria": [c.value for c in self._categorias_da_mascara(self.mascaras[posicao])],
+            "quantidade": self.quantidades[posicao],
+        }
+
+    def produto(self, posicao):
+        """
+        Args:
+            posicao (int): Posição na ordem de preço
+        
+        Returns:
+            Produto: Produto na posição
+        """
+        return Produto(
+            codigo=self.codigos[posicao],
+            nome=self.nome(posicao),
+            preco=self.precos[posicao],
+            quantidade=self.quantidades[posicao],
+            categoria=self._categorias_da_mascara(self.mascaras[posicao]),
+        )
+
+    def produtos(self):
+        """
+        Monta todos os produtos, em ordem de chave (usado para carregar a árvore)
+        
+        Returns:
+            list[Produto]: Produtos do instantâneo
+        """
+        inicios = self.inicio_nomes.tolist()
+        nomes = bytes(self.nomes)
+        registros = [
+            {
+                "codigo": codigo,
+                "nome": nomes[inicios[i]:inicios[i + 1]].decode("utf-8"),
+                "preco": preco,
+                "quantidade": quantidade,
+                "categoria": self._categorias_da_mascara(mascara),
+            }
+            for i, (codigo, preco, quantidade, mascara) in enumerate(zip(
+                self.codigos.tolist(), self.precos.tolist(), self.quantidades.tolist(), self.mascaras.tolist()
+            ))
+        ]
+        return LISTA_PRODUTOS.validate_python(registros)
+
+    def indice_nomes(self):
+        """
+        Índice de nomes do instantâneo, montado na primeira busca por nome
+        Os produtos são indexados pela posição em vez do código, então as
+        menores posições encontradas são os produtos mais baratos. Montar o
+        índice custa O(n) e ocupa memória do processo (não é compartilhado
+        pelo mapeamento), por isso só acontece se alguém buscar por nome.
+        
+        Returns:
+            IndiceNomes: Índice palavra → posições
+        """
+        if self._indice_nomes is None:
+            with self._trava_indice:
+                if self._indice_nomes is None:
+                    inicios = self.inicio_nomes.tolist()
+                    nomes = bytes(self.nomes)
+                    indice = IndiceNomes()
+                    indice.adicionar_lote([
+                        (posicao, nomes[inicios[posicao]:inicios[posicao + 1]].decode("utf-8"))
+                        for posicao in range(self.total)
+                    ])
+                    indice.consolidar()
+                    self._indice_nomes = indice
+        return self._indice_nomes
+
+    def posicao_do_codigo(self, codigo):
+        """
+        Busca binária pelo código no índice ordenado por código
+        Complexidade: O(log n)
+        
+        Args:
+            codigo (int): Código do produto
+        
+        Returns:
+            int | None: Posição do produto ou None se não existir
+        """
+        indice = bisect_left(self.por_codigo, codigo, key=self.codigos.__getitem__)
+        if indice < self.total:
+            posicao = self.por_codigo[indice]
+            if self.codigos[posicao] == codigo:
+                return posicao
+        return None
+
+    def contar_menores(self, chave, inclusivo=False):
+        """
+        Conta as chaves menores que a chave informada (posição da chave)
+        Complexidade: O(log n)
+        
+        Args:
+            chave (tuple): Chave de referência (aceita (preco,) e (preco, inf))
+            inclusivo (bool): Se chaves iguais também devem ser contadas
+        
+        Returns:
+            int: Quantidade de chaves menores (ou menores ou iguais)
+        """
+        busca = bisect_right if inclusivo else bisect_left
+        return busca(range(self.total), chave, key=self.chave)
+
+    def fechar(self):
+        """Libera o mapeamento (as colunas deixam de ser válidas)"""
+        for nome in _secoes(0, 0):
+            getattr(self, nome).release()
+        self._mapa.close()
+
+
+class CatalogoMapeado:
+    """
+    Catálogo somente leitura servido direto de um instantâneo mapeado
+    Oferece as mesmas consultas do CatalogoProdutosAVL, mas abre em tempo
+    constante e compartilha a memória com outros processos. Acompanha o
+    diretório de dados: quando um instantâneo mais novo aparece, passa a
+    lê-lo (cada consulta usa um único instantâneo do início ao fim).
+    """
+
+    def __init__(self, diretorio, intervalo_verificacao=1.0):
+        """
+        Abre o instantâneo mais recente do diretório
+        
+        Args:
+            diretorio (str): Diretório de dados (o mesmo da PersistenciaCatalogo)
+            intervalo_verificacao (float): Segundos entre verificações de novo instantâneo
+        
+        Raises:
+            FileNotFoundError: Se o diretório não tiver nenhum instantâneo
+        """
+        self.diretorio = diretorio
+        self.intervalo_verificacao = intervalo_verificacao
+        self.metricas = MetricasOperacoes()
+        self._snapshot = None
+        self._verificado_em = 0.0
+        # Várias threads da API podem ver a verificação vencida ao mesmo tempo
+        self._trava_atualizacao = threading.Lock()
+        self._atualizar()
+        if self._snapshot is None:
+            raise FileNotFoundError(f"Nenhum instantâneo em {diretorio}")
+
+    def _atualizar(self):
+        """Troca para o instantâneo mais novo do diretório, se houver"""
+        with self._trava_atualizacao:
+            if self._snapshot is not None and \
+                    time.monotonic() - self._verificado_em <= self.intervalo_verificacao:
+                # Outra thread acabou de verificar
+                return
+            self._verificado_em = time.monotonic()
+            nomes = sorted(
+                nome for nome in os.listdir(self.diretorio)
+                if nome.startswith("snapshot-") and nome.endswith(".bin")
+            )
+            if not nomes:
+                return
+            caminho = os.path.join(self.diretorio, nomes[-1])
+            if self._snapshot is None or self._snapshot.caminho != caminho:
+                # O anterior é liberado pelo coletor quando as consultas em
+                # andamento terminarem de usá-lo
+                self._snapshot = SnapshotMapeado(caminho)
+
+    def _obter(self, versao=None):
+        """
+        Obtém o instantâneo usado por uma consulta
+        
+        Args:
+            versao (int | None): Versão pedida (só a do instantâneo atual existe)
+        
+        Returns:
+            SnapshotMapeado: Instantâneo atual
+        
+        Raises:
+            LookupError: Se a versão pedida não for a do instantâneo atual
+        """
+        if time.monotonic() - self._verificado_em > self.intervalo_verificacao:
+            self._atualizar()
+        snapshot = self._snapshot
+        if versao is not None and versao != snapshot.versao:
+            raise LookupError(f"Versão {versao} não está disponível")
+        return snapshot
+
+    @medido("buscar")
+    def buscar_produto(self, codigo: int):
+        """
+        Busca um produto pelo código
+        Complexidade: O(log n) por busca binária
+        
+        Args:
+            codigo (int): Código do produto a buscar
+        
+        Returns:
+            Produto | None: Produto encontrado ou None se não existir
+        """
+        snapshot = self._obter()
+        posicao = snapshot.posicao_do_codigo(codigo)
+        return snapshot.produto(posicao) if posicao is not None else None
+
+    @medido("buscar")
+    def buscar_produto_versao(self, codigo: int):
+        """
+        Busca um produto junto com a versão do instantâneo em que foi lido
+        
+        Args:
+            codigo (int): Código do produto a buscar
+        
+        Returns:
+            tuple: (versão lida, Produto encontrado ou None)
+        """
+        snapshot = self._obter()
+        posicao = snapshot.posicao_do_codigo(codigo)
+        return snapshot.versao, snapshot.produto(posicao) if posicao is not None else None
+
+    def _posicoes(self, snapshot, cursor=None, preco_min=None, preco_max=None, categorias=None, modo="ou"):
+        """
+        Percorre as posições dentro da faixa, após o cursor e nas categorias pedidas
+        
+        Args:
+            snapshot (SnapshotMapeado): Instantâneo lido
+            cursor (tuple | None): Chave após a qual continuar
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Yields:
+            int: Posições em ordem de chave
+        """
+        inicio, fim = intervalo_preco(preco_min, preco_max)
+        if cursor is not None and (inicio is None or cursor > inicio):
+            inicio = cursor
+        primeira = snapshot.contar_menores(inicio, inclusivo=True) if inicio is not None else 0
+        ultima = snapshot.contar_menores(fim, inclusivo=True) if fim is not None else snapshot.total
+        if not categorias:
+            yield from range(primeira, ultima)
+            return
+        pedida = mascara_categorias(set(categorias))
+        mascaras = snapshot.mascaras
+        for posicao in range(primeira, ultima):
+            mascara = mascaras[posicao] & pedida
+            if mascara == pedida if modo == "e" else mascara:
+                yield posicao
+
+    def iterar_produtos(self, cursor=None, preco_min=None, preco_max=None, categorias=None, modo="ou",
+                        versao=None):
+        """
+        Percorre os produtos em ordem de preço sob demanda
+        
+        Returns:
+            iterator: Dicionários com os dados de cada produto
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        snapshot = self._obter(versao)
+        posicoes = self._posicoes(snapshot, cursor, preco_min, preco_max, categorias, modo)
+        return (snapshot.registro(posicao) for posicao in posicoes)
+
+    def listar_produtos(self):
+        """
+        Returns:
+            list: Todos os produtos em ordem de preço
+        """
+        return list(self.iterar_produtos())
+
+    @medido("listar")
+    def listar_pagina(self, limite, cursor=None, preco_min=None, preco_max=None, categorias=None, modo="ou",
+                      versao=None):
+        """
+        Lista uma página de produtos em ordem de preço em O(log n + k)
+        
+        Returns:
+            tuple: (lista de produtos, chave para a próxima página ou None, versão lida)
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        snapshot = self._obter(versao)
+        produtos = []
+        ultima = None
+        for posicao in self._posicoes(snapshot, cursor, preco_min, preco_max, categorias, modo):
+            if len(produtos) == limite:
+                return produtos, snapshot.chave(ultima), snapshot.versao
+            ultima = posicao
+            produtos.append(snapshot.registro(posicao))
+        return produtos, None, snapshot.versao
+
+    @medido("buscar_nome")
+    def buscar_por_nome(self, consulta: str, limite: int = 20, aproximada: bool = True):
+        """
+        Busca produtos pelo nome em ordem de preço, com as mesmas regras do
+        catálogo AVL (prefixos e, com aproximada, palavras parecidas)
+        Usa o índice de nomes do instantâneo (SnapshotMapeado.indice_nomes),
+        cujas posições já estão em ordem de preço
+        
+        Args:
+            consulta (str): Texto digitado
+            limite (int): Máximo de produtos devolvidos
+            aproximada (bool): Se deve tolerar erros de digitação
+        
+        Returns:
+            list[Produto]: Produtos encontrados, do mais barato ao mais caro
+        """
+        snapshot = self._obter()
+        indice = snapshot.indice_nomes()
+        grupos = []
+        for palavra in palavras(consulta):
+            encontradas = indice.com_prefixo(palavra)
+            if not encontradas and aproximada:
+                encontradas = indice.parecidas(palavra)
+            if not encontradas:
+                return []
+            grupos.append(encontradas)
+        if not grupos:
+            return []
+        conjuntos = sorted((indice.uniao(grupo) for grupo in grupos), key=len)
+        posicoes = conjuntos[0].intersection(*conjuntos[1:])
+        return [snapshot.produto(posicao) for posicao in heapq.nsmallest(limite, posicoes)]
+
+    @medido("contar")
+    def contar_por_preco(self, preco_min=None, preco_max=None, versao=None):
+        """
+        Conta os produtos em uma faixa de preço em O(log n)
+        
+        Returns:
+            int: Quantidade de produtos na faixa
+        """
+        snapshot = self._obter(versao)
+        inicio, fim = intervalo_preco(preco_min, preco_max)
+        total = snapshot.contar_menores(fim, inclusivo=True) if fim is not None else snapshot.total
+        if inicio is not None:
+            total -= snapshot.contar_menores(inicio)
+        return max(total, 0)
+
+    @medido("posicao")
+    def produto_por_posicao(self, posicao: int):
+        """
+        Busca o k-ésimo produto mais barato em O(1)
+        
+        Args:
+            posicao (int): Posição na ordem de preço, começando em 1
+        
+        Returns:
+            Produto | None: Produto na posição ou None se estiver fora do catálogo
+        """
+        snapshot = self._obter()
+        if 1 <= posicao <= snapshot.total:
+            return snapshot.produto(posicao - 1)
+        return None
+
+    @medido("percentil")
+    def percentil_preco(self, percentil: float):
+        """
+        Busca o produto no percentil de preço informado (método do posto mais próximo)
+        
+        Returns:
+            Produto | None: Produto no percentil ou None se o catálogo estiver vazio
+        """
+        snapshot = self._obter()
+        if snapshot.total == 0:
+            return None
+        posicao = max(1, math.ceil(percentil / 100 * snapshot.total))
+        return snapshot.produto(posicao - 1)
+
+    def para_mermaid(self, raiz=None, profundidade=None, versao=None):
+        """
+        Raises:
+            LookupError: Sempre; o instantâneo mapeado não guarda a árvore
+        """
+        raise LookupError("Diagrama indisponível no modo somente leitura")
+
+    def versao_atual(self):
+        """
+        Returns:
+            int: Versão do instantâneo servido (verificando se há um mais novo)
+        """
+        return self._obter().versao
+
+    def contar_produtos(self):
+        """
+        Returns:
+            int: Quantidade de produtos no instantâneo
+        """
+        return self._obter().total
+
+    def maior_codigo(self):
+        """
+        Returns:
+            int | None: Maior código ou None se o catálogo estiver vazio
+        """
+        snapshot = self._obter()
+        return snapshot.codigos[snapshot.por_codigo[-1]] if snapshot.total else None
+
+    def listar_versoes(self):
+        """
+        Returns:
+            list[dict]: A única versão disponível (a do instantâneo)
+        """
+        snapshot = self._obter()
+        return [{"versao": snapshot.versao, "total_produtos": snapshot.total}]
+
+    def exportar_metricas(self):
+        """
+        Returns:
+            str: Métricas das consultas, produtos e versão no formato do Prometheus
+        """
+        snapshot = self._obter()
+        return self.metricas.exportar([
+            ("catalogo_produtos", "gauge", "Produtos no catálogo", [({}, snapshot.total)]),
+            ("catalogo_versao", "gauge", "Versão do instantâneo servido", [({}, snapshot.versao)]),
+        ])
+
+    def estatisticas(self, versao=None):
+        """
+        Retorna as estatísticas gravadas no cabeçalho, em O(1)
+        
+        Returns:
+            dict: Mesmos campos de CatalogoProdutosAVL.estatisticas (a altura
+                é a da árvore balanceada montada a partir do instantâneo)
+        
+        Raises:
+            LookupError: Se a versão não estiver disponível
+        """
+        snapshot = self._obter(versao)
+        total = snapshot.total
+        return {
+            "versao": snapshot.versao,
+            "altura": total.bit_length(),
+            "total_produtos": total,
+            "total_unidades": snapshot.total_unidades,
+            "valor_estoque": round(snapshot.valor_estoque, 2),
+            "preco_minimo": snapshot.precos[0] if total else None,
+            "preco_maximo": snapshot.precos[total - 1] if total else None,
+            "preco_medio": round(snapshot.soma_precos / total, 2) if total else None,
+            "produtos_por_categoria": {
+                categoria.value: quantidade for categoria, quantidade in snapshot.contagem_categorias.items()
+            },
+        }
+
+    def _com_visao(self, relatorio):
+        """
+        Executa um relatório sobre as colunas do instantâneo atual
+        As colunas do arquivo já estão no formato da visão analítica, então
+        são usadas direto do mapeamento, sem cópia
+        
+        Args:
+            relatorio (callable): Recebe o SnapshotMapeado e a VisaoAnalitica
+                e devolve um dict
+        
+        Returns:
+            dict: 'versao' lida e o resultado do relatório
+        """
+        snapshot = self._obter()
+        visao = VisaoAnalitica(
+            np.frombuffer(snapshot.codigos, np.int64),
+            np.frombuffer(snapshot.precos, np.float64),
+            np.frombuffer(snapshot.quantidades, np.int64),
+            np.frombuffer(snapshot.mascaras, np.uint16),
+        )
+        return {"versao": snapshot.versao, **relatorio(snapshot, visao)}
+
+    @medido("relatorio")
+    def relatorio_categorias(self, preco_min=None, preco_max=None):
+        """
+        Mesmo relatório do catálogo AVL, sobre o instantâneo mapeado
+        
+        Args:
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+        
+        Returns:
+            dict: 'versao', 'total' e 'categorias' (nome → agregados)
+        """
+        return self._com_visao(lambda _, visao: visao.resumo_por_categoria(visao.selecionar(preco_min, preco_max)))
+
+    @medido("relatorio")
+    def histograma_precos(self, faixas=10, preco_min=None, preco_max=None, categorias=None, modo="ou"):
+        """
+        Mesmo relatório do catálogo AVL, sobre o instantâneo mapeado
+        
+        Args:
+            faixas (int): Quantidade de faixas
+            preco_min (float | None): Menor preço, inclusivo (início da primeira faixa)
+            preco_max (float | None): Maior preço, inclusivo (fim da última faixa)
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Returns:
+            dict: 'versao' e 'faixas' (início, fim, produtos e unidades)
+        """
+        def relatorio(_, visao):
+            selecao = visao.selecionar(preco_min, preco_max, categorias, modo)
+            return {"faixas": visao.histograma_precos(faixas, selecao, preco_min, preco_max)}
+        return self._com_visao(relatorio)
+
+    @medido("relatorio")
+    def estoque_baixo(self, quantidade_maxima, limite=100, categorias=None, modo="ou"):
+        """
+        Mesmo relatório do catálogo AVL, sobre o instantâneo mapeado
+        (as linhas da visão são as posições do arquivo)
+        
+        Args:
+            quantidade_maxima (int): Maior quantidade considerada baixa
+            limite (int): Máximo de produtos devolvidos
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Returns:
+            dict: 'versao', 'total' de produtos com estoque baixo e os primeiros 'produtos'
+        """
+        def relatorio(snapshot, visao):
+            selecao = visao.selecionar(categorias=categorias, modo=modo)
+            total, linhas = visao.estoque_baixo(quantidade_maxima, limite, selecao)
+            return {"total": total, "produtos": [snapshot.registro(linha) for linha in linhas.tolist()]}
+        return self._com_visao(relatorio)
@@ -0,0 +1,131 @@
+"""
+Módulo de Trava de Leitura/Escrita
+Permite várias leituras simultâneas do catálogo e escritas exclusivas
+"""
+
+import functools
+import threading
+
+
+class TravaLeituraEscrita:
+    """
+    Trava de leitura/escrita com preferência para escritores
+    Vários leitores podem entrar juntos; um escritor entra sozinho. Quando
+    há escritor esperando, novos leitores aguardam, evitando que um fluxo
+    contínuo de leituras impeça as escritas para sempre.
+    
+    É reentrante na mesma thread: quem já tem a escrita pode ler ou escrever
+    de novo, e quem já tem a leitura pode ler de novo. Pedir escrita tendo
+    só a leitura geraria impasse e levanta RuntimeError.
+    """
+
+    def __init__(self):
+        """Inicializa a trava livre"""
+        self._condicao = threading.Condition(threading.Lock())
+        self._leitores = 0
+        self._escritores_esperando = 0
+        self._escritor = None
+        self._profundidade_escrita = 0
+        self._local = threading.local()
+
+    def adquirir_leitura(self):
+        """Bloqueia até que a leitura seja permitida"""
+        local = self._local
+        if self._escritor == threading.get_ident():
+            local.leituras_na_escrita = getattr(local, "leituras_na_escrita", 0) + 1
+            return
+        leituras = getattr(local, "leituras", 0)
+        if leituras:
+            local.leituras = leituras + 1
+            return
+        with self._condicao:
+            while self._escritor is not None or self._escritores_esperando:
+                self._condicao.wait()
+            self._leitores += 1
+        local.leituras = 1
+
+    def liberar_leitura(self):
+        """Libera uma leitura adquirida pela thread atual"""
+        local = self._local
+        if getattr(local, "leituras_na_escrita", 0):
+            local.leituras_na_escrita -= 1
+            return
+        local.leituras -= 1
+        if local.leituras:
+            return
+        with self._condicao:
+            self._leitores -= 1
+            if self._leitores == 0:
+                self._condicao.notify_all()
+
+    def adquirir_escrita(self):
+        """
+        Bloqueia até que a thread atual seja a única com acesso
+        
+        Raises:
+            RuntimeError: Se a thread atual tiver apenas a trava de leitura
+        """
+        ident = threading.get_ident()
+        if self._escritor == ident:
+            self._profundidade_escrita += 1
+            return
+        if getattr(self._local, "leituras", 0):
+            raise RuntimeError("Não é possível pedir escrita enquanto se mantém uma leitura")
+        with self._condicao:
+            self._escritores_esperando += 1
+            while self._escritor is not None or self._leitores:
+                self._condicao.wait()
+            self._escritores_esperando -= 1
+            self._escritor = ident
+            self._profundidade_escrita = 1
+
+    def liberar_escrita(self):
+        """Libera a escrita adquirida pela thread atual"""
+        self._profundidade_escrita -= 1
+        if self._profundidade_escrita:
+            return
+        with self._condicao:
+            self._escritor = None
+            self._condicao.notify_all()
+
+
+def com_leitura(metodo):
+    """
+    Decorador: executa o método com a trava de leitura do objeto (self.trava)
+    
+    Args:
+        metodo (callable): Método a proteger
+    
+    Returns:
+        callable: Método envolvido pela trava de leitura
+    """
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        trava = self.trava
+        trava.adquirir_leitura()
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            trava.liberar_leitura()
+    return envolvido
+
+
+def com_escrita(metodo):
+    """
+    Decorador: executa o método com a trava de escrita do objeto (self.trava)
+    
+    Args:
+        metodo (callable): Método a proteger
+    
+    Returns:
+        callable: Método envolvido pela trava de escrita
+    """
+    @functools.wraps(metodo)
+    def envolvido(self, *args, **kwargs):
+        trava = self.trava
+        trava.adquirir_escrita()
+        try:
+            return metodo(self, *args, **kwargs)
+        finally:
+            trava.liberar_escrita()
+    return envolvido
@@ -0,0 +1,365 @@
+"""
+Módulo de Visão Analítica
+Colunas NumPy (código, preço, quantidade e máscara de categorias) dos
+produtos, para relatórios calculados de forma vetorizada (agregados por
+categoria, histograma de preços, estoque baixo) sem montar um dicionário
+por produto
+
+- VisaoAnalitica: relatórios sobre colunas já prontas (ex.: as seções do
+  instantâneo mapeado, usadas sem cópia)
+- VisaoSincronizada: colunas próprias, mantidas em sincronia com o catálogo
+  AVL; a cada consulta só as linhas dos produtos alterados são reescritas
+
+As linhas não têm ordem definida; os relatórios não dependem dela.
+"""
+
+import threading
+
+import numpy as np
+
+from modelo import CATEGORIAS, mascara_categorias
+
+
+def _agregados(produtos, unidades, valor_estoque, soma_precos, sem_estoque):
+    """
+    Args:
+        produtos (float): Quantidade de produtos
+        unidades (float): Soma das quantidades
+        valor_estoque (float): Soma de preço * quantidade
+        soma_precos (float): Soma dos preços
+        sem_estoque (float): Produtos com quantidade 0
+    
+    Returns:
+        dict: Os agregados com os tipos da resposta e o preço médio
+    """
+    produtos = int(produtos)
+    return {
+        "produtos": produtos,
+        "unidades": int(unidades),
+        "valor_estoque": round(float(valor_estoque), 2),
+        "preco_medio": round(float(soma_precos) / produtos, 2) if produtos else None,
+        "sem_estoque": int(sem_estoque),
+    }
+
+
+def resumo_das_somas(somas):
+    """
+    Monta o resumo por categoria a partir das somas de somas_por_categoria
+    (ou da soma delas entre várias visões, ex.: uma por partição)
+    
+    Args:
+        somas (np.ndarray): Linha do total seguida de uma linha por categoria
+    
+    Returns:
+        dict: 'total' e 'categorias' (nome → agregados)
+    """
+    return {
+        "total": _agregados(*somas[0]),
+        "categorias": {categoria.value: _agregados(*somas[i + 1]) for i, categoria in enumerate(CATEGORIAS)},
+    }
+
+
+class VisaoAnalitica:
+    """
+    Relatórios vetorizados sobre colunas de produtos
+    As quatro colunas têm o mesmo tamanho; a linha i de cada uma descreve o
+    mesmo produto
+    """
+
+    def __init__(self, codigos, precos, quantidades, mascaras):
+        """
+        Args:
+            codigos (np.ndarray): int64 com o código de cada produto
+            precos (np.ndarray): float64 com o preço
+            quantidades (np.ndarray): int64 com o estoque
+            mascaras (np.ndarray): uint16 com a máscara de categorias (mascara_categorias)
+        """
+        self.codigos = codigos
+        self.precos = precos
+        self.quantidades = quantidades
+        self.mascaras = mascaras
+
+    def selecionar(self, preco_min=None, preco_max=None, categorias=None, modo="ou"):
+        """
+        Filtra as linhas por faixa de preço e categorias
+        
+        Args:
+            preco_min (float | None): Menor preço, inclusivo
+            preco_max (float | None): Maior preço, inclusivo
+            categorias (list[CategoriaEnum] | None): Categorias a filtrar
+            modo (str): 'ou' (qualquer categoria) ou 'e' (todas as categorias)
+        
+        Returns:
+            np.ndarray | None: Máscara booleana das linhas selecionadas
+                (None quando não há filtro)
+        """
+        condicoes = []
+        if preco_min is not None:
+            condicoes.append(self.precos >= preco_min)
+        if preco_max is not None:
+            condicoes.append(self.precos <= preco_max)
+        if categorias:
+            pedida = mascara_categorias(set(categorias))
+            comuns = self.mascaras & pedida
+            condicoes.append(comuns != 0 if modo == "ou" else comuns == pedida)
+        if not condicoes:
+            return None
+        return np.logical_and.reduce(condicoes)
+
+    def somas_por_categoria(self, selecao=None):
+        """
+        Somas do catálogo inteiro e de cada categoria, ainda sem arredondar
+        Um produto com várias categorias entra em cada uma delas
+        
+        Args:
+            selecao (np.ndarray | None): Linhas consideradas (de selecionar)
+        
+        Returns:
+            np.ndarray: Uma linha para o total e uma por categoria (ordem de
+                CATEGORIAS), com produtos, unidades, valor em estoque, soma
+                dos preços e produtos sem estoque
+        """
+        precos, quantidades, mascaras = self.precos, self.quantidades, self.mascaras
+        if selecao is not None:
+            precos, quantidades, mascaras = precos[selecao], quantidades[selecao], mascaras[selecao]
+        # Uma passada por agregado, somando por máscara (no máximo 2^9 valores);
+        # cada categoria soma depois as máscaras que têm o seu bit
+        tamanho = 1 << len(CATEGORIAS)
+        por_mascara = np.stack([
+            np.bincount(mascaras, minlength=tamanho),
+            np.bincount(mascaras, weights=quantidades, minlength=tamanho),
+            np.bincount(mascaras, weights=precos * quantidades, minlength=tamanho),
+            np.bincount(mascaras, weights=precos, minlength=tamanho),
+            np.bincount(mascaras[quantidades == 0], minlength=tamanho),
+        ])
+        valores = np.arange(tamanho)
+        linhas = [por_mascara.sum(axis=1)]
+        for bit in range(len(CATEGORIAS)):
+            linhas.append(por_mascara[:, (valores & (1 << bit)) != 0].sum(axis=1))
+        return np.stack(linhas)
+
+    def resumo_por_categoria(self, selecao=None):
+        """
+        Agregados do catálogo inteiro e de cada categoria
+        
+        Args:
+            selecao (np.ndarray | None): Linhas consideradas (de selecionar)
+        
+        Returns:
+            dict: 'total' e 'categorias' (nome → agregados)
+        """
+        return resumo_das_somas(self.somas_por_categoria(selecao))
+
+    def histograma_precos(self, faixas, selecao=None, preco_min=None, preco_max=None):
+        """
+        Distribuição dos preços em faixas de mesma largura
+        
+        Args:
+            faixas (int): Quantidade de faixas
+            selecao (np.ndarray | None): Linhas consideradas (de selecionar)
+            preco_min (float | None): Início da primeira faixa (padrão: menor preço)
+            preco_max (float | None): Fim da última faixa (padrão: maior preço)
+        
+        Returns:
+            list[dict]: Início, fim, produtos e unidades de cada faixa
+                (vazia se nenhuma linha for selecionada)
+        """
+        precos, quantidades = self.precos, self.quantidades
+        if selecao is not None:
+            precos, quantidades = precos[selecao], quantidades[selecao]
+        if not len(precos):
+            return []
+        inicio = preco_min if preco_min is not None else float(precos.min())
+        fim = preco_max if preco_max is not None else float(precos.max())
+        produtos, limites = np.histogram(precos, bins=faixas, range=(inicio, fim))
+        unidades, _ = np.histogram(precos, bins=limites, weights=quantidades)
+        return [
+            {
+                "inicio": round(float(limites[i]), 2),
+                "fim": round(float(limites[i + 1]), 2),
+                "produtos": int(produtos[i]),
+                "unidades": int(unidades[i]),
+            }
+            for i in range(faixas)
+        ]
+
+    def estoque_baixo(self, quantidade_maxima, limite, selecao=None):
+        """
+        Linhas com estoque até o limite, do menor estoque para o maior
+        (empates pelo código)
+        
+        Args:
+            quantidade_maxima (int): Maior quantidade considerada baixa
+            limite (int): Máximo de linhas devolvidas
+            selecao (np.ndarray | None): Linhas consideradas (de selecionar)
+        
+        Returns:
+            tuple: (total de linhas com estoque baixo, np.ndarray com as
+                primeiras linhas na ordem do relatório)
+        """
+        filtro = self.quantidades <= quantidade_maxima
+        if selecao is not None:
+            filtro &= selecao
+        linhas = np.flatnonzero(filtro)
+        ordem = np.lexsort((self.codigos[linhas], self.quantidades[linhas]))
+        return len(linhas), linhas[ordem[:limite]]
+
+
+class VisaoSincronizada(VisaoAnalitica):
+    """
+    Visão analítica com colunas próprias, atualizada a partir do índice por
+    código do catálogo
+    O catálogo chama marcar() (sob a trava de escrita) para cada produto
+    alterado, e sincronizar() (sob a trava de leitura e a trava da visão)
+    antes de cada relatório. Enquanto nenhum relatório foi pedido, ou depois
+    de muitas alterações, a visão apenas se marca para reconstrução, em vez
+    de acumular códigos.
+    """
+
+    TIPOS = {"codigos": np.int64, "precos": np.float64, "quantidades": np.int64, "mascaras": np.uint16}
+
+    def __init__(self):
+        """Inicializa uma visão vazia, ainda por construir"""
+        super().__init__(*(np.empty(0, tipo) for tipo in self.TIPOS.values()))
+        # Serializa as sincronizações e os relatórios entre leitores
+        self.trava = threading.Lock()
+        self.linha_do_codigo = {}
+        self._colunas = {nome: np.empty(0, tipo) for nome, tipo in self.TIPOS.items()}
+        self._pendentes = set()
+        self._reconstruir = True
+
+    def marcar(self, codigo):
+        """
+        Registra que um produto foi inserido, alterado ou removido
+        
+        Args:
+            codigo (int): Código do produto
+        """
+        if self._reconstruir:
+            return
+        self._pendentes.add(codigo)
+        if len(self._pendentes) > max(1024, len(self.linha_do_codigo) // 4):
+            self.invalidar()
+
+    def marcar_lote(self, codigos):
+        """
+        Como marcar, para vários produtos de uma vez
+        
+        Args:
+            codigos (list[int]): Códigos dos produtos
+        """
+        if self._reconstruir:
+            return
+        if len(self._pendentes) + len(codigos) > max(1024, len(self.linha_do_codigo) // 4):
+            self.invalidar()
+        else:
+            self._pendentes.update(codigos)
+
+    def invalidar(self):
+        """Descarta as colunas; a próxima sincronização reconstrói tudo"""
+        self._reconstruir = True
+        self._pendentes = set()
+
+    def sincronizar(self, indice_codigo):
+        """
+        Leva as colunas ao estado atual do catálogo
+        
+        Args:
+            indice_codigo (dict[int, Produto]): Índice por código do catálogo
+        """
+        if self._reconstruir:
+            self._construir(indice_codigo)
+        elif self._pendentes:
+            for codigo in self._pendentes:
+                produto = indice_codigo.get(codigo)
+                linha = self.linha_do_codigo.get(codigo)
+                if produto is None:
+                    if linha is not None:
+                        self._apagar(linha)
+                elif linha is None:
+                    self._acrescentar(produto)
+                else:
+                    self._escrever(linha, produto)
+            self._pendentes = set()
+        else:
+            return
+        total = len(self.linha_do_codigo)
+        for nome, coluna in self._colunas.items():
+            setattr(self, nome, coluna[:total])
+
+    def _construir(self, indice_codigo):
+        """
+        Reconstrói as colunas a partir de todos os produtos
+        
+        Args:
+            indice_codigo (dict[int, Produto]): Índice por código do catálogo
+        """
+        produtos = list(indice_codigo.values())
+        total = len(produtos)
+        # Poucas combinações de categorias se repetem em muitos produtos
+        cache_mascaras = {}
+        mascaras = []
+        for produto in produtos:
+            categorias = tuple(produto.categoria)
+            mascara = cache_mascaras.get(categorias)
+            if mascara is None:
+                mascara = cache_mascaras[categorias] = mascara_categorias(categorias)
+            mascaras.append(mascara)
+        valores = {
+            "codigos": (produto.codigo for produto in produtos),
+            "precos": (produto.preco for produto in produtos),
+            "quantidades": (produto.quantidade for produto in produtos),
+            "mascaras": mascaras,
+        }
+        capacidade = total + total // 8 + 16
+        for nome, tipo in self.TIPOS.items():
+            coluna = np.empty(capacidade, tipo)
+            coluna[:total] = np.fromiter(valores[nome], tipo, total)
+            self._colunas[nome] = coluna
+        self.linha_do_codigo = {produto.codigo: linha for linha, produto in enumerate(produtos)}
+        self._pendentes = set()
+        self._reconstruir = False
+
+    def _escrever(self, linha, produto):
+        """
+        Args:
+            linha (int): Linha a sobrescrever
+            produto (Produto): Dados atuais do produto
+        """
+        colunas = self._colunas
+        colunas["codigos"][linha] = produto.codigo
+        colunas["precos"][linha] = produto.preco
+        colunas["quantidades"][linha] = produto.quantidade
+        colunas["mascaras"][linha] = mascara_categorias(produto.categoria)
+
+    def _acrescentar(self, produto):
+        """
+        Escreve um produto novo na primeira linha livre, dobrando a
+        capacidade das colunas se necessário
+        
+        Args:
+            produto (Produto): Produto novo
+        """
+        linha = len(self.linha_do_codigo)
+        if linha == len(self._colunas["codigos"]):
+            for nome, coluna in self._colunas.items():
+                maior = np.empty(2 * len(coluna) + 16, coluna.dtype)
+                maior[:linha] = coluna[:linha]
+                self._colunas[nome] = maior
+        self._escrever(linha, produto)
+        self.linha_do_codigo[produto.codigo] = linha
+
+    def _apagar(self, linha):
+        """
+        Remove uma linha movendo a última para o lugar dela
+        
+        Args:
+            linha (int): Linha do produto removido
+        """
+        ultima = len(self.linha_do_codigo) - 1
+        codigo = int(self._colunas["codigos"][linha])
+        if linha != ultima:
+            for coluna in self._colunas.values():
+                coluna[linha] = coluna[ultima]
+            self.linha_do_codigo[int(self._colunas["codigos"][linha])] = linha
+        del self.linha_do_codigo[codigo]